@@ -0,0 +1,224 @@
+import logging
+import os
+import threading
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+# Driver housekeeping that says nothing about query performance
+IGNORED_COMMANDS = {
+    'hello', 'ismaster', 'isMaster', 'ping', 'buildinfo', 'buildInfo', 'endSessions',
+    'saslStart', 'saslContinue', 'authenticate', 'killCursors',
+}
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds, in Prometheus layout."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+
+    def lines(self, name, labels):
+        """Render the _bucket, _sum and _count samples."""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {round(self.total, 6)}')
+        lines.append(f'{name}_count{{{labels}}} {cumulative}')
+        return lines
+
+
+def filter_shape(value):
+    """Replace the values in a query filter with '?' so only its shape is logged."""
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and/$or clauses keep their structure; value lists collapse to one placeholder
+        if value and all(isinstance(item, dict) for item in value):
+            return [filter_shape(item) for item in value]
+        return ['?']
+    return '?'
+
+
+class ApiMetrics:
+    """
+    Request and MongoDB command metrics for the API process, rendered in
+    Prometheus text format. All methods are thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency = {}  # (method, route) -> Histogram
+        self._sizes = {}  # (method, route) -> Histogram
+        self._statuses = {}  # (method, route, status) -> count
+        self._commands = {}  # (command, collection) -> Histogram
+        self._documents = {}  # (command, collection) -> documents returned
+        self._command_failures = {}  # (command, collection) -> count
+
+    def record_request(self, method, route, status, seconds, size):
+        """
+        Record one finished request.
+
+        Args:
+            method: HTTP method
+            route: Route template (e.g. /api/apps/<app_id>), not the raw path
+            status: HTTP status code
+            seconds: Time spent producing the response
+            size: Response body size in bytes, or None if unknown (streamed)
+        """
+        key = (method, route)
+        with self._lock:
+            self._latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            if size is not None:
+                self._sizes.setdefault(key, Histogram(SIZE_BUCKETS)).observe(size)
+            status_key = (method, route, status)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def record_command(self, command, collection, seconds, documents, failed=False):
+        key = (command, collection)
+        with self._lock:
+            self._commands.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self._documents[key] = self._documents.get(key, 0) + documents
+            if failed:
+                self._command_failures[key] = self._command_failures.get(key, 0) + 1
+
+    def render(self, **gauges):
+        """
+        Render every metric in Prometheus text format.
+
+        Args:
+            gauges: Extra numeric values exported as meta_api_<name>
+        """
+        with self._lock:
+            lines = [
+                '# HELP meta_api_request_duration_seconds Time spent handling API requests.',
+                '# TYPE meta_api_request_duration_seconds histogram',
+            ]
+            for (method, route), histogram in sorted(self._latency.items()):
+                lines += histogram.lines('meta_api_request_duration_seconds',
+                                         f'method="{method}",route="{route}"')
+            lines += [
+                '# HELP meta_api_response_size_bytes Size of API response bodies.',
+                '# TYPE meta_api_response_size_bytes histogram',
+            ]
+            for (method, route), histogram in sorted(self._sizes.items()):
+                lines += histogram.lines('meta_api_response_size_bytes',
+                                         f'method="{method}",route="{route}"')
+            lines += [
+                '# HELP meta_api_responses_total API responses by status code.',
+                '# TYPE meta_api_responses_total counter',
+            ]
+            for (method, route, status), count in sorted(self._statuses.items()):
+                lines.append(f'meta_api_responses_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+            lines += [
+                '# HELP meta_api_mongo_command_duration_seconds Time spent in MongoDB commands.',
+                '# TYPE meta_api_mongo_command_duration_seconds histogram',
+            ]
+            for (command, collection), histogram in sorted(self._commands.items()):
+                lines += histogram.lines('meta_api_mongo_command_duration_seconds',
+                                         f'command="{command}",collection="{collection}"')
+            lines += [
+                '# HELP meta_api_mongo_documents_returned_total Documents returned by MongoDB commands.',
+                '# TYPE meta_api_mongo_documents_returned_total counter',
+            ]
+            for (command, collection), count in sorted(self._documents.items()):
+                lines.append(f'meta_api_mongo_documents_returned_total{{command="{command}",collection="{collection}"}} {count}')
+            lines += [
+                '# HELP meta_api_mongo_command_failures_total Failed MongoDB commands.',
+                '# TYPE meta_api_mongo_command_failures_total counter',
+            ]
+            for (command, collection), count in sorted(self._command_failures.items()):
+                lines.append(f'meta_api_mongo_command_failures_total{{command="{command}",collection="{collection}"}} {count}')
+
+        for name, value in sorted(gauges.items()):
+            lines += [f'# TYPE meta_api_{name} gauge', f'meta_api_{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    pymongo command listener that times every command, counts the documents
+    it returned and logs commands slower than `slow_ms` with their filter shape.
+    Pass it to MongoClient(event_listeners=[...]).
+    """
+
+    def __init__(self, metrics, slow_ms=None):
+        """
+        Initialize the listener.
+
+        Args:
+            metrics: ApiMetrics to record into
+            slow_ms: Log commands slower than this many milliseconds
+                     (default: the SLOW_QUERY_MS environment variable, or 100)
+        """
+        self.metrics = metrics
+        self.slow_ms = slow_ms if slow_ms is not None else float(os.environ.get('SLOW_QUERY_MS', 100))
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    @staticmethod
+    def _key(event):
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        if not isinstance(collection, str):
+            # getMore names the cursor id here and the collection separately
+            collection = command.get('collection', '')
+        shape = {}
+        if 'filter' in command:
+            shape['filter'] = filter_shape(command['filter'])
+        elif 'pipeline' in command:
+            shape['pipeline'] = filter_shape(command['pipeline'])
+        elif 'query' in command:
+            shape['filter'] = filter_shape(command['query'])
+        if 'sort' in command:
+            shape['sort'] = dict(command['sort'])
+        with self._lock:
+            self._pending[self._key(event)] = (collection, shape)
+
+    def _finish(self, event, documents, failed):
+        with self._lock:
+            pending = self._pending.pop(self._key(event), None)
+        if pending is None:
+            return
+        collection, shape = pending
+        seconds = event.duration_micros / 1e6
+        self.metrics.record_command(event.command_name, collection, seconds, documents, failed)
+        if seconds * 1000 >= self.slow_ms:
+            logger.warning(f"Slow MongoDB {event.command_name} on {collection}: {seconds * 1000:.1f} ms, "
+                           f"{documents} documents, shape={shape}")
+
+    def succeeded(self, event):
+        reply = event.reply
+        cursor = reply.get('cursor')
+        if isinstance(cursor, dict):
+            documents = len(cursor.get('firstBatch', cursor.get('nextBatch', [])))
+        elif event.command_name in ('count', 'distinct'):
+            documents = 1
+        else:
+            documents = 0
+        self._finish(event, documents, failed=False)
+
+    def failed(self, event):
+        self._finish(event, 0, failed=True)
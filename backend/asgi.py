@@ -0,0 +1,357 @@
+# backend/asgi.py
+"""
+ASGI entry point for production serving.
+
+Read routes run on an event loop with pymongo's native async client, so a
+slow client holds a coroutine rather than a worker thread. Write routes
+(import, update, delete) are rare admin calls and are passed through to the
+Flask app in main.py, which shares the search index, response cache and
+revision logic with this module. With STORAGE_BACKEND=snapshot there is no
+database to await, so every route is served by the Flask app.
+
+Each worker process keeps its own search index and response cache, and
+polls the committed revision (CACHE_SYNC_INTERVAL) to pick up writes that
+other workers made.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+or:
+    python asgi.py
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from functools import wraps
+from urllib.parse import urlencode
+
+from a2wsgi import WSGIMiddleware
+from pymongo import AsyncMongoClient
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+import main
+from mongo_config import MONGO_URI, client_options, read_preference
+from revision_log import committed_revision
+
+logger = logging.getLogger(__name__)
+
+async_client = AsyncMongoClient(MONGO_URI, read_preference=read_preference(),
+                                event_listeners=[main.command_metrics], **client_options())
+async_db = async_client[main.db.name]
+async_collection = async_db[main.collection.name]
+async_stats = async_db[main.stats_collection.name]
+async_tombstones = async_db[main.tombstones_collection.name]
+async_counters = async_db[main.counters_collection.name]
+
+def render_json(payload, status_code=200):
+    """Build a JSON response, serialized with orjson when it is installed."""
+    if main.orjson is not None:
+        body = main.orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+    return Response(body, status_code=status_code, media_type='application/json')
+
+def cache_key(request):
+    """Same normalization as main.cache_key, so both apps share cache entries."""
+    params = sorted((key, value) for key, value in request.query_params.multi_items() if value != '')
+    return f'{request.url.path}?{urlencode(params)}'
+
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header against an ETag; weak validators match too."""
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == '*' or tag.strip('"') == etag:
+            return True
+    return False
+
+def cached_response(view):
+    """Async counterpart of main.cached_response."""
+    @wraps(view)
+    async def wrapper(request):
+        key = cache_key(request)
+        cached = main.response_cache.get(key)
+        if cached is None:
+            version = main.response_cache.version
+            response = await view(request)
+            if response.status_code != 200:
+                return response
+            body = response.body
+            cached = (body, hashlib.sha1(body).hexdigest())
+            main.response_cache.put(key, cached, version)
+
+        body, etag = cached
+        headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+        if etag_matches(request.headers.get('if-none-match', ''), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type='application/json', headers=headers)
+    return wrapper
+
+@cached_response
+async def get_apps(request):
+    """Async version of main.get_apps."""
+    try:
+        try:
+            query, sort, page, per_page = main.parse_list_params(request.query_params)
+            search = request.query_params.get('q', '').strip()
+            cursor = request.query_params.get('cursor')
+            if cursor and search:
+                raise ValueError('cursor cannot be combined with q; use page instead')
+            if cursor:
+                sort, after = main.decode_cursor(cursor)
+        except ValueError as e:
+            return render_json({'error': str(e)}, 400)
+
+        if search:
+            return render_json(await search_apps(search, query, page, per_page))
+
+        if cursor:
+            keyset = main.keyset_filter(sort, after)
+            query = {'$and': [query, keyset]} if query else keyset
+            apps = await async_collection.find(query, {'_id': 0}).sort(sort).limit(per_page).to_list()
+            result = {'success': True, 'data': apps, 'per_page': per_page}
+        else:
+            if query:
+                total = await async_collection.count_documents(query)
+            else:
+                total = await async_collection.estimated_document_count()
+
+            apps = await (async_collection.find(query, {'_id': 0})
+                          .sort(sort)
+                          .skip((page - 1) * per_page)
+                          .limit(per_page)
+                          .to_list())
+            result = {
+                'success': True,
+                'data': apps,
+                'page': page,
+                'per_page': per_page,
+                'total': total,
+                'total_pages': (total + per_page - 1) // per_page
+            }
+
+        result['next_cursor'] = main.encode_cursor(sort, apps[-1]) if len(apps) == per_page else None
+        return render_json(result)
+
+    except Exception as e:
+        logger.error(f"Error fetching apps: {e}")
+        return render_json({'error': str(e)}, 500)
+
+async def search_apps(search, query, page, per_page):
+    """Async version of main.search_apps; ranking still runs on the shared in-process index."""
+    min_rating = query.get('ratings', {}).get('$gte')
+    # Ranking is CPU-bound and takes the index lock, so it must not block the event loop
+    ranked = await run_in_threadpool(main.search_index.search, search, category=query.get('category'),
+                                     min_rating=min_rating)
+    page_hits = ranked[(page - 1) * per_page:page * per_page]
+
+    scores = dict(page_hits)
+    found = await async_collection.find({'app_id': {'$in': list(scores)}}, {'_id': 0}).to_list()
+    apps_by_id = {app_data['app_id']: app_data for app_data in found}
+    apps = [{**apps_by_id[app_id], 'score': round(score, 4)}
+            for app_id, score in page_hits if app_id in apps_by_id]
+
+    total = len(ranked)
+    return {
+        'success': True,
+        'data': apps,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'total_pages': (total + per_page - 1) // per_page,
+        'next_cursor': None
+    }
+
+@cached_response
+async def get_app(request):
+    app_id = request.path_params['app_id']
+    try:
+        app_data = await async_collection.find_one({'app_id': app_id})
+        if app_data:
+            return render_json(main.parse_json(app_data))
+        return render_json({'error': 'App not found'}, 404)
+    except Exception as e:
+        logger.error(f"Error fetching app {app_id}: {e}")
+        return render_json({'error': str(e)}, 500)
+
+async def get_changes(request):
+    """Async version of main.get_changes."""
+    try:
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params.get('limit', main.DEFAULT_CHANGES_LIMIT))
+        except ValueError:
+            return render_json({'error': 'since and limit must be integers'}, 400)
+        if since < 0 or not 1 <= limit <= main.MAX_CHANGES_LIMIT:
+            return render_json({'error': f'since must be >= 0 and limit between 1 and {main.MAX_CHANGES_LIMIT}'}, 400)
+
+        counter = await async_counters.find_one({'_id': 'revision'})
+        latest = committed_revision(counter)
+        after = {'revision': {'$gt': since, '$lte': latest}}
+        upserts = await async_collection.find(after, {'_id': 0}).sort('revision', 1).limit(limit + 1).to_list()
+        deletes = await async_tombstones.find(after, {'_id': 0}).sort('revision', 1).limit(limit + 1).to_list()
+        changes = [{'op': 'upsert', 'revision': app_data['revision'], 'app': app_data} for app_data in upserts]
+        changes += [{'op': 'delete', 'revision': tombstone['revision'], 'app_id': tombstone['app_id'],
+                     'deleted_at': tombstone['deleted_at']} for tombstone in deletes]
+        changes.sort(key=lambda change: change['revision'])
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return render_json({
+            'success': True,
+            'changes': changes,
+            'since': since,
+            'next_since': changes[-1]['revision'] if changes else since,
+            'has_more': has_more,
+            'latest_revision': latest
+        })
+    except Exception as e:
+        logger.error(f"Error fetching changes: {e}")
+        return render_json({'error': str(e)}, 500)
+
+async def get_catalog_stats():
+    stats = await async_stats.find_one({'_id': 'catalog'}, {'_id': 0, 'sums': 0})
+    if stats is None:
+        # First use: build it with the sync client off the event loop
+        stats = await run_in_threadpool(main.get_catalog_stats)
+    return stats
+
+@cached_response
+async def get_stats(request):
+    try:
+        return render_json({'success': True, **await get_catalog_stats()})
+    except Exception as e:
+        logger.error(f"Error fetching stats: {e}")
+        return render_json({'error': str(e)}, 500)
+
+@cached_response
+async def get_categories(request):
+    try:
+        stats = await get_catalog_stats()
+        categories = sorted((group['category'] for group in stats['categories']),
+                            key=lambda category: category or '')
+        return render_json({'categories': categories})
+    except Exception as e:
+        logger.error(f"Error fetching categories: {e}")
+        return render_json({'error': str(e)}, 500)
+
+async def export_apps(request):
+    """Async version of main.export_apps; a slow reader only holds a coroutine."""
+    try:
+        query = main.parse_list_params(request.query_params)[0]
+        projection = main.parse_export_fields(request.query_params.get('fields'))
+        export_format = request.query_params.get('format', 'ndjson')
+        if export_format not in ('ndjson', 'json'):
+            raise ValueError('format must be ndjson or json')
+    except ValueError as e:
+        return render_json({'error': str(e)}, 400)
+
+    cursor = async_collection.find(query, projection).sort('app_id', 1).batch_size(main.EXPORT_BATCH_SIZE)
+
+    async def generate():
+        buffer = bytearray(b'[' if export_format == 'json' else b'')
+        try:
+            count = 0
+            async for document in cursor:
+                if export_format == 'json':
+                    if count:
+                        buffer += b','
+                    buffer += main.dumps_line(document)
+                else:
+                    buffer += main.dumps_line(document) + b'\n'
+                count += 1
+                if len(buffer) >= main.EXPORT_CHUNK_BYTES:
+                    yield bytes(buffer)
+                    buffer.clear()
+            if export_format == 'json':
+                buffer += b']'
+            if buffer:
+                yield bytes(buffer)
+        except Exception as e:
+            logger.error(f"Error exporting apps: {e}")
+            raise
+        finally:
+            await cursor.close()
+
+    media_type = 'application/x-ndjson' if export_format == 'ndjson' else 'application/json'
+    return StreamingResponse(generate(), media_type=media_type)
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, response size and status for the async routes into
+    main.api_metrics. Requests passed through to Flask are recorded by its
+    own hooks. Latency covers the whole response, including streamed bodies.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        response = {'status': 500, 'size': 0}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            elif message['type'] == 'http.response.body':
+                response['size'] += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            if isinstance(route, Route):
+                # Same route labels as Flask's /api/apps/<app_id>
+                path = route.path.replace('{', '<').replace('}', '>')
+                main.api_metrics.record_request(scope['method'], path, response['status'],
+                                                time.perf_counter() - started, response['size'])
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await async_client.close()
+
+routes = []
+if main.STORAGE_BACKEND == 'mongo':
+    routes += [
+        Route('/api/apps', get_apps, methods=['GET']),
+        Route('/api/apps/changes', get_changes, methods=['GET']),
+        Route('/api/apps/{app_id}', get_app, methods=['GET']),
+        Route('/api/stats', get_stats, methods=['GET']),
+        Route('/api/categories', get_categories, methods=['GET']),
+        Route('/api/export', export_apps, methods=['GET']),
+    ]
+# Everything else (import, PUT, DELETE, CORS preflight) is served by the Flask app
+routes.append(Mount('/', app=WSGIMiddleware(main.app, workers=int(os.environ.get('WSGI_THREADS', 10)))))
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+        Middleware(RequestMetricsMiddleware),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(
+        'asgi:app',
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=int(os.environ.get('PORT', 5000)),
+        workers=int(os.environ.get('WEB_CONCURRENCY', 1)),
+        proxy_headers=True,
+    )
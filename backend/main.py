@@ -1,11 +1,33 @@
 # backend/app.py
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
 from flask_pymongo import PyMongo
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
 from flask_cors import CORS
 from bson import ObjectId
+from functools import wraps
+from urllib.parse import urlencode
+from api_metrics import ApiMetrics, MongoCommandMetrics
+from mongo_config import MONGO_DB_NAME, MONGO_URI, client_options
+from response_cache import ResponseCache
+from revision_log import RevisionLog
+from search_index import SearchIndex
+from snapshot_store import SnapshotStore
+import base64
+import hashlib
+import json
 import os
 import logging
+import math
+import re
+import threading
+import time
+import uuid
+
+try:
+    import orjson
+except ImportError:  # optional, speeds up /api/export
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -17,85 +39,719 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)  # Enable Cross-Origin Resource Sharing
 
+# Request and MongoDB command metrics served on /metrics
+api_metrics = ApiMetrics()
+command_metrics = MongoCommandMetrics(api_metrics)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # The route template keeps one series per endpoint rather than per app_id
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        size = None if response.is_streamed else response.calculate_content_length()
+        api_metrics.record_request(request.method, route, response.status_code,
+                                   time.perf_counter() - started, size)
+    return response
+
 # MongoDB configuration
 # app.config["MONGO_URI"] = os.environ.get("MONGO_URI", "mongodb://localhost:27017/meta_store")
 # mongo = PyMongo(app)
 # print(mongo)
 
 try:
-    client = MongoClient('mongodb://localhost:27017/')
-    db = client['meta_store']  # Use your actual database name
+    client = MongoClient(MONGO_URI, event_listeners=[command_metrics], **client_options())
+    db = client[MONGO_DB_NAME]  # Use your actual database name
     collection = db['meta_store']  # Use your actual collection name
+    # Materialized catalog summary served by /api/stats
+    stats_collection = db['meta_store_stats']
+    # Revision counter and delete markers for /api/apps/changes
+    counters_collection = db['meta_store_counters']
+    tombstones_collection = db['meta_store_tombstones']
 
     print("Connected to MongoDB successfully!")
 except Exception as e:
     print(f"MongoDB connection error: {e}")
 
+# Fields /api/apps can sort by; each has a compound index with app_id
+SORTABLE_FIELDS = ('app_name', 'ratings', 'num_reviews', 'category', 'app_id')
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+IMPORT_BATCH_SIZE = 500
+DEFAULT_CHANGES_LIMIT = 100
+MAX_CHANGES_LIMIT = 1000
+# Fields the API stamps on every write; clients cannot set them
+SYSTEM_FIELDS = ('_id', 'revision', 'updated_at')
+# Documents fetched per MongoDB round trip, and bytes buffered per chunk, when exporting
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Thumbnails written by the scraper's --image-cache stage, named by the SHA-256 of their bytes
+IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR', os.path.join(os.path.dirname(__file__), '..', 'image_cache'))
+IMAGE_MIMETYPES = {'jpg': 'image/jpeg', 'png': 'image/png', 'gif': 'image/gif', 'webp': 'image/webp'}
+IMAGE_MAX_AGE = 365 * 24 * 3600
+# Seconds between checks for writes made by other server processes (0 disables the check)
+CACHE_SYNC_INTERVAL = float(os.environ.get('CACHE_SYNC_INTERVAL', 1))
+# Changed apps past which a sync rebuilds the search index instead of updating it app by app
+SYNC_REINDEX_LIMIT = 1000
+
+class MongoStorage:
+    """Read queries of the API answered by the MongoDB collection."""
+
+    writable = True
+
+    def find_page(self, query, sort, page, per_page):
+        """Return (apps, total) for one page of a filtered, sorted listing."""
+        # An unfiltered count can come from collection metadata instead of a scan
+        if query:
+            total = collection.count_documents(query)
+        else:
+            total = collection.estimated_document_count()
+
+        apps = list(collection.find(query, {'_id': 0})
+                    .sort(sort)
+                    .skip((page - 1) * per_page)
+                    .limit(per_page))
+        return apps, total
+
+    def find_after(self, query, sort, after, per_page):
+        """Return the page of apps that follows the keyset `after` in `sort` order."""
+        keyset = keyset_filter(sort, after)
+        query = {'$and': [query, keyset]} if query else keyset
+        return list(collection.find(query, {'_id': 0})
+                    .sort(sort)
+                    .limit(per_page))
+
+    def get(self, app_id):
+        return collection.find_one({'app_id': app_id})
+
+    def get_many(self, app_ids):
+        return {app_data['app_id']: app_data
+                for app_data in collection.find({'app_id': {'$in': list(app_ids)}}, {'_id': 0})}
+
+    def iter_apps(self, query=None, projection=None):
+        """Cursor over apps in app_id order, read in batches."""
+        return collection.find(query or {}, projection).sort('app_id', 1).batch_size(EXPORT_BATCH_SIZE)
+
+    def stats(self):
+        return get_catalog_stats()
+
+    def watch(self, on_reload):
+        """
+        Poll the committed revision in a daemon thread, so writes made by
+        other server processes reach this process's search index and
+        response cache within CACHE_SYNC_INTERVAL seconds.
+        """
+        if not CACHE_SYNC_INTERVAL:
+            return
+
+        def run():
+            seen = revision_log.committed()
+            stop = threading.Event()
+            while not stop.wait(CACHE_SYNC_INTERVAL):
+                try:
+                    committed = revision_log.committed()
+                    if committed != seen:
+                        sync_committed_changes(seen, committed, on_reload)
+                        seen = committed
+                except Exception as e:
+                    logger.warning(f"Could not sync caches with the revision log: {e}")
+
+        threading.Thread(target=run, name='revision-sync', daemon=True).start()
+
+# 'mongo', or 'snapshot' to serve the scraper's JSON/NDJSON output from memory without a database
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')
+
+if STORAGE_BACKEND == 'snapshot':
+    storage = SnapshotStore(
+        os.environ.get('SNAPSHOT_PATH', os.path.join(os.path.dirname(__file__), '..', 'meta_quest_apps.json')),
+        SORTABLE_FIELDS,
+        reload_interval=float(os.environ.get('SNAPSHOT_RELOAD_INTERVAL', 2))
+    )
+elif STORAGE_BACKEND == 'mongo':
+    storage = MongoStorage()
+else:
+    raise ValueError('STORAGE_BACKEND must be mongo or snapshot')
+
+def ensure_indexes(target=None):
+    """Create the indexes the API queries rely on (on `collection` by default)."""
+    target = collection if target is None else target
+    try:
+        # Category filter with rating range/sort
+        target.create_index([('category', 1), ('ratings', -1), ('app_id', -1)])
+        # Sort orders; app_id breaks ties so pages are stable
+        for field in SORTABLE_FIELDS:
+            if field != 'app_id':
+                target.create_index([(field, 1), ('app_id', 1)])
+        target.create_index('app_id', unique=True)
+        # Change feed
+        target.create_index('revision')
+    except Exception as e:
+        # A failing unique index usually means duplicate app_ids from older imports
+        logger.warning(f"Could not create indexes: {e}")
+
+if storage.writable:
+    ensure_indexes()
+
+    try:
+        tombstones_collection.create_index('revision')
+        tombstones_collection.create_index('app_id', unique=True)
+    except Exception as e:
+        logger.warning(f"Could not create tombstone indexes: {e}")
+
+# Write lock and committed high-water mark shared by every server process
+revision_log = RevisionLog(counters_collection, lock_timeout=float(os.environ.get('WRITE_LOCK_TIMEOUT', 60)))
+
+def requires_writable_storage(view):
+    """Answer 501 from endpoints that need MongoDB when serving a read-only snapshot."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not storage.writable:
+            return jsonify({'error': f'{request.method} {request.path} is not available in snapshot mode'}), 501
+        return view(*args, **kwargs)
+    return wrapper
+
+def stamp_revisions(writer, apps):
+    """Set a fresh revision and updated_at on each app, in order."""
+    first = writer.allocate(len(apps))
+    now = time.time()
+    for offset, app_data in enumerate(apps):
+        app_data['revision'] = first + offset
+        app_data['updated_at'] = now
+
+def record_tombstones(writer, app_ids):
+    """Record deletes so /api/apps/changes can report them."""
+    app_ids = list(app_ids)
+    if not app_ids:
+        return
+    first = writer.allocate(len(app_ids))
+    now = time.time()
+    tombstones_collection.bulk_write([
+        UpdateOne({'app_id': app_id}, {'$set': {'revision': first + offset, 'deleted_at': now}}, upsert=True)
+        for offset, app_id in enumerate(app_ids)
+    ], ordered=False)
+
+# Fields the search index needs from each app
+SEARCH_FIELDS = {'_id': 0, 'app_id': 1, 'app_name': 1, 'description': 1, 'category': 1, 'ratings': 1}
+
+search_index = SearchIndex()
+
+def load_search_index():
+    """Build the full-text search index from the whole catalog."""
+    try:
+        search_index.rebuild(storage.iter_apps(projection=SEARCH_FIELDS))
+        logger.info(f"Search index built with {len(search_index)} apps")
+    except Exception as e:
+        logger.warning(f"Could not build search index: {e}")
+
+def reindex_apps(app_ids):
+    """Refresh the search index entries of the given apps from the collection."""
+    for app_data in collection.find({'app_id': {'$in': list(app_ids)}}, SEARCH_FIELDS):
+        search_index.add(app_data)
+
+load_search_index()
+
+REVIEW_PERCENTILES = (50, 90, 99)
+
+# Fields of an app that feed the catalog summary
+STATS_FIELDS = {'_id': 0, 'category': 1, 'ratings': 1, 'num_reviews': 1}
+# Rating sums are kept at this precision, so sums adjusted app by app match a fresh aggregate
+RATING_SUM_DIGITS = 6
+
+def compute_stats():
+    """
+    Summarize the catalog: per-category counts, a half-star rating
+    histogram and review-count percentiles.
+
+    Counts come from one aggregation pass over the collection. Each
+    percentile walks the (num_reviews, app_id) index up to its rank, so a
+    rebuild is linear in the catalog size and only runs after clear=true
+    imports; other writes adjust the summary with adjust_stats().
+    """
+    facets = next(collection.aggregate([{'$facet': {
+        'categories': [
+            {'$group': {'_id': '$category', 'count': {'$sum': 1},
+                        'rated': {'$sum': {'$cond': [{'$isNumber': '$ratings'}, 1, 0]}},
+                        'rating_sum': {'$sum': '$ratings'}}},
+            {'$sort': {'count': -1, '_id': 1}}
+        ],
+        'ratings': [
+            {'$group': {'_id': {'$multiply': [{'$floor': {'$multiply': ['$ratings', 2]}}, 0.5]},
+                        'count': {'$sum': 1}}},
+            {'$sort': {'_id': 1}}
+        ],
+        'totals': [
+            {'$group': {'_id': None, 'count': {'$sum': 1},
+                        'total_reviews': {'$sum': '$num_reviews'}, 'max_reviews': {'$max': '$num_reviews'}}}
+        ]
+    }}]))
+    totals = facets['totals'][0] if facets['totals'] else {'count': 0, 'total_reviews': 0, 'max_reviews': None}
+    for group in facets['categories']:
+        group['rating_sum'] = round(group['rating_sum'], RATING_SUM_DIGITS)
+
+    reviewed_query = {'num_reviews': {'$gte': 0}}
+    reviewed = collection.count_documents(reviewed_query)
+    percentiles = {}
+    for percentile in REVIEW_PERCENTILES:
+        if not reviewed:
+            percentiles[f'p{percentile}'] = None
+            continue
+        # Nearest-rank percentile
+        rank = max(0, -(-percentile * reviewed // 100) - 1)
+        app_data = next(collection.find(reviewed_query, {'_id': 0, 'num_reviews': 1})
+                        .sort([('num_reviews', 1), ('app_id', 1)]).skip(rank).limit(1), None)
+        percentiles[f'p{percentile}'] = app_data['num_reviews'] if app_data else None
+
+    return {
+        'total_apps': totals['count'],
+        'categories': [
+            {'category': group['_id'], 'count': group['count'],
+             'avg_rating': round(group['rating_sum'] / group['rated'], 2) if group['rated'] else None}
+            for group in facets['categories']
+        ],
+        'rating_histogram': [
+            {'rating': group['_id'], 'count': group['count']}
+            for group in facets['ratings'] if group['_id'] is not None
+        ],
+        'unrated': sum(group['count'] for group in facets['ratings'] if group['_id'] is None),
+        'num_reviews': {
+            'total': totals['total_reviews'],
+            'mean': round(totals['total_reviews'] / reviewed, 2) if reviewed else None,
+            'max': totals['max_reviews'],
+            **percentiles
+        },
+        # Running sums that let updates and deletes adjust the averages; not part of /api/stats
+        'sums': {
+            'categories': [{'category': group['_id'], 'rated': group['rated'], 'rating_sum': group['rating_sum']}
+                           for group in facets['categories']],
+            'reviewed': reviewed
+        },
+        'updated_at': time.time()
+    }
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def apply_stats_delta(stats, app_data, sign):
+    """
+    Add (sign=1) or remove (sign=-1) one app's contribution to a summary in place.
+
+    Returns:
+        Whether num_reviews.max may have been removed and must be looked up again
+    """
+    category, rating, reviews = app_data.get('category'), app_data.get('ratings'), app_data.get('num_reviews')
+    stats['total_apps'] += sign
+
+    groups = {group['category']: group for group in stats['categories']}
+    sums = {group['category']: group for group in stats['sums']['categories']}
+    if category not in groups:
+        groups[category] = {'category': category, 'count': 0, 'avg_rating': None}
+        sums[category] = {'category': category, 'rated': 0, 'rating_sum': 0}
+    group, group_sums = groups[category], sums[category]
+    group['count'] += sign
+    if is_number(rating):
+        group_sums['rated'] += sign
+        group_sums['rating_sum'] = round(group_sums['rating_sum'] + sign * rating, RATING_SUM_DIGITS)
+        group['avg_rating'] = (round(group_sums['rating_sum'] / group_sums['rated'], 2)
+                               if group_sums['rated'] else None)
+    # Same order as the aggregation: largest first, then by category with None first
+    stats['categories'] = sorted((group for group in groups.values() if group['count'] > 0),
+                                 key=lambda group: (-group['count'], group['category'] is not None,
+                                                    group['category'] or ''))
+    stats['sums']['categories'] = [sums[group['category']] for group in stats['categories']]
+
+    if is_number(rating):
+        bucket = math.floor(rating * 2) * 0.5
+        buckets = {entry['rating']: entry for entry in stats['rating_histogram']}
+        entry = buckets.setdefault(bucket, {'rating': bucket, 'count': 0})
+        entry['count'] += sign
+        stats['rating_histogram'] = sorted((entry for entry in buckets.values() if entry['count'] > 0),
+                                           key=lambda entry: entry['rating'])
+    else:
+        stats['unrated'] += sign
+
+    summary = stats['num_reviews']
+    if not is_number(reviews):
+        return False
+    summary['total'] += sign * reviews
+    if reviews >= 0:
+        stats['sums']['reviewed'] += sign
+    reviewed = stats['sums']['reviewed']
+    summary['mean'] = round(summary['total'] / reviewed, 2) if reviewed else None
+    if sign > 0:
+        if summary['max'] is None or reviews > summary['max']:
+            summary['max'] = reviews
+        return False
+    return reviews == summary['max']
+
+def adjust_stats(changes):
+    """
+    Update the materialized summary for written apps instead of rebuilding it.
+
+    `changes` holds a (before, after) pair per app written, with the app as
+    it was before the write (None if it is new) and as it is after (None if
+    it was deleted). Review-count percentiles are kept from the last
+    rebuild until the next clear=true import. Callers hold the write lock,
+    so the read-modify-write cannot interleave with other writers.
+    """
+    try:
+        stats = stats_collection.find_one({'_id': 'catalog'}, {'_id': 0})
+        if stats is None or 'sums' not in stats:
+            # Nothing to adjust yet, or a summary from before the running sums existed
+            return refresh_stats()
+        max_removed = False
+        for before, after in changes:
+            if before is not None:
+                max_removed = apply_stats_delta(stats, before, -1) or max_removed
+            if after is not None:
+                apply_stats_delta(stats, after, 1)
+        if max_removed:
+            # The writes are already applied, so the index has the new max
+            top = next(collection.find({'num_reviews': {'$type': 'number'}}, {'_id': 0, 'num_reviews': 1})
+                       .sort('num_reviews', -1).limit(1), None)
+            stats['num_reviews']['max'] = top['num_reviews'] if top else None
+        stats['updated_at'] = time.time()
+        stats_collection.replace_one({'_id': 'catalog'}, stats, upsert=True)
+        return stats
+    except Exception as e:
+        logger.warning(f"Could not update catalog stats: {e}")
+        return None
+
+def refresh_stats():
+    """Rebuild the materialized catalog summary from the whole collection."""
+    try:
+        stats = compute_stats()
+        stats_collection.replace_one({'_id': 'catalog'}, stats, upsert=True)
+        return stats
+    except Exception as e:
+        logger.warning(f"Could not refresh catalog stats: {e}")
+        return None
+
+def public_stats(stats):
+    """Drop the running sums that only adjust_stats() needs."""
+    return {field: value for field, value in stats.items() if field != 'sums'}
+
+def get_catalog_stats():
+    """Return the materialized catalog summary, building it on first use."""
+    stats = stats_collection.find_one({'_id': 'catalog'}, {'_id': 0, 'sums': 0})
+    if stats is None:
+        stats = public_stats(refresh_stats() or compute_stats())
+    return stats
+
+# Rendered GET responses, dropped whenever the data changes
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('RESPONSE_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('RESPONSE_CACHE_TTL', 300))
+)
+
+def reload_caches():
+    """Rebuild what was derived from the catalog once it changed under this process."""
+    load_search_index()
+    response_cache.invalidate()
+
+def sync_committed_changes(since, latest, on_reload):
+    """Bring the search index and response cache up to date with writes committed in (since, latest]."""
+    window = {'revision': {'$gt': since, '$lte': latest}}
+    if latest < since or (collection.count_documents(window) +
+                          tombstones_collection.count_documents(window)) > SYNC_REINDEX_LIMIT:
+        # A full import, or a reset database: rebuilding is cheaper than replaying
+        on_reload()
+        return
+    # Deletes first: an app deleted and then written again in the window is live
+    for tombstone in tombstones_collection.find(window, {'_id': 0, 'app_id': 1}):
+        search_index.remove(tombstone['app_id'])
+    reindex_apps(app_data['app_id'] for app_data in collection.find(window, {'_id': 0, 'app_id': 1}))
+    response_cache.invalidate()
+
+storage.watch(reload_caches)
+
+def cache_key():
+    """Key a request by path and its non-empty query parameters in sorted order."""
+    params = sorted((key, value) for key, value in request.args.items(multi=True) if value != '')
+    return f'{request.path}?{urlencode(params)}'
+
+def cached_response(view):
+    """
+    Serve a JSON view from response_cache and answer conditional requests.
+
+    Successful responses are cached and carry an ETag derived from the body,
+    so a client sending it back in If-None-Match gets a bodyless 304 while
+    the data is unchanged. Error responses are never cached.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = cache_key()
+        cached = response_cache.get(key)
+        if cached is None:
+            version = response_cache.version
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            cached = (body, hashlib.sha1(body).hexdigest())
+            response_cache.put(key, cached, version)
+
+        body, etag = cached
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        # Let clients keep the body but revalidate it on every use
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+    return wrapper
+
+def parse_list_params(args):
+    """
+    Parse /api/apps query parameters.
+
+    Returns:
+        Tuple of (filter, sort spec, page, per_page)
+
+    Raises:
+        ValueError: If a parameter is malformed
+    """
+    try:
+        page = int(args.get('page', 1))
+        per_page = int(args.get('per_page', DEFAULT_PER_PAGE))
+        sort_order = int(args.get('sort_order', 1))  # 1 for ascending, -1 for descending
+        min_rating = args.get('min_rating')
+        min_rating = float(min_rating) if min_rating else None
+    except ValueError:
+        raise ValueError('page, per_page, sort_order and min_rating must be numbers')
+
+    if page < 1:
+        raise ValueError('page must be at least 1')
+    if not 1 <= per_page <= MAX_PER_PAGE:
+        raise ValueError(f'per_page must be between 1 and {MAX_PER_PAGE}')
+    if sort_order not in (1, -1):
+        raise ValueError('sort_order must be 1 or -1')
+
+    sort_by = args.get('sort_by', 'app_name')
+    if sort_by not in SORTABLE_FIELDS:
+        raise ValueError(f"sort_by must be one of: {', '.join(SORTABLE_FIELDS)}")
+
+    # Build filter query
+    query = {}
+    category = args.get('category')
+    if category:
+        query['category'] = category
+    if min_rating is not None:
+        query['ratings'] = {'$gte': min_rating}
+
+    sort = [(sort_by, sort_order)]
+    if sort_by != 'app_id':
+        sort.append(('app_id', sort_order))
+
+    return query, sort, page, per_page
+
+def encode_cursor(sort, last_app):
+    """Build an opaque cursor that resumes after last_app in the given sort order."""
+    payload = {
+        'sort': sort,
+        'after': [last_app.get(field) for field, _ in sort],
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor from encode_cursor.
+
+    Returns:
+        Tuple of (sort spec, last seen values)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        sort = [(field, order) for field, order in payload['sort']]
+        after = list(payload['after'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+    if (not sort or len(sort) != len(after) or sort[-1][0] != 'app_id'
+            or any(field not in SORTABLE_FIELDS or order not in (1, -1) for field, order in sort)):
+        raise ValueError('Invalid cursor')
+    return sort, after
+
+def keyset_filter(sort, after):
+    """
+    Range filter matching documents strictly after `after` in `sort` order.
+
+    For a sort of (field, app_id) this is
+    field > v OR (field == v AND app_id > id), which the (field, app_id)
+    compound index answers without scanning earlier documents.
+    """
+    clauses = []
+    for i, (field, order) in enumerate(sort):
+        clause = after_value_clause(field, order, after[i])
+        if clause is None:
+            continue
+        equal = {prev_field: after[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        clauses.append({**equal, **clause} if equal else clause)
+    if not clauses:
+        # The last document was the final one in sort order
+        return {'app_id': {'$in': []}}
+    return clauses[0] if len(clauses) == 1 else {'$or': clauses}
+
+def after_value_clause(field, order, value):
+    """
+    Condition for `field` sorting strictly after `value`, or None if nothing does.
+
+    MongoDB sorts null and missing values before every number and string,
+    but $gt and $lt only compare values of the same type, so null needs
+    its own conditions: in ascending order every non-null value follows it,
+    and in descending order null follows every value.
+    """
+    if value is None:
+        return {field: {'$ne': None}} if order == 1 else None
+    if order == 1:
+        return {field: {'$gt': value}}
+    return {'$or': [{field: {'$lt': value}}, {field: None}]}
+
 # Helper function to convert MongoDB ObjectId to string
 def parse_json(data):
     if isinstance(data, list):
-        return [{**item, '_id': str(item['_id'])} for item in data]
+        return [parse_json(item) for item in data]
+    elif '_id' not in data:
+        # Snapshot apps have no ObjectId
+        return data
     else:
         return {**data, '_id': str(data['_id'])}
 
 @app.route('/api/apps', methods=['GET'])
-@app.route('/api/apps')
+@cached_response
 def get_apps():
-    apps = list(collection.find({}, {'_id': 0}))
-    return jsonify({"success": True, "data": apps})
-# def get_apps():
-#     """Get all apps with optional filtering, pagination, and search."""
-#     try:
-#         # Query parameters
-#         page = int(request.args.get('page', 1))
-#         per_page = int(request.args.get('per_page', 10))
-#         category = request.args.get('category')
-#         min_rating = request.args.get('min_rating')
-#         search_query = request.args.get('q')
-#         sort_by = request.args.get('sort_by', 'app_name')
-#         sort_order = int(request.args.get('sort_order', 1))  # 1 for ascending, -1 for descending
-        
-#         # Build filter query
-#         query = {}
-#         if category:
-#             query['category'] = category
-#         if min_rating:
-#             query['ratings'] = {'$gte': float(min_rating)}
-#         if search_query:
-#             query['$or'] = [
-#                 {'app_name': {'$regex': search_query, '$options': 'i'}},
-#                 {'description': {'$regex': search_query, '$options': 'i'}}
-#             ]
-        
-#         # Get total number of matching documents
-#         total = mongo.db.apps.count_documents(query)
-        
-#         # Apply pagination and sorting
-#         apps = list(mongo.db.apps.find(query)
-#                     .sort(sort_by, sort_order)
-#                     .skip((page - 1) * per_page)
-#                     .limit(per_page))
-        
-#         # Prepare response
-#         result = {
-#             'apps': parse_json(apps),
-#             'page': page,
-#             'per_page': per_page,
-#             'total': total,
-#             'total_pages': (total + per_page - 1) // per_page  # Ceiling division
-#         }
-        
-#         return jsonify(result)
-    
-#     except Exception as e:
-#         logger.error(f"Error fetching apps: {e}")
-#         return jsonify({'error': str(e)}), 500
+    """
+    Get apps with optional filtering, sorting and pagination.
+
+    Pages can be addressed by `page` number or, for deep pages, by the
+    `cursor` returned as `next_cursor` on the previous page. Cursor requests
+    resume with a range query instead of skipping earlier documents; the
+    cursor carries its own sort order.
+    """
+    try:
+        try:
+            query, sort, page, per_page = parse_list_params(request.args)
+            search = request.args.get('q', '').strip()
+            cursor = request.args.get('cursor')
+            if cursor and search:
+                raise ValueError('cursor cannot be combined with q; use page instead')
+            if cursor:
+                sort, after = decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if search:
+            return jsonify(search_apps(search, query, page, per_page))
+
+        if cursor:
+            apps = storage.find_after(query, sort, after, per_page)
+            result = {'success': True, 'data': apps, 'per_page': per_page}
+        else:
+            apps, total = storage.find_page(query, sort, page, per_page)
+            result = {
+                'success': True,
+                'data': apps,
+                'page': page,
+                'per_page': per_page,
+                'total': total,
+                'total_pages': (total + per_page - 1) // per_page  # Ceiling division
+            }
+
+        # A short page means there is nothing left to fetch
+        result['next_cursor'] = encode_cursor(sort, apps[-1]) if len(apps) == per_page else None
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"Error fetching apps: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def search_apps(search, query, page, per_page):
+    """
+    Rank apps matching a free-text query and return one page of them.
+
+    Matching and ranking happen in search_index; only the apps on the
+    requested page are read from storage.
+    """
+    min_rating = query.get('ratings', {}).get('$gte')
+    ranked = search_index.search(search, category=query.get('category'), min_rating=min_rating)
+    page_hits = ranked[(page - 1) * per_page:page * per_page]
+
+    scores = dict(page_hits)
+    apps_by_id = storage.get_many(scores)
+    apps = []
+    for app_id, score in page_hits:
+        # The index can briefly lag behind deletes made by another process
+        if app_id in apps_by_id:
+            apps.append({**apps_by_id[app_id], 'score': round(score, 4)})
+
+    total = len(ranked)
+    return {
+        'success': True,
+        'data': apps,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'total_pages': (total + per_page - 1) // per_page,
+        'next_cursor': None
+    }
+
+@app.route('/api/apps/changes', methods=['GET'])
+@requires_writable_storage
+def get_changes():
+    """
+    List inserts, updates and deletes made after revision `since`.
+
+    Changes come back in revision order, at most `limit` per page. Pass
+    `next_since` back as `since` until `has_more` is false. Both sources
+    are read through their revision index, so a sync costs time
+    proportional to the number of changes rather than the catalog size.
+    Only revisions up to the committed high-water mark are listed, so a
+    write still in progress in any server process is never skipped.
+    """
+    try:
+        try:
+            since = int(request.args.get('since', 0))
+            limit = int(request.args.get('limit', DEFAULT_CHANGES_LIMIT))
+        except ValueError:
+            return jsonify({'error': 'since and limit must be integers'}), 400
+        if since < 0 or not 1 <= limit <= MAX_CHANGES_LIMIT:
+            return jsonify({'error': f'since must be >= 0 and limit between 1 and {MAX_CHANGES_LIMIT}'}), 400
+
+        latest = revision_log.committed()
+        after = {'revision': {'$gt': since, '$lte': latest}}
+        # Fetch one extra change to learn whether another page follows
+        upserts = collection.find(after, {'_id': 0}).sort('revision', 1).limit(limit + 1)
+        deletes = tombstones_collection.find(after, {'_id': 0}).sort('revision', 1).limit(limit + 1)
+        changes = [{'op': 'upsert', 'revision': app_data['revision'], 'app': app_data} for app_data in upserts]
+        changes += [{'op': 'delete', 'revision': tombstone['revision'], 'app_id': tombstone['app_id'],
+                     'deleted_at': tombstone['deleted_at']} for tombstone in deletes]
+        changes.sort(key=lambda change: change['revision'])
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return jsonify({
+            'success': True,
+            'changes': changes,
+            'since': since,
+            'next_since': changes[-1]['revision'] if changes else since,
+            'has_more': has_more,
+            'latest_revision': latest
+        })
+    except Exception as e:
+        logger.error(f"Error fetching changes: {e}")
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/api/apps/<app_id>', methods=['GET'])
+@cached_response
 def get_app(app_id):
     """Get a single app by ID."""
     try:
-        app = mongo.db.apps.find_one({'app_id': app_id})
+        app = storage.get(app_id)
         if app:
             return jsonify(parse_json(app))
         else:
@@ -105,6 +761,7 @@ def get_app(app_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/apps/<app_id>', methods=['PUT'])
+@requires_writable_storage
 def update_app(app_id):
     """Update an app's details."""
     try:
@@ -112,74 +769,403 @@ def update_app(app_id):
         # Prevent overwriting the app_id
         if 'app_id' in data:
             del data['app_id']
+        for field in SYSTEM_FIELDS:
+            data.pop(field, None)
+        with revision_log.writer() as writer:
+            # app_id keeps the pre-image non-empty for apps without any stats field
+            before = collection.find_one({'app_id': app_id}, {**STATS_FIELDS, 'app_id': 1})
+            if not before:
+                return jsonify({'error': 'App not found'}), 404
+            stamp_revisions(writer, [data])
             
-        result = mongo.db.apps.update_one(
-            {'app_id': app_id},
-            {'$set': data}
-        )
-        
-        if result.matched_count:
-            updated_app = mongo.db.apps.find_one({'app_id': app_id})
-            return jsonify(parse_json(updated_app))
-        else:
-            return jsonify({'error': 'App not found'}), 404
+            result = collection.update_one(
+                {'app_id': app_id},
+                {'$set': data}
+            )
+            for staging in staged_catalogs(writer):
+                staging.update_one({'app_id': app_id}, {'$set': data})
+            
+            if result.matched_count:
+                updated_app = collection.find_one({'app_id': app_id})
+                search_index.add(updated_app)
+                adjust_stats([(before, updated_app)])
+                response_cache.invalidate()
+                return jsonify(parse_json(updated_app))
+            else:
+                return jsonify({'error': 'App not found'}), 404
     except Exception as e:
         logger.error(f"Error updating app {app_id}: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/apps/<app_id>', methods=['DELETE'])
+@requires_writable_storage
 def delete_app(app_id):
-    """Delete an app."""
+    """Delete an app, leaving a tombstone for /api/apps/changes."""
     try:
-        result = mongo.db.apps.delete_one({'app_id': app_id})
-        if result.deleted_count:
-            return jsonify({'success': True, 'message': f'App {app_id} deleted successfully'})
-        else:
-            return jsonify({'error': 'App not found'}), 404
+        with revision_log.writer() as writer:
+            deleted = collection.find_one_and_delete({'app_id': app_id},
+                                                     projection={**STATS_FIELDS, 'app_id': 1})
+            if deleted is not None:
+                for staging in staged_catalogs(writer):
+                    staging.delete_one({'app_id': app_id})
+                record_tombstones(writer, [app_id])
+                search_index.remove(app_id)
+                adjust_stats([(deleted, None)])
+                response_cache.invalidate()
+                return jsonify({'success': True, 'message': f'App {app_id} deleted successfully'})
+            else:
+                return jsonify({'error': 'App not found'}), 404
     except Exception as e:
         logger.error(f"Error deleting app {app_id}: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/stats', methods=['GET'])
+@cached_response
+def get_stats():
+    """Get catalog-wide counts, the rating histogram and review-count percentiles."""
+    try:
+        return jsonify({'success': True, **storage.stats()})
+    except Exception as e:
+        logger.error(f"Error fetching stats: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/images/<image_hash>', methods=['GET'])
+def get_image(image_hash):
+    """
+    Serve a cached app image.
+
+    The URL names the image by its content hash, so the bytes behind it never
+    change and clients can keep them for a year without revalidating.
+    """
+    if re.fullmatch(r'[0-9a-f]{64}', image_hash):
+        for extension, mimetype in IMAGE_MIMETYPES.items():
+            path = os.path.join(IMAGE_CACHE_DIR, image_hash[:2], f'{image_hash}.{extension}')
+            if os.path.isfile(path):
+                response = send_file(path, mimetype=mimetype, etag=image_hash, max_age=IMAGE_MAX_AGE)
+                response.headers['Cache-Control'] = f'public, max-age={IMAGE_MAX_AGE}, immutable'
+                return response
+    return jsonify({'error': 'Image not found'}), 404
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Request, MongoDB command and cache metrics in Prometheus text format."""
+    cache_stats = response_cache.stats()
+    body = api_metrics.render(
+        response_cache_entries=cache_stats['entries'],
+        response_cache_hits=cache_stats['hits'],
+        response_cache_misses=cache_stats['misses'],
+        search_index_apps=len(search_index)
+    )
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/categories', methods=['GET'])
+@cached_response
 def get_categories():
     """Get all unique categories."""
     try:
-        categories = mongo.db.apps.distinct('category')
+        categories = sorted((group['category'] for group in storage.stats()['categories']),
+                            key=lambda category: category or '')
         return jsonify({'categories': categories})
     except Exception as e:
         logger.error(f"Error fetching categories: {e}")
         return jsonify({'error': str(e)}), 500
 
+def iter_import_records():
+    """
+    Yield (position, app, error) for each record in the import request body.
+
+    NDJSON bodies (application/x-ndjson) are read line by line from the
+    request stream so large imports never have to fit in memory; any other
+    body is parsed as a JSON array of apps.
+
+    Raises:
+        ValueError: If a non-NDJSON body is not a JSON array
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+        for line_number, line in enumerate(request.stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_number, json.loads(line), None
+            except ValueError as e:
+                yield line_number, None, f'Invalid JSON: {e}'
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            raise ValueError('Invalid data format. Expected a list of apps or NDJSON.')
+        for index, app_data in enumerate(data, start=1):
+            yield index, app_data, None
+
+def apply_import_batch(writer, target, batch):
+    """Stamp and upsert a batch of apps with one unordered bulk write and summarize the result."""
+    stamp_revisions(writer, batch)
+    return write_import_batch(target, batch)
+
+def import_stats_changes(batch, pre_images, errors):
+    """Pair each written app of an import batch with its pre-image for adjust_stats()."""
+    failed = {error['app_id'] for error in errors}
+    current = dict(pre_images)
+    changes = []
+    for app_data in batch:
+        app_id = app_data['app_id']
+        if app_id in failed:
+            continue
+        before = current.get(app_id)
+        # The import $sets the fields it carries and leaves the others alone
+        after = {**(before or {}), **{field: app_data[field] for field in STATS_FIELDS
+                                      if field != '_id' and field in app_data}}
+        changes.append((before, after))
+        current[app_id] = after
+    return changes
+
+def write_import_batch(target, batch):
+    """Upsert already stamped apps with one unordered bulk write and summarize the result."""
+    operations = [UpdateOne({'app_id': app_data['app_id']}, {'$set': app_data}, upsert=True)
+                  for app_data in batch]
+    try:
+        result = target.bulk_write(operations, ordered=False)
+        return {
+            'upserted': result.upserted_count,
+            'matched': result.matched_count,
+            'modified': result.modified_count,
+            'errors': []
+        }
+    except BulkWriteError as e:
+        # Unordered writes keep going past failures; report the ones that failed
+        details = e.details
+        return {
+            'upserted': details.get('nUpserted', 0),
+            'matched': details.get('nMatched', 0),
+            'modified': details.get('nModified', 0),
+            'errors': [{'app_id': batch[error['index']].get('app_id'), 'error': error.get('errmsg')}
+                       for error in details.get('writeErrors', [])]
+        }
+
+def dumps_line(document):
+    """Serialize one document for an export stream, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(document)
+    return json.dumps(document, ensure_ascii=False, default=str).encode('utf-8')
+
+def parse_export_fields(fields):
+    """
+    Build a projection from a comma-separated `fields` parameter.
+
+    Raises:
+        ValueError: If a field name is invalid
+    """
+    projection = {'_id': 0}
+    if not fields:
+        return projection
+    for field in fields.split(','):
+        field = field.strip()
+        if not field or field.startswith('$') or field == '_id':
+            raise ValueError(f'Invalid field in fields: {field!r}')
+        projection[field] = 1
+    # app_id identifies each record, so it is always included
+    projection['app_id'] = 1
+    return projection
+
+@app.route('/api/export', methods=['GET'])
+def export_apps():
+    """
+    Stream the whole (optionally filtered) catalog in app_id order.
+
+    Documents are read from storage in batches and written out as
+    they arrive, so memory use stays flat regardless of catalog size.
+    Supports `format=ndjson` (default) or `format=json` (a JSON array), a
+    `fields=` projection and the `category`/`min_rating` filters of /api/apps.
+    """
+    try:
+        query = parse_list_params(request.args)[0]
+        projection = parse_export_fields(request.args.get('fields'))
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in ('ndjson', 'json'):
+            raise ValueError('format must be ndjson or json')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    cursor = storage.iter_apps(query, projection)
+
+    def generate():
+        buffer = bytearray(b'[' if export_format == 'json' else b'')
+        try:
+            for count, document in enumerate(cursor):
+                if export_format == 'json':
+                    if count:
+                        buffer += b','
+                    buffer += dumps_line(document)
+                else:
+                    buffer += dumps_line(document) + b'\n'
+                if len(buffer) >= EXPORT_CHUNK_BYTES:
+                    yield bytes(buffer)
+                    buffer.clear()
+            if export_format == 'json':
+                buffer += b']'
+            if buffer:
+                yield bytes(buffer)
+        except Exception as e:
+            # Headers are already sent, so the error can only end the stream
+            logger.error(f"Error exporting apps: {e}")
+            raise
+        finally:
+            cursor.close()
+
+    mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+def staging_collection(hold_key):
+    """Staging collection of the clear=true import holding `hold_key`."""
+    return db[f'{collection.name}_staging_{hold_key}']
+
+def staged_catalogs(writer, exclude=None):
+    """
+    Staging collections of clear=true imports in progress.
+
+    A write to the live catalog is replayed onto each of them, or the swap
+    at the end of the import would undo it while the change feed still
+    lists it.
+    """
+    return [staging_collection(key) for key in writer.active_holds() if key != exclude]
+
+def removed_app_ids(writer, staging):
+    """Yield app_ids of the live collection that are missing from a staged catalog."""
+    live_ids = collection.find({}, {'_id': 0, 'app_id': 1}).batch_size(IMPORT_BATCH_SIZE)
+    chunk = []
+    for app_data in live_ids:
+        chunk.append(app_data['app_id'])
+        if len(chunk) == IMPORT_BATCH_SIZE:
+            yield from missing_app_ids(staging, chunk)
+            chunk = []
+            # Comparing a large catalog can outlast the lock's lease
+            writer.extend()
+    if chunk:
+        yield from missing_app_ids(staging, chunk)
+
+def missing_app_ids(target, app_ids):
+    found = {app_data['app_id'] for app_data in target.find({'app_id': {'$in': app_ids}}, {'_id': 0, 'app_id': 1})}
+    return [app_id for app_id in app_ids if app_id not in found]
+
 # Script to import scraped data into MongoDB
 @app.route('/api/import', methods=['POST'])
+@requires_writable_storage
 def import_data():
-    """Import scraped data into MongoDB (admin endpoint)."""
+    """
+    Import scraped data into MongoDB (admin endpoint).
+
+    Accepts a JSON array or a streamed NDJSON body and writes it as unordered
+    bulk upserts of `batch_size` apps. With clear=true the apps are loaded
+    into a staging collection that replaces the live one only once every
+    batch is written, so readers never see an empty or half-imported catalog.
+    """
+    clear = request.args.get('clear', 'false').lower() == 'true'
     try:
-        data = request.json
-        if not data or not isinstance(data, list):
-            return jsonify({'error': 'Invalid data format. Expected a list of apps.'}), 400
-        
-        # Clear existing data if specified
-        if request.args.get('clear', 'false').lower() == 'true':
-            mongo.db.apps.delete_many({})
-        
-        # Insert new data
-        for app in data:
-            # Use app_id as the unique identifier
-            mongo.db.apps.update_one(
-                {'app_id': app['app_id']},
-                {'$set': app},
-                upsert=True
-            )
-        
-        return jsonify({'success': True, 'message': f'{len(data)} apps imported successfully'})
+        batch_size = int(request.args.get('batch_size', IMPORT_BATCH_SIZE))
+    except ValueError:
+        batch_size = 0
+    if batch_size < 1:
+        return jsonify({'error': 'batch_size must be a positive integer'}), 400
+
+    batches = []
+    rejected = []
+    batch = []
+    # Staged revisions only go live at the swap, so the change feed must not pass them before then
+    hold_key = uuid.uuid4().hex
+
+    def flush():
+        # Each batch takes the write lock on its own, so other writers interleave with a long upload
+        with revision_log.writer() as writer:
+            if not clear:
+                pre_images = {app_data.pop('app_id'): app_data for app_data in collection.find(
+                    {'app_id': {'$in': [app_data['app_id'] for app_data in batch]}}, {**STATS_FIELDS, 'app_id': 1})}
+            summary = apply_import_batch(writer, target, batch)
+            if clear and not writer.hold(hold_key, batch[0]['revision']) and batches:
+                raise RuntimeError('The import took too long between batches and its revisions were released')
+            if not clear:
+                for staging in staged_catalogs(writer):
+                    write_import_batch(staging, batch)
+                reindex_apps(app_data['app_id'] for app_data in batch)
+                adjust_stats(import_stats_changes(batch, pre_images, summary['errors']))
+        batches.append({'batch': len(batches) + 1, 'received': len(batch), **summary})
+        batch.clear()
+
+    try:
+        if clear:
+            # Build the new catalog on the side and swap it in at the end
+            target = staging_collection(hold_key)
+            ensure_indexes(target)
+        else:
+            target = collection
+
+        for position, app_data, error in iter_import_records():
+            if error is None and (not isinstance(app_data, dict) or not app_data.get('app_id')):
+                error = 'Each app must be an object with an app_id'
+            if error:
+                rejected.append({'line': position, 'error': error})
+                continue
+
+            for field in SYSTEM_FIELDS:
+                app_data.pop(field, None)
+            batch.append(app_data)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        imported = sum(summary['upserted'] + summary['matched'] for summary in batches)
+        if clear:
+            if not imported:
+                discard_staging(target, hold_key)
+                return jsonify({'error': 'No valid apps to import; existing data left unchanged',
+                                'rejected': rejected}), 400
+            with revision_log.writer() as writer:
+                if not writer.release_hold(hold_key):
+                    raise RuntimeError('The import took too long between batches and its revisions were released')
+                # Apps left out of a full reload are deletes for change consumers
+                removed = list(removed_app_ids(writer, target))
+                target.rename(collection.name, dropTarget=True)
+                record_tombstones(writer, removed)
+                load_search_index()
+                refresh_stats()
     except Exception as e:
+        if clear:
+            discard_staging(target, hold_key)
+        elif batches:
+            # Batches written before the failure are already live
+            response_cache.invalidate()
+        if isinstance(e, ValueError):
+            return jsonify({'error': str(e)}), 400
         logger.error(f"Error importing data: {e}")
-        return jsonify({'error': str(e)}), 500
+        return jsonify({'error': str(e), 'batches': batches}), 500
+
+    if batches:
+        response_cache.invalidate()
+
+    failed = len(rejected) + sum(len(summary['errors']) for summary in batches)
+    return jsonify({
+        'success': failed == 0,
+        'message': f'{imported} apps imported successfully',
+        'imported': imported,
+        'failed': failed,
+        'batches': batches,
+        'rejected': rejected
+    })
+
+def discard_staging(staging, hold_key):
+    """Drop an abandoned staging collection and let the change feed move past its revisions."""
+    staging.drop()
+    try:
+        with revision_log.writer() as writer:
+            writer.release_hold(hold_key)
+    except Exception as e:
+        logger.warning(f"Could not release the revision hold of a failed import: {e}")
+
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    # Development server; see asgi.py for production serving
+    app.run(host='0.0.0.0', port=port, debug=os.environ.get('FLASK_DEBUG', '0') == '1')
 
 
 # from flask import Flask, request, jsonify
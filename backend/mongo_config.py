@@ -0,0 +1,40 @@
+import os
+
+from pymongo import ReadPreference
+
+MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/')
+MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'meta_store')
+
+READ_PREFERENCES = {
+    'primary': ReadPreference.PRIMARY,
+    'primaryPreferred': ReadPreference.PRIMARY_PREFERRED,
+    'secondary': ReadPreference.SECONDARY,
+    'secondaryPreferred': ReadPreference.SECONDARY_PREFERRED,
+    'nearest': ReadPreference.NEAREST,
+}
+
+
+def client_options():
+    """Connection pool and timeout settings for MongoDB clients, read from the environment."""
+    return {
+        'maxPoolSize': int(os.environ.get('MONGO_MAX_POOL_SIZE', 100)),
+        'minPoolSize': int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+        # Requests waiting for a free connection fail instead of queueing forever
+        'waitQueueTimeoutMS': int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000)),
+        'serverSelectionTimeoutMS': int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+        'connectTimeoutMS': int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000)),
+        'socketTimeoutMS': int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 30000)),
+    }
+
+
+def read_preference():
+    """
+    Read preference for read-only API routes, from MONGO_READ_PREFERENCE.
+
+    Raises:
+        ValueError: If MONGO_READ_PREFERENCE is not a known read preference
+    """
+    name = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"MONGO_READ_PREFERENCE must be one of: {', '.join(READ_PREFERENCES)}")
+    return READ_PREFERENCES[name]
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    In-process LRU cache for rendered API responses.
+
+    Entries expire after `ttl` seconds and are all dropped whenever the
+    dataset version is bumped, which every write endpoint does. All methods
+    are thread-safe.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached responses; the least recently used is evicted first
+            ttl: Seconds an entry stays valid (0 disables caching)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, version):
+        """
+        Store a value computed while the dataset was at `version`.
+
+        Values computed before a concurrent write bumped the version are
+        dropped instead of being cached as if they were current.
+        """
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Bump the dataset version and drop every cached response."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+COUNTER_ID = 'revision'
+
+
+def committed_revision(counter):
+    """High-water mark stored in a counter document (None if it was never written)."""
+    if counter is None:
+        return 0
+    # Counters written before the high-water mark existed were only updated after each write
+    return counter.get('committed', counter.get('value', 0))
+
+
+class RevisionLog:
+    """
+    Revision numbers for /api/apps/changes, shared by every server process.
+
+    All state lives in one document of the counters collection: the last
+    allocated revision (`value`), the committed high-water mark
+    (`committed`) and a lease-based write lock. Writers allocate revisions
+    and write the documents that carry them while holding the lock, so
+    writes from any process are applied one after another in revision order.
+    The high-water mark only moves up when the lock is released, after the
+    writes were acknowledged. The change feed serves revisions up to the
+    mark, so a reader never passes a revision that is still being written.
+
+    The lock expires after lock_timeout seconds, so a writer that died
+    cannot block the others forever. A writer that outlives its lease fails
+    its next allocate() instead of writing out of order.
+
+    Writes that only become visible later, like batches staged for a full
+    import, register a hold on their first revision. The mark stays below
+    the oldest hold until it is released, or until it has not been
+    refreshed for hold_timeout seconds.
+    """
+
+    def __init__(self, counters, lock_timeout=60.0, wait_timeout=120.0, hold_timeout=600.0):
+        """
+        Initialize the log.
+
+        Args:
+            counters: Collection holding the counter document
+            lock_timeout: Seconds the write lock lasts unless its holder extends it
+            wait_timeout: Seconds to wait for the write lock before giving up
+            hold_timeout: Seconds a hold lasts unless its writer refreshes it
+        """
+        self.counters = counters
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.hold_timeout = hold_timeout
+        # Threads of one process queue here instead of polling MongoDB
+        self._local_lock = threading.Lock()
+
+    def committed(self):
+        """Highest revision up to which every write is complete."""
+        return committed_revision(self.counters.find_one({'_id': COUNTER_ID}, {'value': 1, 'committed': 1}))
+
+    @contextmanager
+    def writer(self):
+        """
+        Hold the write lock for the duration of the block.
+
+        Yields:
+            RevisionWriter for allocating revisions
+
+        Raises:
+            TimeoutError: If the lock is not acquired within wait_timeout
+        """
+        with self._local_lock:
+            writer = RevisionWriter(self, self._acquire())
+            try:
+                yield writer
+            finally:
+                self._release(writer)
+
+    def _acquire(self):
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+        delay = 0.005
+        while True:
+            now = time.time()
+            try:
+                # Matches only a free or expired lock; otherwise the upsert collides with the existing document
+                counter = self.counters.find_one_and_update(
+                    {'_id': COUNTER_ID, '$or': [{'lock_owner': None}, {'lock_expires': {'$lt': now}}]},
+                    {'$set': {'lock_owner': token, 'lock_expires': now + self.lock_timeout}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError('Timed out waiting for the write lock')
+                time.sleep(delay)
+                delay = min(delay * 2, 0.1)
+                continue
+            if 'committed' not in counter:
+                # Pin the mark before anything is allocated, or readers would fall back to `value`
+                self.counters.update_one({'_id': COUNTER_ID, 'lock_owner': token},
+                                         {'$set': {'committed': counter.get('value', 0)}})
+            return token
+
+    def _release(self, writer):
+        """Move the high-water mark up to the last allocated revision or the oldest hold and free the lock."""
+        counter = self.counters.find_one({'_id': COUNTER_ID, 'lock_owner': writer.token})
+        if counter is None:
+            logger.warning("Write lock expired before it was released; the next writer commits its revisions")
+            return
+        now = time.time()
+        holds = counter.get('holds', {})
+        expired = [key for key, hold in holds.items() if hold['expires'] < now]
+        live = [hold['first'] for key, hold in holds.items() if key not in expired]
+        committed = min(live) - 1 if live else counter.get('value', 0)
+        update = {'$set': {'committed': max(committed, counter.get('committed', 0)),
+                           'lock_owner': None, 'lock_expires': None}}
+        if expired:
+            logger.warning(f"Dropping {len(expired)} expired revision holds")
+            update['$unset'] = {f'holds.{key}': '' for key in expired}
+        self.counters.update_one({'_id': COUNTER_ID, 'lock_owner': writer.token}, update)
+
+
+class RevisionWriter:
+    """Allocates revisions for the current holder of the RevisionLog write lock."""
+
+    def __init__(self, log, token):
+        self.log = log
+        self.token = token
+
+    def _update(self, update, return_document=ReturnDocument.AFTER):
+        counter = self.log.counters.find_one_and_update(
+            {'_id': COUNTER_ID, 'lock_owner': self.token}, update, return_document=return_document
+        )
+        if counter is None:
+            raise RuntimeError('The write lock expired before the write finished')
+        return counter
+
+    def allocate(self, count):
+        """
+        Reserve `count` consecutive revision numbers and extend the lock.
+
+        Returns:
+            The first reserved revision
+        """
+        counter = self._update({'$inc': {'value': count},
+                                '$set': {'lock_expires': time.time() + self.log.lock_timeout}})
+        return counter['value'] - count + 1
+
+    def extend(self):
+        """Extend the lock during long work that allocates nothing."""
+        self._update({'$set': {'lock_expires': time.time() + self.log.lock_timeout}})
+
+    def hold(self, key, first):
+        """
+        Keep the high-water mark below `first` until release_hold(key).
+
+        Calling it again with the same key refreshes the hold and keeps the
+        lowest revision seen.
+
+        Returns:
+            Whether the hold already existed, so a writer can tell that its
+            earlier hold expired in the meantime
+        """
+        counter = self._update({'$min': {f'holds.{key}.first': first},
+                                '$set': {f'holds.{key}.expires': time.time() + self.log.hold_timeout}},
+                               return_document=ReturnDocument.BEFORE)
+        return key in counter.get('holds', {})
+
+    def active_holds(self):
+        """Keys of the holds that have not expired."""
+        counter = self._update({'$set': {'lock_expires': time.time() + self.log.lock_timeout}})
+        now = time.time()
+        return [key for key, hold in counter.get('holds', {}).items() if hold['expires'] >= now]
+
+    def release_hold(self, key):
+        """
+        Let the high-water mark pass a hold once this writer releases the lock.
+
+        Returns:
+            Whether the hold still existed
+        """
+        counter = self._update({'$unset': {f'holds.{key}': ''}}, return_document=ReturnDocument.BEFORE)
+        return key in counter.get('holds', {})
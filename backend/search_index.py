@@ -0,0 +1,195 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall((text or '').lower())
+
+
+class SearchIndex:
+    """
+    In-process inverted index over app names and descriptions with BM25 ranking.
+
+    Every query token must match a term in the app, either exactly or as a
+    prefix ("beat" matches "beat" and "beatsaber"). Lookups only touch the
+    posting lists of the matched terms, so query cost depends on how many
+    apps match rather than on catalog size. All methods are thread-safe.
+    """
+
+    # Name matches count as this many description matches
+    NAME_WEIGHT = 3
+    # Score multiplier for terms that only match as a prefix of the query token
+    PREFIX_WEIGHT = 0.5
+    # Maximum number of terms a single query token expands to; the ones in the most apps are kept
+    MAX_EXPANSIONS = 50
+
+    def __init__(self, k1=1.2, b=0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings = {}  # term -> {app_id: weighted term frequency}
+        self._terms = []  # sorted list of indexed terms, for prefix lookups
+        self._doc_terms = {}  # app_id -> terms, so an app can be removed
+        self._doc_lengths = {}  # app_id -> weighted token count
+        self._doc_filters = {}  # app_id -> (category, ratings)
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    def rebuild(self, apps):
+        """Replace the whole index with the given apps."""
+        index = SearchIndex(self.k1, self.b)
+        for app_data in apps:
+            index._add(app_data)
+        with self._lock:
+            self._postings = index._postings
+            self._terms = sorted(index._postings)
+            self._doc_terms = index._doc_terms
+            self._doc_lengths = index._doc_lengths
+            self._doc_filters = index._doc_filters
+            self._total_length = index._total_length
+
+    def add(self, app_data):
+        """Index an app, replacing any previous version with the same app_id."""
+        with self._lock:
+            self._remove(app_data['app_id'])
+            for term in self._add(app_data):
+                # Keep the term list sorted as new terms appear
+                position = bisect.bisect_left(self._terms, term)
+                if position == len(self._terms) or self._terms[position] != term:
+                    self._terms.insert(position, term)
+
+    def remove(self, app_id):
+        """Drop an app from the index."""
+        with self._lock:
+            self._remove(app_id)
+
+    def _add(self, app_data):
+        """Add postings for an app; returns the terms that are new to the index."""
+        app_id = app_data['app_id']
+        frequencies = {}
+        for term in tokenize(app_data.get('app_name')):
+            frequencies[term] = frequencies.get(term, 0) + self.NAME_WEIGHT
+        for term in tokenize(app_data.get('description')):
+            frequencies[term] = frequencies.get(term, 0) + 1
+
+        new_terms = []
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                new_terms.append(term)
+            postings[app_id] = frequency
+
+        length = sum(frequencies.values())
+        self._doc_terms[app_id] = tuple(frequencies)
+        self._doc_lengths[app_id] = length
+        self._doc_filters[app_id] = (app_data.get('category'), app_data.get('ratings'))
+        self._total_length += length
+        return new_terms
+
+    def _remove(self, app_id):
+        terms = self._doc_terms.pop(app_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[app_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+        self._total_length -= self._doc_lengths.pop(app_id)
+        del self._doc_filters[app_id]
+
+    def _expand(self, token):
+        """
+        Return (term, weight) pairs for the indexed terms a query token matches.
+
+        The exact term is always kept. When more terms start with the token
+        than MAX_EXPANSIONS, the ones found in the most apps are kept, so a
+        short prefix loses only its rarest completions.
+        """
+        matches = []
+        if token in self._postings:
+            matches.append((token, 1.0))
+        start = bisect.bisect_right(self._terms, token)
+        # Every term in [token, token + U+10FFFF) starts with token
+        end = bisect.bisect_left(self._terms, token + '\U0010ffff', start)
+        prefixed = self._terms[start:end]
+        limit = self.MAX_EXPANSIONS - len(matches)
+        if len(prefixed) > limit:
+            prefixed = heapq.nlargest(limit, prefixed, key=lambda term: len(self._postings[term]))
+        matches.extend((term, self.PREFIX_WEIGHT) for term in prefixed)
+        return matches
+
+    def search(self, query, category=None, min_rating=None):
+        """
+        Rank the apps matching every token of a query.
+
+        Args:
+            query: Free-text query
+            category: Only return apps in this category
+            min_rating: Only return apps rated at least this much
+
+        Returns:
+            List of (app_id, score) tuples, best match first
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        with self._lock:
+            total_docs = len(self._doc_lengths)
+            if not total_docs:
+                return []
+            average_length = self._total_length / total_docs
+
+            scores = None
+            for token in tokens:
+                expansions = self._expand(token)
+                # One idf per query token, so rare expansions cannot outrank exact matches
+                df = len(set().union(*(self._postings[term] for term, _ in expansions)))
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                token_scores = {}
+                for term, weight in expansions:
+                    for app_id, frequency in self._postings[term].items():
+                        if scores is not None and app_id not in scores:
+                            continue
+                        norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[app_id] / average_length)
+                        score = weight * idf * frequency * (self.k1 + 1) / (frequency + norm)
+                        # Several expansions of one token should not add up
+                        if score > token_scores.get(app_id, 0):
+                            token_scores[app_id] = score
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {app_id: scores[app_id] + score for app_id, score in token_scores.items()}
+                if not scores:
+                    return []
+
+            filters = self._doc_filters
+            results = []
+            for app_id, score in scores.items():
+                app_category, ratings = filters[app_id]
+                if category and app_category != category:
+                    continue
+                if min_rating is not None and (ratings is None or ratings < min_rating):
+                    continue
+                results.append((app_id, score))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
@@ -0,0 +1,342 @@
+import json
+import logging
+import os
+import threading
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# Placeholder for fields a record does not have, so they are left out again
+MISSING = object()
+
+
+def sort_key(value):
+    """Order values like MongoDB does: missing/null, then numbers, then strings."""
+    if value is None or value is MISSING:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (3, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (4, str(value))
+
+
+def load_records(path):
+    """Read the scraper's output: a JSON array (.json) or one app per line (.ndjson/.jsonl)."""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.ndjson', '.jsonl')):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+class Snapshot:
+    """
+    Immutable, column-oriented copy of the catalog.
+
+    Every field is stored as one column, a list indexed by row number.
+    Sort orders for each sortable field (app_id breaking ties) are computed
+    once, per category as well, as arrays of row numbers. A page of a sorted
+    and category-filtered listing is therefore a slice of a precomputed
+    array, and only a min_rating filter needs to skip rows.
+    """
+
+    def __init__(self, records, sortable_fields):
+        # Later duplicates of an app_id win, like repeated upserts would
+        rows = {}
+        for record in records:
+            if isinstance(record, dict) and record.get('app_id'):
+                rows[record['app_id']] = record
+        records = list(rows.values())
+
+        self.size = len(records)
+        self.fields = list(dict.fromkeys(field for record in records for field in record if field != '_id'))
+        self.columns = {field: [record.get(field, MISSING) for record in records] for field in self.fields}
+        for field in ('app_id', 'category', 'ratings'):
+            self.columns.setdefault(field, [MISSING] * self.size)
+        self.row_by_id = {app_id: row for row, app_id in enumerate(self.columns['app_id'])}
+
+        categories = self.columns['category']
+        self.category_names = sorted({category for category in categories if category not in (MISSING, None)},
+                                     key=sort_key)
+        # Rows without a category only appear in unfiltered listings
+        self.uncategorized = sum(1 for category in categories if category in (MISSING, None))
+
+        ids = [sort_key(app_id) for app_id in self.columns['app_id']]
+        self.orders = {}
+        self.category_orders = {category: {} for category in self.category_names}
+        for field in sortable_fields:
+            column = self.columns.setdefault(field, [MISSING] * self.size)
+            order = array('L', sorted(range(self.size), key=lambda row: (sort_key(column[row]), ids[row])))
+            self.orders[field] = order
+            for category in self.category_names:
+                self.category_orders[category][field] = array('L')
+            for row in order:
+                category = categories[row]
+                if category in self.category_orders:
+                    self.category_orders[category][field].append(row)
+
+        # Sorted ratings, overall and per category, answer min_rating counts by bisection
+        ratings = self.columns['ratings']
+        self.sorted_ratings = {None: array('d', sorted(r for r in ratings if isinstance(r, (int, float))))}
+        for category in self.category_names:
+            self.sorted_ratings[category] = array('d', sorted(
+                ratings[row] for row in self.category_orders[category].get('ratings', [])
+                if isinstance(ratings[row], (int, float))))
+
+    def document(self, row, fields=None):
+        """Materialize one row as a dict, optionally limited to `fields`."""
+        fields = self.fields if fields is None else fields
+        document = {}
+        for field in fields:
+            value = self.columns[field][row]
+            if value is not MISSING:
+                document[field] = value
+        return document
+
+    def _rating_ok(self, row, min_rating):
+        rating = self.columns['ratings'][row]
+        return isinstance(rating, (int, float)) and rating >= min_rating
+
+    def rows(self, category, min_rating, sort, start=0):
+        """Yield row numbers matching the filters in sort order, starting at position `start`."""
+        field, direction = sort[0]
+        if category is not None:
+            if category not in self.category_orders:
+                return
+            order = self.category_orders[category][field]
+        else:
+            order = self.orders[field]
+        positions = range(start, len(order)) if direction == 1 else range(len(order) - 1 - start, -1, -1)
+        for position in positions:
+            row = order[position]
+            if min_rating is None or self._rating_ok(row, min_rating):
+                yield row
+
+    def count(self, category, min_rating):
+        if category is not None and category not in self.category_orders:
+            return 0
+        if min_rating is None:
+            if category is None:
+                return self.size
+            return len(self.category_orders[category]['app_id'])
+        ratings = self.sorted_ratings[category]
+        # First position with a rating >= min_rating
+        low, high = 0, len(ratings)
+        while low < high:
+            middle = (low + high) // 2
+            if ratings[middle] < min_rating:
+                low = middle + 1
+            else:
+                high = middle
+        return len(ratings) - low
+
+    def position_after(self, category, sort, after):
+        """Number of rows in the (category) order that come at or before the keyset `after`."""
+        field, direction = sort[0]
+        order = self.category_orders[category][field] if category is not None else self.orders[field]
+        column = self.columns[field]
+        ids = self.columns['app_id']
+        # app_id is unique, so the order is strictly increasing in (field, app_id)
+        target = (sort_key(after[0]), sort_key(after[-1]))
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            row = order[middle]
+            if (sort_key(column[row]), sort_key(ids[row])) <= target:
+                low = middle + 1
+            else:
+                high = middle
+        # low rows sort at or before `after` ascending; descending starts from the other end
+        return low if direction == 1 else len(order) - low + self._equal_count(order, low, target, column, ids)
+
+    @staticmethod
+    def _equal_count(order, low, target, column, ids):
+        """1 if the row just before `low` is the keyset row itself, so it is skipped descending too."""
+        if low and (sort_key(column[order[low - 1]]), sort_key(ids[order[low - 1]])) == target:
+            return 1
+        return 0
+
+
+class SnapshotStore:
+    """
+    Serve the catalog from a JSON/NDJSON file held in memory instead of MongoDB.
+
+    The file is reloaded in the background when its modification time or
+    size changes; requests keep using the previous snapshot until the new
+    one is fully built. The store is read-only.
+    """
+
+    writable = False
+
+    def __init__(self, path, sortable_fields, reload_interval=2.0):
+        """
+        Load the snapshot file.
+
+        Args:
+            path: JSON array or NDJSON file written by the scraper
+            sortable_fields: Fields to precompute sort orders for
+            reload_interval: Seconds between checks for a changed file (0 disables reloading)
+        """
+        self.path = path
+        self.sortable_fields = sortable_fields
+        self.reload_interval = reload_interval
+        self._signature = self._file_signature()
+        self.snapshot = Snapshot(load_records(path), sortable_fields)
+        self.updated_at = self._signature[0] / 1e9
+        self.stats_cache = None
+        logger.info(f"Loaded snapshot of {self.snapshot.size} apps from {path}")
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def reload_if_changed(self):
+        """
+        Rebuild the snapshot if the file changed.
+
+        Returns:
+            True if a new snapshot was loaded
+        """
+        try:
+            signature = self._file_signature()
+        except OSError:
+            signature = None
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            snapshot = Snapshot(load_records(self.path), self.sortable_fields)
+        except (OSError, ValueError) as e:
+            # Missing or half-written; keep serving the old snapshot until the file changes again
+            logger.warning(f"Could not reload snapshot {self.path}: {e}")
+            return False
+        self.snapshot, self.updated_at, self.stats_cache = snapshot, signature[0] / 1e9, None
+        logger.info(f"Reloaded snapshot of {snapshot.size} apps from {self.path}")
+        return True
+
+    def watch(self, on_reload):
+        """Poll the file in a daemon thread and call on_reload() after each reload."""
+        if not self.reload_interval:
+            return
+
+        def run():
+            stop = threading.Event()
+            while not stop.wait(self.reload_interval):
+                if self.reload_if_changed():
+                    on_reload()
+
+        threading.Thread(target=run, name='snapshot-reload', daemon=True).start()
+
+    @staticmethod
+    def _filters(query):
+        return query.get('category'), query.get('ratings', {}).get('$gte')
+
+    def find_page(self, query, sort, page, per_page):
+        """Return (apps, total) for one page of a filtered, sorted listing."""
+        snapshot = self.snapshot
+        category, min_rating = self._filters(query)
+        total = snapshot.count(category, min_rating)
+        skip = (page - 1) * per_page
+        apps = []
+        if min_rating is None:
+            # Unfiltered orders can be sliced directly
+            rows = snapshot.rows(category, None, sort, start=skip)
+        else:
+            rows = (row for index, row in enumerate(snapshot.rows(category, min_rating, sort)) if index >= skip)
+        for row in rows:
+            if len(apps) == per_page:
+                break
+            apps.append(snapshot.document(row))
+        return apps, total
+
+    def find_after(self, query, sort, after, per_page):
+        """Return the page of apps that follows the keyset `after` in `sort` order."""
+        snapshot = self.snapshot
+        category, min_rating = self._filters(query)
+        if category is not None and category not in snapshot.category_orders:
+            return []
+        start = snapshot.position_after(category, sort, after)
+        apps = []
+        for row in snapshot.rows(category, min_rating, sort, start=start):
+            if len(apps) == per_page:
+                break
+            apps.append(snapshot.document(row))
+        return apps
+
+    def get(self, app_id):
+        snapshot = self.snapshot
+        row = snapshot.row_by_id.get(app_id)
+        return snapshot.document(row) if row is not None else None
+
+    def get_many(self, app_ids):
+        snapshot = self.snapshot
+        return {app_id: snapshot.document(snapshot.row_by_id[app_id])
+                for app_id in app_ids if app_id in snapshot.row_by_id}
+
+    def iter_apps(self, query=None, projection=None):
+        """Yield apps in app_id order, optionally filtered and limited to a MongoDB-style projection."""
+        snapshot = self.snapshot
+        category, min_rating = self._filters(query or {})
+        fields = None
+        if projection and any(projection.values()):
+            fields = [field for field in snapshot.fields if projection.get(field)]
+        for row in snapshot.rows(category, min_rating, [('app_id', 1)]):
+            yield snapshot.document(row, fields)
+
+    def stats(self):
+        """Catalog summary in the same shape as the MongoDB-backed /api/stats."""
+        if self.stats_cache is not None:
+            return self.stats_cache
+        snapshot = self.snapshot
+        ratings = snapshot.columns['ratings']
+        categories = []
+        for category in snapshot.category_names:
+            rows = snapshot.category_orders[category]['app_id']
+            rated = [ratings[row] for row in rows if isinstance(ratings[row], (int, float))]
+            categories.append({
+                'category': category,
+                'count': len(rows),
+                'avg_rating': round(sum(rated) / len(rated), 2) if rated else None
+            })
+        if snapshot.uncategorized:
+            rated = [ratings[row] for row, category in enumerate(snapshot.columns['category'])
+                     if category in (MISSING, None) and isinstance(ratings[row], (int, float))]
+            categories.append({
+                'category': None,
+                'count': snapshot.uncategorized,
+                'avg_rating': round(sum(rated) / len(rated), 2) if rated else None
+            })
+        categories.sort(key=lambda group: (-group['count'], sort_key(group['category'])))
+
+        histogram = {}
+        unrated = 0
+        for rating in ratings:
+            if isinstance(rating, (int, float)):
+                bucket = (rating * 2 // 1) * 0.5
+                histogram[bucket] = histogram.get(bucket, 0) + 1
+            else:
+                unrated += 1
+
+        reviews = sorted(value for value in snapshot.columns.get('num_reviews', [])
+                         if isinstance(value, (int, float)) and value >= 0)
+        percentiles = {}
+        for percentile in (50, 90, 99):
+            rank = max(0, -(-percentile * len(reviews) // 100) - 1)
+            percentiles[f'p{percentile}'] = reviews[rank] if reviews else None
+
+        self.stats_cache = {
+            'total_apps': snapshot.size,
+            'categories': categories,
+            'rating_histogram': [{'rating': bucket, 'count': count} for bucket, count in sorted(histogram.items())],
+            'unrated': unrated,
+            'num_reviews': {
+                'total': sum(reviews),
+                'mean': round(sum(reviews) / len(reviews), 2) if reviews else None,
+                'max': reviews[-1] if reviews else None,
+                **percentiles
+            },
+            'updated_at': self.updated_at
+        }
+        return self.stats_cache
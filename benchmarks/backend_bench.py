@@ -0,0 +1,394 @@
+"""
+Load-test benchmark for the backend API.
+
+Starts backend/main.py (or backend/asgi.py) in a subprocess against a
+synthetic catalog shaped like meta_quest_apps.json, drives /api/apps,
+/api/apps/<app_id>, /api/categories and /api/import with a configurable
+number of concurrent clients and reports throughput, p50/p99 latency and
+peak server RSS per endpoint. Results can be saved as a baseline; later runs
+fail if they regress past the tolerance.
+
+The catalog lives either in a local mongod (--store mongo, seeded into a
+separate database) or in an in-process mongomock fake inside the server
+(--store fake, needs `pip install mongomock`). The fake only replaces the
+synchronous client, so --server asgi, whose read routes use pymongo's async
+client, needs --store mongo.
+
+Examples:
+    python benchmarks/backend_bench.py --apps 1000 --concurrency 16
+    python benchmarks/backend_bench.py --store mongo --apps 1000000 --endpoints apps,app --requests 5000
+    python benchmarks/backend_bench.py --store mongo --server asgi --apps 100000 --save-baseline
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(os.path.dirname(BENCH_DIR), "backend")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baselines", "backend.json")
+
+ENDPOINTS = ("apps", "app", "categories", "import")
+CATEGORIES = ["Action", "Adventure", "App", "Music & Rhythm", "Puzzle", "Shooter", "Sports", "Simulation"]
+SORTABLE_FIELDS = ("app_name", "ratings", "num_reviews", "category", "app_id")
+WORDS = ("quest", "beat", "saber", "ghost", "lord", "rise", "creed", "nexus", "wrath", "space", "pirate",
+         "golf", "zombie", "arena", "tennis", "dungeon", "racer", "legend", "shadow", "rhythm")
+SEED_BATCH_SIZE = 10000
+PER_PAGE = 20
+
+logger = logging.getLogger("backend_bench")
+
+
+def app_id(index):
+    return str(4000000000000000 + index)
+
+
+def synthetic_app(index, version=0):
+    """App record shaped like the scraper's output; `version` varies ratings for update imports."""
+    rng = random.Random(index * 7919 + version)
+    words = [rng.choice(WORDS) for _ in range(rng.randint(1, 3))]
+    slug = "-".join(words) + f"-{index}"
+    description = " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 70)))
+    rated = rng.random() > 0.1
+    return {
+        "app_id": app_id(index),
+        "app_name": " ".join(word.title() for word in words) + f" {index}",
+        "app_image_url": (f"https://scontent.oculuscdn.com/v/t64.5771-25/{rng.getrandbits(40)}_n.jpg"
+                          f"?stp=dst-jpg_q92_s100x100_tt6&_nc_cat={rng.randint(1, 200)}"
+                          f"&ccb=1-7&oh=00_{rng.getrandbits(64):016x}&oe={rng.getrandbits(32):08X}"),
+        "ratings": round(rng.uniform(2.5, 5.0), 1) if rated else 0.0,
+        "num_reviews": int(rng.paretovariate(1.2) * 10) if rated else 0,
+        "description": description.capitalize() + ".",
+        "category": CATEGORIES[index % len(CATEGORIES)],
+        "source_url": f"https://www.meta.com/experiences/{slug}/{app_id(index)}/",
+    }
+
+
+def process_rss(pid):
+    """Resident memory of one process in bytes (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class RssSampler:
+    """Track the peak RSS of the server process in a background thread."""
+
+    def __init__(self, pid, interval=0.2):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, process_rss(self.pid) or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _patch_mongomock_bulk():
+    """
+    Let mongomock accept the bulk operations of newer pymongo releases,
+    which pass a `sort` argument mongomock does not know about.
+    """
+    from mongomock.collection import BulkOperationBuilder
+
+    add_update = BulkOperationBuilder.add_update
+
+    def compatible_add_update(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    BulkOperationBuilder.add_update = compatible_add_update
+
+
+def serve(args):
+    """Server subprocess: seed the catalog, then serve the API until killed."""
+    os.environ["MONGO_DB_NAME"] = args.db_name
+    os.environ["MONGO_URI"] = args.mongo_uri
+    if args.no_cache:
+        os.environ["RESPONSE_CACHE_TTL"] = "0"
+    if args.store == "fake":
+        import mongomock
+        import pymongo
+
+        pymongo.MongoClient = mongomock.MongoClient
+        _patch_mongomock_bulk()
+
+    sys.path.insert(0, BACKEND_DIR)
+    import main as backend
+
+    level = logging.INFO if args.verbose else logging.ERROR
+    logging.getLogger().setLevel(level)
+    logging.getLogger("werkzeug").setLevel(level)
+
+    started = time.perf_counter()
+    for collection in (backend.collection, backend.stats_collection, backend.counters_collection,
+                       backend.tombstones_collection):
+        collection.drop()
+    for start in range(0, args.apps, SEED_BATCH_SIZE):
+        backend.collection.insert_many([synthetic_app(i) for i in range(start, min(args.apps, start + SEED_BATCH_SIZE))])
+    backend.ensure_indexes()
+    backend.load_search_index()
+    backend.refresh_stats()
+    backend.response_cache.invalidate()
+    print(json.dumps({"seed_seconds": round(time.perf_counter() - started, 3)}), flush=True)
+
+    if args.server == "asgi":
+        import uvicorn
+
+        import asgi
+
+        uvicorn.run(asgi.app, host="127.0.0.1", port=args.port, log_level="warning")
+    else:
+        from werkzeug.serving import make_server
+
+        make_server("127.0.0.1", args.port, backend.app, threaded=True).serve_forever()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args):
+    """Start the server subprocess and wait until it answers; returns (process, base URL, seed seconds)."""
+    port = free_port()
+    command = [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+               "--store", args.store, "--server", args.server, "--apps", str(args.apps),
+               "--mongo-uri", args.mongo_uri, "--db-name", args.db_name]
+    if args.no_cache:
+        command.append("--no-cache")
+    if args.verbose:
+        command.append("--verbose")
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+
+    # The server reports the seeding time once the catalog is loaded
+    for line in process.stdout:
+        if line.startswith('{"seed_seconds"'):
+            seed_seconds = json.loads(line)["seed_seconds"]
+            break
+    else:
+        raise RuntimeError(f"Server exited with code {process.wait()} while seeding")
+    # Keep draining the server's output so it never blocks on a full pipe
+    threading.Thread(target=process.stdout.read, daemon=True).start()
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if requests.get(base_url + "/api/categories", timeout=5).status_code == 200:
+                return process, base_url, seed_seconds
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Server did not start within {args.startup_timeout}s")
+
+
+def make_requests(args, base_url):
+    """Return one request function per endpoint; each takes a session and a random generator."""
+    max_page = max(1, min(100, -(-args.apps // PER_PAGE)))
+    import_url = f"{base_url}/api/import"
+    ndjson = {"Content-Type": "application/x-ndjson"}
+
+    def list_apps(session, rng):
+        params = {
+            "page": rng.randint(1, max_page),
+            "per_page": PER_PAGE,
+            "sort_by": rng.choice(SORTABLE_FIELDS),
+            "sort_order": rng.choice((1, -1)),
+        }
+        if rng.random() < 0.5:
+            params["category"] = rng.choice(CATEGORIES)
+        return session.get(f"{base_url}/api/apps", params=params)
+
+    def get_app(session, rng):
+        return session.get(f"{base_url}/api/apps/{app_id(rng.randrange(args.apps))}")
+
+    def get_categories(session, rng):
+        return session.get(f"{base_url}/api/categories")
+
+    def import_apps(session, rng):
+        # Re-import existing apps with new ratings, like an incremental scraper run
+        version = rng.randint(1, 1 << 30)
+        body = "".join(json.dumps(synthetic_app(rng.randrange(args.apps), version)) + "\n"
+                       for _ in range(args.import_batch))
+        return session.post(import_url, data=body.encode("utf-8"), headers=ndjson)
+
+    return {"apps": list_apps, "app": get_app, "categories": get_categories, "import": import_apps}
+
+
+def run_load(request_fn, total, concurrency, server_pid, seed):
+    """Send `total` requests from `concurrency` clients and summarize latency, throughput and RSS."""
+    counter = itertools.count()
+
+    def client(worker):
+        session = requests.Session()
+        rng = random.Random(seed * 1000 + worker)
+        latencies, errors = [], 0
+        # itertools.count is atomic under the GIL, so clients share the request budget
+        while next(counter) < total:
+            started = time.perf_counter()
+            try:
+                if request_fn(session, rng).status_code >= 400:
+                    errors += 1
+            except requests.RequestException:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+        session.close()
+        return latencies, errors
+
+    with RssSampler(server_pid) as sampler:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(client, range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies = [latency for worker_latencies, _ in results for latency in worker_latencies]
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "peak_server_rss_bytes": sampler.peak or None,
+    }
+
+
+def compare_to_baseline(result, baseline, tolerance):
+    """Return a list of regressions compared to the stored baseline."""
+    regressions = []
+    for name, stats in result["endpoints"].items():
+        base = baseline["endpoints"].get(name)
+        if base is None:
+            continue
+        if stats["requests_per_second"] < base["requests_per_second"] * (1 - tolerance):
+            regressions.append(f"{name} req/s {stats['requests_per_second']} < baseline {base['requests_per_second']}")
+        for key in ("p50_ms", "p99_ms"):
+            if stats[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name} {key} {stats[key]} > baseline {base[key]}")
+        if stats["errors"] > base["errors"]:
+            regressions.append(f"{name} errors {stats['errors']} > baseline {base['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the backend API against a synthetic catalog")
+    parser.add_argument("--apps", type=int, default=1000, help="Catalog size (e.g. 1000, 100000, 1000000)")
+    parser.add_argument("--store", choices=["fake", "mongo"], default="fake",
+                        help="In-process mongomock fake or a local mongod")
+    parser.add_argument("--server", choices=["flask", "asgi"], default="flask",
+                        help="Serve main.py with a threaded WSGI server or asgi.py with uvicorn")
+    parser.add_argument("--mongo-uri", type=str, default="mongodb://localhost:27017/",
+                        help="MongoDB connection string for --store mongo")
+    parser.add_argument("--db-name", type=str, default="meta_store_bench",
+                        help="Database the benchmark seeds (it is dropped and refilled)")
+    parser.add_argument("--endpoints", type=str, default=",".join(ENDPOINTS),
+                        help=f"Comma-separated endpoints to drive: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients per endpoint")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument("--import-batch", type=int, default=100, help="Apps per /api/import request")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the server's response cache")
+    parser.add_argument("--startup-timeout", type=float, default=600, help="Seconds to wait for the server")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for request parameters")
+    parser.add_argument("--baseline-file", type=str, default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the scenario baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--verbose", action="store_true", help="Show server log output")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.server == "asgi" and args.store == "fake":
+        parser.error("--server asgi needs --store mongo; the mongomock fake cannot stand in for the async client")
+
+    if args.serve:
+        return serve(args)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', force=True)
+
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    scenario = (f"{args.store}-{args.server}-apps{args.apps}-c{args.concurrency}"
+                f"-n{args.requests}{'-nocache' if args.no_cache else ''}")
+    process, base_url, seed_seconds = start_server(args)
+    try:
+        result = {
+            "scenario": scenario,
+            "apps": args.apps,
+            "seed_seconds": seed_seconds,
+            "server_rss_after_seed_bytes": process_rss(process.pid),
+            "endpoints": {},
+        }
+        request_fns = make_requests(args, base_url)
+        for name in endpoints:
+            result["endpoints"][name] = run_load(request_fns[name], args.requests, args.concurrency,
+                                                 process.pid, args.seed)
+    finally:
+        process.terminate()
+        process.wait()
+
+    print(json.dumps(result, indent=2))
+
+    baselines = {}
+    if os.path.exists(args.baseline_file):
+        with open(args.baseline_file, encoding="utf-8") as f:
+            baselines = json.load(f)
+
+    if args.save_baseline:
+        baselines[scenario] = result
+        os.makedirs(os.path.dirname(args.baseline_file), exist_ok=True)
+        with open(args.baseline_file, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Saved baseline for {scenario} to {args.baseline_file}")
+        return 0
+
+    if scenario in baselines:
+        regressions = compare_to_baseline(result, baselines[scenario], args.tolerance)
+        if regressions:
+            print("REGRESSION: " + "; ".join(regressions))
+            return 1
+        print(f"OK: within {args.tolerance:.0%} of baseline for {scenario}")
+    else:
+        print(f"No baseline for {scenario}; run with --save-baseline to store one")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
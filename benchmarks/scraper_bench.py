@@ -0,0 +1,405 @@
+"""
+Local-fixture benchmark for the Meta Quest Store scraper.
+
+Serves synthetic listing and app pages shaped like the ones
+_extract_app_links and _scrape_app_details expect from a local HTTP server,
+runs the scraper against it end-to-end and reports throughput, per-page
+latency, browser memory and a per-phase breakdown. Records are written to a
+temporary NDJSON sink as in a real crawl, and the CrawlMetrics spans of the
+run (navigation, extraction, sink writes, rate-limit waits) are reported
+next to the wall-clock phases. Results can be saved as a baseline; later
+runs fail if they regress past the tolerance.
+
+Examples:
+    python benchmarks/scraper_bench.py --engine http --apps 500
+    python benchmarks/scraper_bench.py --engine selenium --apps 50 --workers 4 --latency-ms 200
+    python benchmarks/scraper_bench.py --engine http --save-baseline
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawl_metrics import CrawlMetrics  # noqa: E402
+from rate_limiter import AdaptiveRateLimiter  # noqa: E402
+from sinks import JsonlSink  # noqa: E402
+import scraper  # noqa: E402
+
+logger = logging.getLogger("scraper_bench")
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "scraper.json")
+
+CATEGORIES = ["Action", "Adventure", "Music & Rhythm", "Puzzle", "Shooter", "Sports", "Simulation"]
+
+
+def app_slug(index):
+    return f"fixture-app-{index}"
+
+
+def app_id(index):
+    return str(4000000000000000 + index)
+
+
+def app_path(index):
+    return f"/experiences/{app_slug(index)}/{app_id(index)}/"
+
+
+def render_listing(num_apps):
+    """Listing page with one tile per app, like the gaming section."""
+    tiles = "\n".join(
+        f'<div class="app-card"><a href="{app_path(i)}"><img src="/img/{i}.jpg" alt="tile">'
+        f'<span>Fixture App {i}</span></a></div>'
+        for i in range(num_apps)
+    )
+    return f"<html><head><title>Gaming</title></head><body><main>{tiles}</main></body></html>"
+
+
+def render_app(index):
+    """App detail page matching the selectors used by _scrape_app_details."""
+    rng = random.Random(index)
+    rating = round(rng.uniform(2.5, 5.0), 1)
+    reviews = rng.randint(0, 50000)
+    description = (f"Fixture App {index} is a synthetic VR experience used to benchmark the scraper. "
+                   + "It has a long description paragraph so the description selectors find it. " * 3)
+    return f"""<html><head><title>Fixture App {index}</title></head><body>
+<header><nav><a href="/quest/gaming/">Back</a></nav></header>
+<main>
+  <h1>Fixture App {index}</h1>
+  <img src="/img/{index}-cover.jpg" alt="cover art">
+  <div class="rating-summary">{rating} stars {reviews:,} reviews</div>
+  <div class="app-description"><p>{description}</p></div>
+  <div class="details">
+    <div>Genre</div><div>{CATEGORIES[index % len(CATEGORIES)]}</div>
+  </div>
+</main></body></html>"""
+
+
+class FixtureServer:
+    """Threaded local HTTP server that replays fixture pages with injectable latency and failures."""
+
+    def __init__(self, num_apps, latency_ms=0, jitter_ms=0, failure_rate=0.0, throttle_rate=0.0, seed=0):
+        self.num_apps = num_apps
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.failures_injected = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    roll = server.rng.random()
+                    delay = server.latency_ms + server.rng.uniform(0, server.jitter_ms)
+                time.sleep(delay / 1000.0)
+
+                path = self.path.split("?")[0]
+                if path == "/quest/gaming/":
+                    return self._send(200, render_listing(server.num_apps))
+                if path.startswith("/experiences/"):
+                    if roll < server.failure_rate:
+                        with server._lock:
+                            server.failures_injected += 1
+                        return self._send(500, "<html><body>Internal error</body></html>")
+                    if roll < server.failure_rate + server.throttle_rate:
+                        with server._lock:
+                            server.failures_injected += 1
+                        return self._send(429, "<html><body>Too many requests</body></html>",
+                                          {"Retry-After": "1"})
+                    try:
+                        index = int(path.rstrip("/").split("/")[-1]) - 4000000000000000
+                    except ValueError:
+                        index = -1
+                    if 0 <= index < server.num_apps:
+                        return self._send(200, render_app(index))
+                if path.startswith("/img/"):
+                    return self._send(200, "", {"Content-Type": "image/jpeg"})
+                return self._send(404, "<html><body>Not found</body></html>")
+
+            def _send(self, status, body, headers=None):
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of a process and all its descendants (Linux only)."""
+    if not os.path.isdir("/proc"):
+        return None
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError):
+            continue
+
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/statm") as f:
+                total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            pass
+        stack.extend(children.get(current, []))
+    return total
+
+
+class RssSampler:
+    """Track the peak RSS of a set of process trees in a background thread."""
+
+    def __init__(self, pids_fn, interval=0.5):
+        self.pids_fn = pids_fn
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = sum(process_tree_rss(pid) or 0 for pid in self.pids_fn())
+            self.peak = max(self.peak, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def unlimited_rate_limiter():
+    """A limiter that effectively never waits, so the benchmark measures the scraper itself."""
+    return AdaptiveRateLimiter(rate=1e6, burst=1e6, max_rate=1e6, target_latency=1e6)
+
+
+def run_http(server, args, metrics, sink):
+    """Benchmark the HTTP-first extractor against the fixture server."""
+    links = [server.base_url + app_path(i) for i in range(args.apps)]
+    extractor = scraper.HttpAppExtractor(pool_size=args.workers, rate_limiter=unlimited_rate_limiter(),
+                                         metrics=metrics)
+    page_times = []
+    lock = threading.Lock()
+    extract = extractor.extract
+
+    def timed_extract(app_url):
+        started = time.perf_counter()
+        try:
+            return extract(app_url)
+        finally:
+            with lock:
+                page_times.append(time.perf_counter() - started)
+
+    extractor.extract = timed_extract
+
+    def write(app_info):
+        # Same span as the crawl's own sink writes
+        with metrics.span("sink_write"):
+            sink.write(app_info)
+
+    phases = {}
+    started = time.perf_counter()
+    try:
+        results = extractor.extract_many(links, workers=args.workers, on_result=write)
+    finally:
+        extractor.close()
+    phases["details"] = time.perf_counter() - started
+
+    return {
+        "pages": len(links),
+        "scraped": len(results),
+        "failures": len(links) - len(results),
+        "page_times": page_times,
+        "phases": phases,
+        "browser_peak_rss_bytes": None,
+    }
+
+
+def run_selenium(server, args, metrics, sink):
+    """Benchmark the full Selenium scraper (listing + app pages) against the fixture server."""
+    # The scraper resolves relative links against BASE_URL
+    scraper.MetaStoreSeleniumScraper.BASE_URL = server.base_url + "/quest/gaming/"
+    bench_scraper = scraper.MetaStoreSeleniumScraper(
+        chromedriver_path=args.chromedriver,
+        rate_limiter=unlimited_rate_limiter(),
+        metrics=metrics
+    )
+
+    # Every chromedriver/Chrome session is a child of this process
+    phases = {}
+    try:
+        with RssSampler(lambda: [os.getpid()]) as sampler:
+            started = time.perf_counter()
+            links = bench_scraper._discover_app_links(args.apps)[:args.apps]
+            phases["discover"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            apps = bench_scraper.scrape_app_links(links, workers=args.workers, recycle_after=args.recycle_after,
+                                                  sink=sink)
+            phases["details"] = time.perf_counter() - started
+    finally:
+        bench_scraper.close()
+
+    # Our own interpreter is part of the sampled tree; only report the browser share
+    own_rss = process_tree_rss(os.getpid()) or 0
+    stats = bench_scraper.page_stats
+    return {
+        "pages": len(links),
+        "scraped": len(apps),
+        "failures": len(links) - len(apps),
+        "page_times": list(stats.extract_seconds),
+        "phases": phases,
+        "transfer_bytes": stats.transfer_bytes,
+        "browser_peak_rss_bytes": max(0, sampler.peak - own_rss) if sampler.peak else None,
+    }
+
+
+def summarize(result, elapsed, metrics):
+    page_times = result.pop("page_times")
+    result.update({
+        "elapsed_seconds": round(elapsed, 3),
+        "pages_per_second": round(result["pages"] / elapsed, 2) if elapsed else 0.0,
+        "p50_page_seconds": round(percentile(page_times, 0.50), 4),
+        "p95_page_seconds": round(percentile(page_times, 0.95), 4),
+        "phases": {name: round(seconds, 3) for name, seconds in result["phases"].items()},
+        # Time inside the scraper by step, summed over workers, as in the crawl's run report
+        "crawl_phases": metrics.phases(),
+        "crawl_failures": dict(metrics.failures),
+    })
+    return result
+
+
+def compare_to_baseline(result, baseline, tolerance):
+    """Return a list of regressions compared to the stored baseline."""
+    regressions = []
+    if result["pages_per_second"] < baseline["pages_per_second"] * (1 - tolerance):
+        regressions.append(f"pages/sec {result['pages_per_second']} < baseline {baseline['pages_per_second']}")
+    for key in ("p50_page_seconds", "p95_page_seconds"):
+        if result[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{key} {result[key]} > baseline {baseline[key]}")
+    if result["failures"] > baseline["failures"]:
+        regressions.append(f"failures {result['failures']} > baseline {baseline['failures']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against local fixture pages")
+    parser.add_argument("--engine", choices=["http", "selenium"], default="http",
+                        help="Scraping path to benchmark")
+    parser.add_argument("--apps", type=int, default=200, help="Number of fixture apps")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel workers (HTTP requests or browsers)")
+    parser.add_argument("--recycle-after", type=int, default=50, help="Pages per browser before it is restarted")
+    parser.add_argument("--chromedriver", type=str, help="Path to ChromeDriver executable")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Injected server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency per request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of app pages answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of app pages answered with 429")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for injected latency and failures")
+    parser.add_argument("--baseline-file", type=str, default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the scenario baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--verbose", action="store_true", help="Show scraper log output")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', force=True)
+
+    scenario = (f"{args.engine}-apps{args.apps}-w{args.workers}-lat{args.latency_ms:g}"
+                f"-jit{args.jitter_ms:g}-fail{args.failure_rate:g}-thr{args.throttle_rate:g}")
+    server = FixtureServer(args.apps, args.latency_ms, args.jitter_ms, args.failure_rate,
+                           args.throttle_rate, args.seed).start()
+    metrics = CrawlMetrics()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            sink = JsonlSink(os.path.join(directory, "bench.ndjson"))
+            started = time.perf_counter()
+            runner = run_http if args.engine == "http" else run_selenium
+            try:
+                result = runner(server, args, metrics, sink)
+            finally:
+                sink.close()
+            result = summarize(result, time.perf_counter() - started, metrics)
+    finally:
+        server.stop()
+
+    result["scenario"] = scenario
+    result["server_requests"] = server.requests
+    result["failures_injected"] = server.failures_injected
+    print(json.dumps(result, indent=2))
+
+    baselines = {}
+    if os.path.exists(args.baseline_file):
+        with open(args.baseline_file, encoding="utf-8") as f:
+            baselines = json.load(f)
+
+    if args.save_baseline:
+        baselines[scenario] = result
+        os.makedirs(os.path.dirname(args.baseline_file), exist_ok=True)
+        with open(args.baseline_file, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Saved baseline for {scenario} to {args.baseline_file}")
+        return 0
+
+    if scenario in baselines:
+        regressions = compare_to_baseline(result, baselines[scenario], args.tolerance)
+        if regressions:
+            print("REGRESSION: " + "; ".join(regressions))
+            return 1
+        print(f"OK: within {args.tolerance:.0%} of baseline for {scenario}")
+    else:
+        print(f"No baseline for {scenario}; run with --save-baseline to store one")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
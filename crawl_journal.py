@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlJournal:
+    """
+    Append-only journal of a crawl's link frontier and completed app records.
+    Entries are written as JSON lines and fsync'd in batches so a crashed or
+    killed crawl can be resumed without revisiting finished URLs. Only the
+    completed URLs are kept in memory; records are read back from the file.
+    """
+
+    def __init__(self, path="crawl_journal.jsonl", sync_every=20, resume=False):
+        """
+        Open the journal.
+
+        Args:
+            path: Journal file path
+            sync_every: Number of entries to buffer between fsyncs
+            resume: Replay an existing journal instead of starting a new one
+        """
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self.frontier = []
+        self.completed = set()
+        # Completed URLs that were new or changed compared to the crawl state
+        self.changed_urls = set()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        if resume and os.path.exists(path):
+            self._replay()
+
+        # Keep appending to an unfinished crawl, otherwise start over
+        self._file = open(path, "a" if self.frontier else "w", encoding="utf-8")
+
+    def _replay(self):
+        """Rebuild the frontier and completed URLs from the journal file."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash; everything before it is intact
+                    logger.warning(f"Ignoring incomplete journal entry in {self.path}")
+                    continue
+
+                if entry.get("type") == "frontier":
+                    self.frontier = entry["links"]
+                elif entry.get("type") == "record":
+                    self.completed.add(entry["url"])
+                    if entry.get("changed", True):
+                        self.changed_urls.add(entry["url"])
+                elif entry.get("type") == "complete":
+                    # The previous crawl finished; there is nothing to resume
+                    self.frontier = []
+                    self.completed = set()
+                    self.changed_urls = set()
+
+        if self.frontier:
+            logger.info(f"Loaded journal {self.path}: {len(self.completed)} of {len(self.frontier)} apps completed")
+
+    def completed_records(self):
+        """
+        Yield (app_details, changed) for each record of the unfinished crawl, read from the file.
+
+        Call before recording new apps; the journal only holds the current
+        crawl, since a finished one is started over.
+        """
+        if not self.frontier:
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("type") == "record":
+                    yield entry["app"], entry.get("changed", True)
+
+    def _append(self, entry, sync=False):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._pending += 1
+            if sync or self._pending >= self.sync_every:
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def write_frontier(self, links):
+        """Record the full list of app links to visit."""
+        self.frontier = list(links)
+        self._append({"type": "frontier", "links": self.frontier}, sync=True)
+
+    def record(self, app_details, changed=True):
+        """Record a completed app and whether it changed since the last crawl."""
+        self.completed.add(app_details["source_url"])
+        if changed:
+            self.changed_urls.add(app_details["source_url"])
+        self._append({"type": "record", "url": app_details["source_url"], "app": app_details,
+                      "changed": changed})
+
+    def finish(self):
+        """Mark the crawl as complete so the next run starts fresh."""
+        self._append({"type": "complete"}, sync=True)
+
+    def close(self):
+        """Flush outstanding entries and close the journal file."""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
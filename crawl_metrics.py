@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlMetrics:
+    """
+    Timing spans and counters for a single crawl run.
+    Shared by every worker in the run; all methods are thread-safe.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._spans = {}
+        self.failures = {}
+        self.counters = {}
+
+    @contextmanager
+    def span(self, phase):
+        """Time the enclosed block under the given phase name."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.monotonic() - started)
+
+    def observe(self, phase, seconds):
+        """Record one duration for a phase."""
+        with self._lock:
+            self._spans.setdefault(phase, []).append(seconds)
+
+    def failure(self, kind):
+        """Count a failure of the given type (timeout, no_such_element, webdriver_crash, ...)."""
+        with self._lock:
+            self.failures[kind] = self.failures.get(kind, 0) + 1
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def phases(self):
+        """Per-phase count, total, mean, p50, p95 and max in seconds."""
+        with self._lock:
+            spans = {phase: sorted(values) for phase, values in self._spans.items()}
+        summary = {}
+        for phase, values in spans.items():
+            summary[phase] = {
+                "count": len(values),
+                "total_seconds": round(sum(values), 4),
+                "mean_seconds": round(sum(values) / len(values), 4),
+                "p50_seconds": round(values[len(values) // 2], 4),
+                "p95_seconds": round(values[min(len(values) - 1, int(0.95 * len(values)))], 4),
+                "max_seconds": round(values[-1], 4),
+            }
+        return summary
+
+    def report(self, **extra):
+        """Build the machine-readable run report."""
+        with self._lock:
+            failures = dict(self.failures)
+            counters = dict(self.counters)
+        report = {
+            "started_at": self.started_at,
+            "duration_seconds": round(time.monotonic() - self._started, 3),
+            "phases": self.phases(),
+            "failures": failures,
+            "counters": counters,
+        }
+        report.update(extra)
+        return report
+
+    def write_json(self, path, **extra):
+        """Write the run report as JSON."""
+        report = self.report(**extra)
+        _atomic_write(path, json.dumps(report, indent=2, sort_keys=True) + "\n")
+        logger.info(f"Run report saved to {path}")
+        return report
+
+    def write_prometheus(self, path, **gauges):
+        """
+        Write the run report in Prometheus text format for the node_exporter
+        textfile collector.
+
+        Args:
+            path: Output file, normally ending in .prom
+            gauges: Extra numeric values exported as meta_scraper_<name>
+        """
+        report = self.report()
+        lines = [
+            "# HELP meta_scraper_last_run_timestamp_seconds Start time of the last crawl run.",
+            "# TYPE meta_scraper_last_run_timestamp_seconds gauge",
+            f"meta_scraper_last_run_timestamp_seconds {report['started_at']:.3f}",
+            "# HELP meta_scraper_run_duration_seconds Wall-clock duration of the last crawl run.",
+            "# TYPE meta_scraper_run_duration_seconds gauge",
+            f"meta_scraper_run_duration_seconds {report['duration_seconds']}",
+            "# HELP meta_scraper_phase_seconds_total Time spent in each crawl phase.",
+            "# TYPE meta_scraper_phase_seconds_total counter",
+        ]
+        for phase, stats in sorted(report["phases"].items()):
+            lines.append(f'meta_scraper_phase_seconds_total{{phase="{phase}"}} {stats["total_seconds"]}')
+        lines += [
+            "# HELP meta_scraper_phase_count Number of spans recorded for each crawl phase.",
+            "# TYPE meta_scraper_phase_count counter",
+        ]
+        for phase, stats in sorted(report["phases"].items()):
+            lines.append(f'meta_scraper_phase_count{{phase="{phase}"}} {stats["count"]}')
+        lines += [
+            "# HELP meta_scraper_phase_p95_seconds 95th percentile span duration for each crawl phase.",
+            "# TYPE meta_scraper_phase_p95_seconds gauge",
+        ]
+        for phase, stats in sorted(report["phases"].items()):
+            lines.append(f'meta_scraper_phase_p95_seconds{{phase="{phase}"}} {stats["p95_seconds"]}')
+        lines += [
+            "# HELP meta_scraper_failures_total Failures by type during the last crawl run.",
+            "# TYPE meta_scraper_failures_total counter",
+        ]
+        for kind, count in sorted(report["failures"].items()):
+            lines.append(f'meta_scraper_failures_total{{type="{kind}"}} {count}')
+        for name, value in sorted({**report["counters"], **gauges}.items()):
+            if isinstance(value, (int, float)):
+                lines += [f"# TYPE meta_scraper_{name} gauge", f"meta_scraper_{name} {value}"]
+
+        _atomic_write(path, "\n".join(lines) + "\n")
+        logger.info(f"Prometheus metrics saved to {path}")
+
+
+def _atomic_write(path, content):
+    """Write via a temporary file and rename so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(app_details):
+    """Stable hash of an app record, used to detect changed apps between runs."""
+    record = dict(app_details)
+    # Signed CDN URLs rotate their expiry parameters on every visit
+    record["app_image_url"] = (record.get("app_image_url") or "").split("?")[0]
+    if "source_image_url" in record:
+        record["source_image_url"] = (record["source_image_url"] or "").split("?")[0]
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CrawlStateStore:
+    """
+    Persistent per-app crawl state backed by SQLite.
+    Remembers a content hash, HTTP validators and the last scraped record for
+    every app so later runs can skip unchanged apps.
+    """
+
+    def __init__(self, path="crawl_state.db"):
+        """Open (or create) the state database."""
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS app_state (
+                source_url TEXT PRIMARY KEY,
+                app_id TEXT,
+                content_hash TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                last_seen REAL,
+                last_changed REAL,
+                record TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_app_state_app_id ON app_state (app_id)")
+        self.conn.commit()
+
+        # URLs whose content changed (or was new) during this run
+        self.changed_urls = set()
+
+    def get(self, source_url):
+        """Return the stored state row for a URL as a dict, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT app_id, content_hash, etag, last_modified, last_seen, last_changed, record "
+                "FROM app_state WHERE source_url = ?",
+                (source_url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "app_id": row[0],
+            "content_hash": row[1],
+            "etag": row[2],
+            "last_modified": row[3],
+            "last_seen": row[4],
+            "last_changed": row[5],
+            "record": json.loads(row[6]) if row[6] else None,
+        }
+
+    def known_apps(self):
+        """Return a dict of app_id -> (last visit timestamp, source_url) for every stored app."""
+        with self._lock:
+            # SQLite takes source_url from the row holding MAX(last_seen)
+            rows = self.conn.execute(
+                "SELECT app_id, MAX(last_seen), source_url FROM app_state "
+                "WHERE app_id IS NOT NULL GROUP BY app_id"
+            ).fetchall()
+        return {app_id: (last_seen, source_url) for app_id, last_seen, source_url in rows}
+
+    def is_fresh(self, source_url, max_age):
+        """
+        Check whether an app was seen recently enough to skip entirely.
+
+        Args:
+            source_url: URL of the app page
+            max_age: Maximum age in seconds; 0 or None never counts as fresh
+
+        Returns:
+            True if the app has a stored record seen within max_age
+        """
+        if not max_age:
+            return False
+        state = self.get(source_url)
+        return bool(state and state["record"] and time.time() - state["last_seen"] < max_age)
+
+    def record(self, app_details, etag=None, last_modified=None):
+        """
+        Store a freshly scraped record.
+
+        Args:
+            app_details: App details dictionary (must include source_url)
+            etag: ETag header from the page response, if any
+            last_modified: Last-Modified header from the page response, if any
+
+        Returns:
+            True if the app is new or its content changed since the last run
+        """
+        source_url = app_details["source_url"]
+        digest = content_hash(app_details)
+        now = time.time()
+        previous = self.get(source_url)
+        changed = previous is None or previous["content_hash"] != digest
+
+        # Keep the old validators if this visit did not return any
+        if previous is not None:
+            etag = etag or previous["etag"]
+            last_modified = last_modified or previous["last_modified"]
+
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO app_state "
+                "(source_url, app_id, content_hash, etag, last_modified, last_seen, last_changed, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    source_url,
+                    app_details.get("app_id"),
+                    digest,
+                    etag,
+                    last_modified,
+                    now,
+                    now if changed else previous["last_changed"],
+                    json.dumps(app_details, ensure_ascii=False),
+                )
+            )
+            self.conn.commit()
+            if changed:
+                self.changed_urls.add(source_url)
+
+        return changed
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
@@ -244,54 +244,98 @@ import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import './App.css';
 
+const API_BASE_URL = 'http://localhost:5000/api';
+// Largest page /api/apps serves
+const PAGE_SIZE = 100;
+
 function App() {
   const [apps, setApps] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const [selectedCategory, setSelectedCategory] = useState('All');
-  const [categories, setCategories] = useState([]);
+  const [categories, setCategories] = useState(['All']);
+  const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+
+  // Build the /api/apps URL for the selected category, resuming after `cursor` if given
+  const appsUrl = (cursor) => {
+    const params = new URLSearchParams({ per_page: PAGE_SIZE });
+    if (selectedCategory && selectedCategory !== 'All') {
+      params.append('category', selectedCategory);
+    }
+    if (cursor) {
+      params.append('cursor', cursor);
+    }
+    return `${API_BASE_URL}/apps?${params.toString()}`;
+  };
 
-  // Fetch apps from API
+  // Fetch the category list once; the loaded page may not contain every category
   useEffect(() => {
+    axios.get(`${API_BASE_URL}/categories`)
+      .then(response => {
+        setCategories(['All', ...(response.data.categories || []).filter(Boolean)]);
+      })
+      .catch(err => console.error('Error fetching categories:', err));
+  }, []);
+
+  // Fetch the first page of apps whenever the category changes
+  useEffect(() => {
+    let ignore = false;
+
     const fetchApps = async () => {
       try {
         setLoading(true);
+        setError(null);
         
-        // Build API URL based on selected category
-        let url = 'http://localhost:5000/api/apps';
-        if (selectedCategory && selectedCategory !== 'All') {
-          url += `?category=${encodeURIComponent(selectedCategory)}`;
+        const response = await axios.get(appsUrl());
+        if (ignore) {
+          return;
         }
         
-        const response = await axios.get(url);
-        
         // Check if response contains data property
         if (response.data && response.data.data) {
           setApps(response.data.data);
-          
-          // Extract unique categories for filter
-          const uniqueCategories = ['All'];
-          response.data.data.forEach(app => {
-            if (app.category && !uniqueCategories.includes(app.category)) {
-              uniqueCategories.push(app.category);
-            }
-          });
-          setCategories(uniqueCategories);
+          setTotal(response.data.total);
+          setNextCursor(response.data.next_cursor);
         } else {
           console.error('Unexpected API response format:', response);
           setError('Unexpected data format from API');
         }
       } catch (err) {
-        console.error('Error fetching data:', err);
-        setError(`Failed to fetch apps: ${err.message}`);
+        if (!ignore) {
+          console.error('Error fetching data:', err);
+          setError(`Failed to fetch apps: ${err.message}`);
+        }
       } finally {
-        setLoading(false);
+        if (!ignore) {
+          setLoading(false);
+        }
       }
     };
 
     fetchApps();
+    // Drop the response of a request made for a previous category
+    return () => {
+      ignore = true;
+    };
   }, [selectedCategory]);
 
+  // Append the next page, following the cursor returned with the last one
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await axios.get(appsUrl(nextCursor));
+      setApps(prev => [...prev, ...response.data.data]);
+      setNextCursor(response.data.next_cursor);
+    } catch (err) {
+      console.error('Error fetching more apps:', err);
+      setError(`Failed to fetch more apps: ${err.message}`);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Handle category change
   const handleCategoryChange = (event) => {
     setSelectedCategory(event.target.value);
@@ -332,6 +376,7 @@ function App() {
             id="category-filter" 
             value={selectedCategory} 
             onChange={handleCategoryChange}
+            disabled={loadingMore}
           >
             {categories.map((category) => (
               <option key={category} value={category}>{category}</option>
@@ -406,6 +451,17 @@ function App() {
         ))}
       </div>
       
+      {!loading && apps.length > 0 && (
+        <div className="load-more">
+          <p>Showing {apps.length} of {total} apps</p>
+          {nextCursor && (
+            <button className="view-button" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          )}
+        </div>
+      )}
+      
       <footer>
         <p>Data scraped from Meta Quest Store.</p>
       </footer>
@@ -0,0 +1,206 @@
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+try:
+    from PIL import Image
+except ImportError:  # optional; without it images are cached at their original size
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# File extension per detected image format; the backend serves the same set
+IMAGE_EXTENSIONS = {"jpeg": "jpg", "png": "png", "gif": "gif", "webp": "webp"}
+
+
+def source_key(image_url):
+    """Identify an image by its URL without the query string, which holds rotating CDN signatures."""
+    parts = urlsplit(image_url)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, "", ""))
+
+
+def sniff_format(data):
+    """Detect an image format from its magic bytes, or None if data is not a supported image."""
+    if data[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def image_path(directory, image_hash, extension):
+    """Path of a cached image; files are sharded by the first two hash characters."""
+    return os.path.join(directory, image_hash[:2], f"{image_hash}.{extension}")
+
+
+class ImageCache:
+    """
+    Content-addressed local copy of app images.
+
+    Each image is downloaded once, shrunk to a thumbnail and stored under the
+    SHA-256 of the stored bytes, so identical images share one file. Records
+    are rewritten to point at the backend's /api/images/<hash> route and keep
+    the original URL in source_image_url. An SQLite index maps each source
+    URL (without its signed query string) to its hash, so an image is only
+    downloaded again when the source URL path changes or the file is gone.
+    """
+
+    def __init__(self, directory="image_cache", base_url="http://localhost:5000/api/images/",
+                 thumbnail_size=400, timeout=15, pool_size=8):
+        """
+        Open (or create) the cache directory and its index.
+
+        Args:
+            directory: Directory the images and index are stored in
+            base_url: URL prefix records point at; the image hash is appended
+            thumbnail_size: Maximum width and height of stored images in pixels
+            timeout: Download timeout in seconds
+            pool_size: Maximum number of pooled connections per image host
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.directory = directory
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.thumbnail_size = thumbnail_size
+        self.timeout = timeout
+        self.downloaded = 0
+        self.reused = 0
+        self.failed = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS images (
+                source_key TEXT PRIMARY KEY,
+                image_hash TEXT,
+                extension TEXT,
+                fetched_at REAL
+            )
+        """)
+        self.conn.commit()
+
+        if Image is None:
+            logger.warning("Pillow is not installed; images are cached without resizing")
+
+    def localize(self, app_details):
+        """
+        Point an app record at its cached image, downloading it if needed.
+
+        The record is updated in place. If the image cannot be fetched the
+        record keeps its remote URL.
+
+        Returns:
+            The same record
+        """
+        image_url = app_details.get("app_image_url")
+        if not image_url or image_url.startswith(self.base_url):
+            return app_details
+        try:
+            image_hash = self.cache(image_url)
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Could not cache image for {app_details.get('app_id')}: {e}")
+            return app_details
+        app_details["source_image_url"] = image_url
+        app_details["app_image_url"] = self.base_url + image_hash
+        return app_details
+
+    def cache(self, image_url):
+        """
+        Make sure an image is in the cache.
+
+        Returns:
+            Hash of the stored image
+
+        Raises:
+            ValueError: If the URL does not return a supported image
+            requests.RequestException: If the download fails
+        """
+        key = source_key(image_url)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT image_hash, extension FROM images WHERE source_key = ?", (key,)
+            ).fetchone()
+        if row and os.path.exists(image_path(self.directory, *row)):
+            self.reused += 1
+            return row[0]
+
+        response = self.session.get(image_url, timeout=self.timeout)
+        response.raise_for_status()
+        data, image_format = self._thumbnail(response.content)
+        image_hash = hashlib.sha256(data).hexdigest()
+        extension = IMAGE_EXTENSIONS[image_format]
+        self._store(data, image_path(self.directory, image_hash, extension))
+        self.downloaded += 1
+
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO images (source_key, image_hash, extension, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, image_hash, extension, time.time())
+            )
+            self.conn.commit()
+        return image_hash
+
+    def _thumbnail(self, data):
+        """
+        Shrink an image to fit thumbnail_size.
+
+        Returns:
+            Tuple of (image bytes, format name)
+        """
+        image_format = sniff_format(data)
+        if image_format is None:
+            raise ValueError("response is not a supported image")
+        if Image is None or image_format == "gif":
+            # Animated GIFs would lose their frames
+            return data, image_format
+
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width <= self.thumbnail_size and image.height <= self.thumbnail_size:
+                return data, image_format
+            image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+            output = io.BytesIO()
+            if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+                image.save(output, format="PNG", optimize=True)
+                return output.getvalue(), "png"
+            image.convert("RGB").save(output, format="JPEG", quality=85, optimize=True)
+            return output.getvalue(), "jpeg"
+
+    @staticmethod
+    def _store(data, path):
+        """Write a file atomically; an existing file already holds the same bytes."""
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def close(self):
+        """Log a summary and close the index."""
+        logger.info(f"Image cache: {self.downloaded} downloaded, {self.reused} reused, {self.failed} failed")
+        self.session.close()
+        self.conn.close()
@@ -0,0 +1,278 @@
+import gzip
+import heapq
+import io
+import logging
+import re
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from datetime import datetime
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from rate_limiter import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# App pages end in a numeric app_id: /experiences/<slug>/<app_id>/ or /experiences/quest/<app_id>/
+APP_URL_PATTERN = re.compile(r"""(?:https?://[^\s"'<>]+)?/experiences/[^\s"'<>?#]*?\d{6,}/?""")
+
+# Frontier tiers, visited in this order
+NEW, UPDATED, STALE = 0, 1, 2
+
+
+def canonical_app_url(href, base_url="https://www.meta.com/"):
+    """
+    Normalize an app page link.
+
+    Query strings, fragments and anything after the app_id segment are
+    dropped, so every link to the same app maps to one URL and one app_id.
+
+    Args:
+        href: Absolute or relative link
+        base_url: URL relative links are resolved against
+
+    Returns:
+        Tuple of (app_id, canonical URL), or None if href is not an app page
+    """
+    if not href:
+        return None
+    parts = urlsplit(urljoin(base_url, href.strip()))
+    if parts.scheme not in ("http", "https"):
+        return None
+    segments = [segment for segment in parts.path.split("/") if segment]
+    if "experiences" not in segments:
+        return None
+    start = segments.index("experiences") + 1
+    for index in range(len(segments) - 1, start - 1, -1):
+        if segments[index].isdigit():
+            path = "/" + "/".join(segments[:index + 1]) + "/"
+            return segments[index], urlunsplit((parts.scheme, parts.netloc.lower(), path, "", ""))
+    return None
+
+
+def parse_lastmod(value):
+    """Parse a sitemap <lastmod> (W3C datetime) into a Unix timestamp, or None."""
+    if not value:
+        return None
+    value = value.strip().replace("Z", "+00:00")
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def fetch_document(location, session=None, rate_limiter=None, timeout=30):
+    """
+    Read a discovery source from a URL or local file, un-gzipping it if needed.
+
+    Raises:
+        OSError: If a local file cannot be read
+        requests.RequestException: If the URL cannot be fetched
+    """
+    if not location.startswith(("http://", "https://")):
+        with open(location, "rb") as f:
+            body = f.read()
+    else:
+        import requests
+
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        started = time.monotonic()
+        response = (session or requests).get(location, timeout=timeout)
+        if rate_limiter is not None:
+            rate_limiter.observe(time.monotonic() - started, response.status_code,
+                                 parse_retry_after(response.headers.get("Retry-After")))
+        response.raise_for_status()
+        body = response.content
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    return body
+
+
+class LinkFrontier:
+    """
+    Deduplicated, prioritized set of app pages to visit.
+
+    Links are keyed by app_id in a dict, so adding a link is O(1) however
+    many URL variants of an app are seen. Known apps keep the URL the crawl
+    state has them under. Apps missing from the crawl state
+    come first, then known apps whose sitemap lastmod is newer than their
+    last visit, then the remaining known apps, least recently seen first.
+    Ties keep discovery order.
+    """
+
+    def __init__(self, known=None):
+        """
+        Args:
+            known: Optional dict of app_id -> (last visit timestamp, source_url)
+                from CrawlStateStore.known_apps(); apps not in it are new
+        """
+        self.known = known or {}
+        self._entries = {}  # app_id -> [priority, url]
+        self._order = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, app_id):
+        return app_id in self._entries
+
+    def add(self, href, lastmod=None, base_url="https://www.meta.com/"):
+        """
+        Add a link to the frontier.
+
+        Args:
+            href: App page link, in any URL variant
+            lastmod: Optional timestamp the source reports the page changed at
+            base_url: URL relative links are resolved against
+
+        Returns:
+            True if the link is an app page that was not in the frontier yet
+        """
+        canonical = canonical_app_url(href, base_url)
+        if canonical is None:
+            return False
+        app_id, url = canonical
+        priority = self._priority(app_id, lastmod)
+        entry = self._entries.get(app_id)
+        if entry is not None:
+            # A later source can only raise an app's priority
+            entry[0] = min(entry[0], priority[:2] + entry[0][2:])
+            return False
+        if app_id in self.known:
+            url = self.known[app_id][1]
+        self._entries[app_id] = [priority + (self._order,), url]
+        self._order += 1
+        return True
+
+    def add_all(self, hrefs, base_url="https://www.meta.com/"):
+        """Add many links; returns the number of new apps."""
+        return sum(self.add(href, base_url=base_url) for href in hrefs)
+
+    def _priority(self, app_id, lastmod):
+        if app_id not in self.known:
+            return (NEW, 0)
+        seen = self.known[app_id][0]
+        if lastmod is not None and lastmod > seen:
+            return (UPDATED, seen)
+        return (STALE, seen)
+
+    def counts(self):
+        """Number of frontier apps per tier."""
+        counts = {"new": 0, "updated": 0, "stale": 0}
+        names = {NEW: "new", UPDATED: "updated", STALE: "stale"}
+        for priority, _ in self._entries.values():
+            counts[names[priority[0]]] += 1
+        return counts
+
+    def take(self, limit=None):
+        """
+        Return up to `limit` URLs in visiting order.
+
+        Returns:
+            List of canonical app URLs
+        """
+        entries = self._entries.values()
+        if limit is None or limit >= len(self._entries):
+            chosen = sorted(entries)
+        else:
+            chosen = heapq.nsmallest(limit, entries)
+        return [url for _, url in chosen]
+
+
+class SitemapSource:
+    """
+    App links from an XML sitemap or sitemap index (optionally gzipped).
+
+    Sitemap indexes are followed to their child sitemaps. Each link is
+    yielded with its <lastmod> so changed apps can be revisited first.
+    """
+
+    def __init__(self, location, session=None, rate_limiter=None, timeout=30, max_sitemaps=500):
+        """
+        Args:
+            location: Sitemap URL or local file path
+            session: Optional requests.Session used for fetching
+            rate_limiter: Optional AdaptiveRateLimiter pacing fetches
+            timeout: Request timeout in seconds
+            max_sitemaps: Upper bound on sitemaps fetched through indexes
+        """
+        self.location = location
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.max_sitemaps = max_sitemaps
+
+    def __iter__(self):
+        """Yield (url, lastmod) for every page listed in the sitemap tree."""
+        pending = deque([self.location])
+        visited = set()
+        while pending and len(visited) < self.max_sitemaps:
+            location = pending.popleft()
+            if location in visited:
+                continue
+            visited.add(location)
+            try:
+                body = fetch_document(location, self.session, self.rate_limiter, self.timeout)
+            except Exception as e:
+                logger.warning(f"Could not fetch sitemap {location}: {e}")
+                continue
+
+            loc = lastmod = None
+            try:
+                # Stream the document so large sitemaps are never held as a tree
+                for _, element in ET.iterparse(io.BytesIO(body)):
+                    name = _local_name(element.tag)
+                    if name == "loc":
+                        loc = (element.text or "").strip()
+                    elif name == "lastmod":
+                        lastmod = parse_lastmod(element.text)
+                    elif name == "sitemap":
+                        if loc:
+                            pending.append(loc)
+                        loc = lastmod = None
+                        element.clear()
+                    elif name == "url":
+                        if loc:
+                            yield loc, lastmod
+                        loc = lastmod = None
+                        element.clear()
+            except ET.ParseError as e:
+                logger.warning(f"Invalid sitemap {location}: {e}")
+
+
+class FeedSource:
+    """
+    App links from a listing feed: any JSON, RSS or HTML document (URL or
+    local file) that mentions app page URLs. Links are found by pattern, so
+    the feed's structure does not matter.
+    """
+
+    def __init__(self, location, session=None, rate_limiter=None, timeout=30):
+        """
+        Args:
+            location: Feed URL or local file path
+            session: Optional requests.Session used for fetching
+            rate_limiter: Optional AdaptiveRateLimiter pacing fetches
+            timeout: Request timeout in seconds
+        """
+        self.location = location
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+
+    def __iter__(self):
+        """Yield (url, None) for every app link in the feed."""
+        try:
+            body = fetch_document(self.location, self.session, self.rate_limiter, self.timeout)
+        except Exception as e:
+            logger.warning(f"Could not fetch feed {self.location}: {e}")
+            return
+        # JSON feeds escape slashes
+        text = body.decode("utf-8", errors="replace").replace("\\/", "/")
+        for match in APP_URL_PATTERN.finditer(text):
+            yield match.group(0), None
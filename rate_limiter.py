@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given in seconds, or return None."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token-bucket rate limiter shared by every worker hitting the same host.
+    The refill rate grows additively while responses are fast and healthy and
+    is cut multiplicatively on slow responses or 429/503 replies.
+    """
+
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self, rate=1.0, burst=2, min_rate=0.1, max_rate=4.0,
+                 target_latency=5.0, increase_step=0.05):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Initial requests per second
+            burst: Maximum number of requests that can be sent back to back
+            min_rate: Lower bound for the adapted rate
+            max_rate: Upper bound for the adapted rate
+            target_latency: Page latency in seconds above which the rate is reduced
+            increase_step: Requests per second added after each healthy response
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.increase_step = increase_step
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def observe(self, latency, status=None, retry_after=None):
+        """
+        Adapt the rate to a finished request.
+
+        Args:
+            latency: Seconds the request took
+            status: HTTP status code, if known
+            retry_after: Seconds the server asked us to wait, if any
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if status in self.THROTTLE_STATUSES:
+                self.rate = max(self.min_rate, self.rate / 2)
+                pause = retry_after if retry_after is not None else 1 / self.rate
+                self._blocked_until = max(self._blocked_until, now + pause)
+                self._tokens = 0.0
+                logger.warning(f"Throttled (HTTP {status}); pausing {pause:.1f}s, rate now {self.rate:.2f} req/s")
+            elif latency > self.target_latency:
+                self.rate = max(self.min_rate, self.rate * 0.8)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
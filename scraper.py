@@ -5,6 +5,11 @@ import re
 import json
 import os
 import argparse
+import queue
+import threading
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
 from urllib.parse import urljoin
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -14,32 +19,133 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
-
-import pymongo
-from pymongo import MongoClient
-
-def save_to_mongodb(data, connection_string="mongodb://localhost:27017/", 
-                   database_name="meta_store", collection_name="meta_store"):
-    """Save scraped data directly to MongoDB."""
-    try:
-        # Connect to MongoDB
-        client = MongoClient(connection_string)
-        db = client[database_name]
-        collection = db[collection_name]
-        
-        # Insert many documents at once
-        result = collection.insert_many(data)
-        
-        logger.info(f"Successfully inserted {len(result.inserted_ids)} documents into MongoDB")
-        return True
-    except Exception as e:
-        logger.error(f"Error saving data to MongoDB: {e}")
-        return False
+from crawl_journal import CrawlJournal
+from crawl_metrics import CrawlMetrics
+from crawl_state import CrawlStateStore
+from image_cache import ImageCache
+from link_discovery import FeedSource, LinkFrontier, SitemapSource, canonical_app_url
+from rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from sinks import ApiImportSink, JsonlSink, SinkPipeline, read_jsonl
+from work_queue import LeaseHeartbeat, open_work_queue
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def parse_rating_text(rating_text):
+    """Extract (ratings, num_reviews) from a block of rating text."""
+    ratings = 0.0
+    num_reviews = 0
+    
+    rating_match = re.search(r'(\d+\.?\d*)\s*(?:star|/\s*5)', rating_text, re.IGNORECASE)
+    if rating_match:
+        ratings = float(rating_match.group(1))
+    
+    review_match = re.search(r'(\d{1,3}(?:,\d{3})*)\s*(?:review|rating)', rating_text, re.IGNORECASE)
+    if review_match:
+        num_reviews = int(review_match.group(1).replace(",", ""))
+    
+    return ratings, num_reviews
+
+def failure_kind(error):
+    """Classify an exception for the run report's failure counters."""
+    if isinstance(error, TimeoutException):
+        return "timeout"
+    if isinstance(error, NoSuchElementException):
+        return "no_such_element"
+    if isinstance(error, WebDriverException):
+        return "webdriver_crash"
+    return "other"
+
+def default_category(app_url, app_name):
+    """Guess a generic category when the page does not show one."""
+    if "game" in app_url.lower() or "game" in app_name.lower():
+        return "Game"
+    return "App"
+
+class NetworkPolicy:
+    """
+    Which requests a browser session may make and when navigation returns.
+    Blocking is applied through the Chrome DevTools Protocol, so it covers
+    every request the page makes, not just the top-level documents.
+    """
+    
+    # URL patterns blocked for each resource type
+    RESOURCE_TYPE_PATTERNS = {
+        "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+        "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+        "stylesheet": ["*.css"],
+        "media": ["*.mp4", "*.webm", "*.m3u8", "*.mpd", "*.mp3", "*.ogg"],
+        "tracking": [
+            "*google-analytics.com*",
+            "*googletagmanager.com*",
+            "*doubleclick.net*",
+            "*connect.facebook.net*",
+            "*facebook.com/tr*",
+            "*/ajax/bz*",
+        ],
+    }
+    DEFAULT_BLOCKED_TYPES = ("image", "font", "media", "tracking")
+    PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+    
+    def __init__(self, blocked_types=DEFAULT_BLOCKED_TYPES, blocked_patterns=None, page_load_strategy="eager"):
+        """
+        Args:
+            blocked_types: Resource types to block (keys of RESOURCE_TYPE_PATTERNS)
+            blocked_patterns: Extra URL patterns to block
+            page_load_strategy: "normal" waits for the load event, "eager" for
+                DOMContentLoaded and "none" returns immediately; the scraper
+                always follows navigation with a targeted element wait on
+                the new document
+        """
+        unknown = set(blocked_types) - set(self.RESOURCE_TYPE_PATTERNS)
+        if unknown:
+            raise ValueError(f"Unknown resource types: {', '.join(sorted(unknown))}")
+        if page_load_strategy not in self.PAGE_LOAD_STRATEGIES:
+            raise ValueError(f"Unknown page load strategy: {page_load_strategy}")
+        self.blocked_types = tuple(blocked_types)
+        self.blocked_patterns = list(blocked_patterns or [])
+        self.page_load_strategy = page_load_strategy
+    
+    def url_patterns(self):
+        """All URL patterns to pass to Network.setBlockedURLs."""
+        patterns = []
+        for resource_type in self.blocked_types:
+            patterns.extend(self.RESOURCE_TYPE_PATTERNS[resource_type])
+        return patterns + self.blocked_patterns
+
+
+class PageLoadStats:
+    """Thread-safe per-run totals of bytes transferred and time-to-extract per page."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.transfer_bytes = 0
+        self.extract_seconds = []
+    
+    def record(self, transfer_bytes, seconds):
+        with self._lock:
+            self.pages += 1
+            self.transfer_bytes += transfer_bytes or 0
+            self.extract_seconds.append(seconds)
+    
+    def summary(self):
+        """Return run totals as a dictionary."""
+        with self._lock:
+            times = sorted(self.extract_seconds)
+            pages = self.pages
+            transfer_bytes = self.transfer_bytes
+        return {
+            "pages": pages,
+            "transfer_bytes": transfer_bytes,
+            "avg_bytes_per_page": transfer_bytes // pages if pages else 0,
+            "avg_extract_seconds": sum(times) / len(times) if times else 0.0,
+            "p50_extract_seconds": times[len(times) // 2] if times else 0.0,
+            "max_extract_seconds": times[-1] if times else 0.0,
+        }
+
+
 class MetaStoreSeleniumScraper:
     """
     Selenium-based scraper for the Meta Quest Store.
@@ -54,9 +160,119 @@ class MetaStoreSeleniumScraper:
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.127 Safari/537.36",
     ]
 
-    def __init__(self, chromedriver_path=None):
-        """Initialize the scraper with a configured WebDriver."""
-        self.driver = self._setup_driver(chromedriver_path)
+    # Selectors used to pull app fields off a detail page
+    APP_IMAGE_SELECTOR = "img[alt*='banner'], img[alt*='cover'], img[alt*='logo'], img[src*='banner'], img[src*='cover']"
+    RATING_XPATH = "//*[contains(text(), 'star') or contains(text(), 'rating') or contains(@class, 'rating') or contains(@class, 'stars')]"
+    DESCRIPTION_XPATH = "//div[contains(@class, 'description') or contains(@class, 'detail') or contains(@class, 'about')]//p"
+    CATEGORY_XPATH = "//div[contains(text(), 'Category') or contains(text(), 'Genre')]/following-sibling::div | //span[contains(text(), 'Category') or contains(text(), 'Genre')]/following-sibling::span"
+
+    # Runs every detail-page selector inside the browser and returns all raw
+    # fields in a single WebDriver round trip
+    APP_DETAILS_SCRIPT = """
+        var selectors = arguments[0];
+        function first(xpath) {
+            return document.evaluate(xpath, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        function text(el) {
+            return el ? (el.innerText || el.textContent || '').trim() : null;
+        }
+        var image = document.querySelector(selectors.image);
+        var description = text(first(selectors.description));
+        if (description === null) {
+            var paragraphs = document.getElementsByTagName('p');
+            for (var i = 0; i < paragraphs.length; i++) {
+                var paragraph = paragraphs[i].innerText || '';
+                if (paragraph.length > 50) {
+                    description = paragraph.trim();
+                    break;
+                }
+            }
+        }
+        var navigation = performance.getEntriesByType('navigation')[0];
+        var transferBytes = navigation ? navigation.transferSize : 0;
+        performance.getEntriesByType('resource').forEach(function (entry) {
+            transferBytes += entry.transferSize || 0;
+        });
+        return {
+            status: navigation && navigation.responseStatus ? navigation.responseStatus : null,
+            transfer_bytes: transferBytes,
+            app_name: text(document.querySelector('h1')),
+            app_image_url: image ? image.src : null,
+            rating_text: text(first(selectors.rating)),
+            description: description,
+            category: text(first(selectors.category))
+        };
+    """
+
+    # Number of distinct hrefs currently matched by a CSS selector
+    COUNT_LINKS_SCRIPT = """
+        var hrefs = new Set();
+        document.querySelectorAll(arguments[0]).forEach(function (element) {
+            hrefs.add(element.href);
+        });
+        return hrefs.size;
+    """
+
+    # HTTP status of the current document (null where the browser does not expose it)
+    NAVIGATION_STATUS_SCRIPT = """
+        var entry = performance.getEntriesByType('navigation')[0];
+        return entry && entry.responseStatus ? entry.responseStatus : null;
+    """
+
+    # Returns the hrefs matched by the first CSS selector that matches anything
+    CSS_LINKS_SCRIPT = """
+        var selectors = arguments[0];
+        for (var i = 0; i < selectors.length; i++) {
+            var elements = document.querySelectorAll(selectors[i]);
+            if (elements.length) {
+                var hrefs = [];
+                for (var j = 0; j < elements.length; j++) {
+                    hrefs.push(elements[j].href || elements[j].getAttribute('href'));
+                }
+                return {selector: selectors[i], hrefs: hrefs};
+            }
+        }
+        return {selector: null, hrefs: []};
+    """
+
+    # Returns the hrefs matched by each XPath expression
+    XPATH_LINKS_SCRIPT = """
+        return arguments[0].map(function (xpath) {
+            var result = document.evaluate(xpath, document, null,
+                XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var hrefs = [];
+            for (var i = 0; i < result.snapshotLength; i++) {
+                var element = result.snapshotItem(i);
+                hrefs.push(element.href || element.getAttribute('href'));
+            }
+            return hrefs;
+        });
+    """
+
+    def __init__(self, chromedriver_path=None, rate_limiter=None, network_policy=None, page_stats=None,
+                 metrics=None):
+        """
+        Initialize the scraper with a configured WebDriver.
+        
+        Args:
+            chromedriver_path: Path to the ChromeDriver executable
+            rate_limiter: AdaptiveRateLimiter shared by every session that
+                talks to the store; a new one is created if omitted
+            network_policy: NetworkPolicy for resource blocking and page load
+                strategy; defaults to NetworkPolicy()
+            page_stats: PageLoadStats shared by every session in this run
+            metrics: CrawlMetrics shared by every session in this run
+        """
+        self.chromedriver_path = chromedriver_path
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.network_policy = network_policy or NetworkPolicy()
+        self.page_stats = page_stats or PageLoadStats()
+        self.metrics = metrics or CrawlMetrics()
+        # Set when a page fails because the browser itself died
+        self.driver_crashed = False
+        with self.metrics.span("driver_startup"):
+            self.driver = self._setup_driver(chromedriver_path)
         
     def _setup_driver(self, chromedriver_path=None):
         """Set up and configure the Chrome WebDriver."""
@@ -67,13 +283,17 @@ class MetaStoreSeleniumScraper:
         chrome_options.add_argument(f"user-agent={random.choice(self.USER_AGENTS)}")
         chrome_options.add_argument("--window-size=1920,1080")
         
+        # Return from navigation early and rely on targeted element waits
+        chrome_options.page_load_strategy = self.network_policy.page_load_strategy
+        
         # Disable image loading to speed up scraping
-        chrome_prefs = {
-            "profile.default_content_setting_values": {
-                "images": 2  # 2 = block images
+        if "image" in self.network_policy.blocked_types:
+            chrome_prefs = {
+                "profile.default_content_setting_values": {
+                    "images": 2  # 2 = block images
+                }
             }
-        }
-        chrome_options.add_experimental_option("prefs", chrome_prefs)
+            chrome_options.add_experimental_option("prefs", chrome_prefs)
         
         # Set up the driver
         try:
@@ -105,65 +325,448 @@ class MetaStoreSeleniumScraper:
                 driver = webdriver.Chrome(options=chrome_options)
             
             driver.set_page_load_timeout(30)
+            
+            # Block fonts, media, trackers etc. for every request the page makes
+            patterns = self.network_policy.url_patterns()
+            if patterns:
+                try:
+                    driver.execute_cdp_cmd("Network.enable", {})
+                    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+                except WebDriverException as e:
+                    logger.warning(f"Could not apply network blocking rules: {e}")
             return driver
             
         except Exception as e:
             logger.error(f"Error setting up WebDriver: {e}")
             raise
 
-    def scrape_all_apps(self, max_apps=100):
+    def scrape_all_apps(self, max_apps=100, workers=1, recycle_after=50,
+                        http_first=False, http_workers=8, state=None, recheck_after=0,
+                        journal=None, sink=None, discovery_sources=None, use_listing=True,
+                        image_cache=None):
         """
         Scrape details for all apps in the Meta Store.
         
         Args:
             max_apps: Maximum number of apps to scrape
+            workers: Number of parallel WebDriver sessions for app pages
+            recycle_after: Restart a worker's browser after this many pages
+            http_first: Parse app pages from raw HTML first and only render
+                the ones missing required fields with Selenium
+            http_workers: Number of parallel HTTP fetches in http_first mode
+            state: Optional CrawlStateStore for incremental re-crawls
+            recheck_after: Seconds after which a stored app is visited again;
+                apps seen more recently are reused from the state store
+            journal: Optional CrawlJournal; completed apps are appended as they
+                finish and a journal loaded with resume=True skips them
+            sink: Optional output sink (e.g. SinkPipeline); every app is
+                written to it as soon as it is scraped or reused, with a flag
+                telling whether it is new or changed. Records are not kept in
+                memory, so the sink is where they end up
+            discovery_sources: Optional iterables of (url, lastmod), such as
+                SitemapSource or FeedSource, read before the listing page
+            use_listing: Scroll the store listing when the sources did not
+                yield max_apps apps
+            image_cache: Optional ImageCache; each app's image is cached
+                locally and the record rewritten to point at it before it is
+                stored or written to the sink
             
         Returns:
-            List of app details
+            Number of apps written to the sink
         """
-        app_links = self._extract_app_links(max_apps)
+        if journal is not None and journal.frontier:
+            app_links = journal.frontier
+            logger.info(f"Resuming crawl: {len(journal.completed)} of {len(app_links)} apps already done")
+        else:
+            with self.metrics.span("discover"):
+                app_links = self._discover_app_links(max_apps, state=state, sources=discovery_sources,
+                                                     use_listing=use_listing)
+            if journal is not None:
+                journal.write_frontier(app_links)
         
-        # Debug output to see what's being extracted
-        logger.info(f"Found {len(app_links)} app links")
-        for link in app_links[:5]:  # Show first 5 links for debugging
-            logger.info(f"Link found: {link}")
+        scraped = self.scrape_app_links(app_links, workers=workers, recycle_after=recycle_after,
+                                            http_first=http_first, http_workers=http_workers, state=state,
+                                            recheck_after=recheck_after, journal=journal, sink=sink,
+                                            image_cache=image_cache)
+        
+        stats = self.page_stats.summary()
+        if stats["pages"]:
+            logger.info(f"Browser pages: {stats['pages']}, "
+                        f"{stats['transfer_bytes'] / 1e6:.1f} MB transferred "
+                        f"({stats['avg_bytes_per_page'] / 1e3:.0f} KB/page), "
+                        f"time-to-extract avg {stats['avg_extract_seconds']:.2f}s, "
+                        f"p50 {stats['p50_extract_seconds']:.2f}s, max {stats['max_extract_seconds']:.2f}s")
+        
+        logger.info(f"Successfully scraped {len(scraped)} apps")
+        
+        # If we couldn't scrape any apps, provide mock data for testing
+        if not scraped:
+            logger.warning("No app details scraped. Providing mock data for testing.")
+            mock_apps = self._generate_mock_data()
+            if sink is not None:
+                # Mock apps go to the files only, never to the live catalog
+                for app_info in mock_apps:
+                    sink.write(app_info, changed=False)
+            return len(mock_apps)
             
-        if not app_links:
+        return len(scraped)
+
+    def scrape_app_links(self, app_links, workers=1, recycle_after=50, http_first=False, http_workers=8,
+                         state=None, recheck_after=0, journal=None, sink=None, image_cache=None,
+                         heartbeat=None):
+        """
+        Scrape details for a given list of app pages.
+        
+        Used by scrape_all_apps after discovery, and by queue workers for
+        each leased batch. Arguments are as for scrape_all_apps, plus:
+        
+        Args:
+            heartbeat: Optional LeaseHeartbeat of the lease holding app_links;
+                once the lease is lost, results are dropped instead of being
+                recorded or written, since another worker owns the links
+        
+        Returns:
+            Set of the links in app_links that produced a record; apps that
+            could not be scraped are left out
+        """
+        # Apps finished before a crash are already in the sink and the journal
+        resumed_links = set()
+        if journal is not None:
+            resumed_links = {link for link in app_links if link in journal.completed}
+            if state is not None:
+                state.changed_urls.update(url for url in journal.changed_urls if url in resumed_links)
+        
+        http_validators = {}
+        
+        def on_result(app_info):
+            # Runs as soon as each app is scraped, possibly from worker threads
+            if heartbeat is not None and heartbeat.lost:
+                return
+            if image_cache is not None:
+                image_cache.localize(app_info)
+            changed = True
+            if state is not None:
+                etag, last_modified = http_validators.get(app_info["source_url"], (None, None))
+                changed = state.record(app_info, etag=etag, last_modified=last_modified)
+            # The sink comes first: a crash in between repeats a record instead of losing it
+            if sink is not None:
+                with self.metrics.span("sink_write"):
+                    sink.write(app_info, changed=changed)
+            if journal is not None:
+                journal.record(app_info, changed=changed)
+        
+        # Reuse recently seen apps from the state store without visiting them
+        stored_links = set()
+        if state is not None:
+            for link in app_links:
+                if heartbeat is not None and heartbeat.lost:
+                    break
+                if link not in resumed_links and state.is_fresh(link, recheck_after):
+                    app_info = state.get(link)["record"]
+                    if image_cache is not None:
+                        # Reused records may predate the image cache; cached images cost no download
+                        image_cache.localize(app_info)
+                    if sink is not None:
+                        sink.write(app_info, changed=False)
+                    stored_links.add(link)
+            if stored_links:
+                logger.info(f"Skipping {len(stored_links)} apps seen within the last {recheck_after} seconds")
+        pending_links = [link for link in app_links if link not in stored_links and link not in resumed_links]
+        
+        # Try the cheap HTTP path first; anything incomplete goes to the browser
+        http_links = set()
+        if http_first and pending_links:
+            extractor = HttpAppExtractor(pool_size=http_workers, state=state,
+                                         rate_limiter=self.rate_limiter, metrics=self.metrics)
+            http_validators = extractor.validators
+            try:
+                with self.metrics.span("details_http"):
+                    http_links = extractor.extract_many(pending_links, workers=http_workers, on_result=on_result)
+            finally:
+                extractor.close()
+        
+        browser_links = [link for link in pending_links if link not in http_links]
+        if http_first and browser_links:
+            logger.info(f"Escalating {len(browser_links)} apps to Selenium")
+        
+        browser_scraped = set()
+        if browser_links:
+            with self.metrics.span("details_browser"):
+                if workers > 1:
+                    browser_scraped = self._scrape_details_pool(browser_links, workers, recycle_after,
+                                                                on_result=on_result)
+                else:
+                    browser_scraped = self._scrape_details_serial(browser_links, on_result=on_result)
+        
+        if state is not None:
+            logger.info(f"{len(state.changed_urls)} apps are new or changed since the last run")
+
+        return resumed_links | stored_links | http_links | browser_scraped
+
+    def coordinate(self, work_queue, max_apps=100, state=None, discovery_sources=None, use_listing=True,
+                   resume=False, poll_interval=10):
+        """
+        Discover app links into a shared work queue and wait for workers to drain it.
+
+        The coordinator does not scrape; workers on any number of hosts call
+        work_from_queue against the same queue. Expired leases of workers
+        that died are requeued while waiting.
+
+        Args:
+            work_queue: Queue from work_queue.open_work_queue
+            max_apps, state, discovery_sources, use_listing: As for scrape_all_apps
+            resume: Keep an unfinished crawl already in the queue instead of
+                discovering a new frontier
+            poll_interval: Seconds between progress checks
+
+        Returns:
+            Dict of link counts per status when the queue is finished
+        """
+        counts = work_queue.counts()
+        if resume and (counts["pending"] or counts["leased"]):
+            run_id = work_queue.run_id()
+            logger.info(f"Resuming queued crawl: {counts['done']} done, "
+                        f"{counts['pending'] + counts['leased']} remaining")
+        else:
+            # Unseal first so workers that are already polling wait for the new frontier
+            run_id = work_queue.reset()
+            with self.metrics.span("discover"):
+                app_links = self._discover_app_links(max_apps, state=state, sources=discovery_sources,
+                                                     use_listing=use_listing)
+            work_queue.enqueue(app_links)
+            logger.info(f"Queued {len(app_links)} apps for workers")
+        work_queue.seal()
+
+        with self.metrics.span("queue_wait"):
+            while not work_queue.is_finished(run_id):
+                time.sleep(poll_interval)
+                work_queue.requeue_expired()
+                counts = work_queue.counts()
+                logger.info(f"Queue: {counts['done']} done, {counts['leased']} leased, "
+                            f"{counts['pending']} pending, {counts['failed']} failed")
+
+        counts = work_queue.counts()
+        logger.info(f"Queued crawl finished: {counts['done']} done, {counts['failed']} failed")
+        return counts
+
+    def work_from_queue(self, work_queue, worker_id, lease_size=20, poll_interval=5, **scrape_options):
+        """
+        Scrape leased batches of app links until the coordinator's crawl is finished.
+
+        Each batch is held under a lease kept alive by a heartbeat while it is
+        scraped. Links that produced a record are acknowledged; the rest are
+        released for another attempt, on this worker or any other. If the
+        lease is lost, the rest of the batch is neither written nor acknowledged.
+
+        A worker stops when the crawl it joined is finished. A queue that is
+        already finished when the worker starts holds the previous crawl, so
+        the worker waits for the coordinator to reset it for a new run.
+
+        Args:
+            work_queue: Queue from work_queue.open_work_queue
+            worker_id: Name recorded on leased links, e.g. host and process id
+            lease_size: Number of links claimed per lease
+            poll_interval: Seconds to wait when no link is pending
+            **scrape_options: Passed to scrape_app_links (journal is not supported)
+
+        Returns:
+            Number of apps this worker wrote to the sink
+        """
+        scraped_count = 0
+        waiting = False
+        run_id = work_queue.run_id()
+        finished_run = run_id if work_queue.is_finished(run_id) else None
+        while True:
+            lease = work_queue.claim(worker_id, lease_size)
+            if lease is None:
+                run_id = work_queue.run_id()
+                if run_id != finished_run and work_queue.is_finished(run_id):
+                    break
+                if not waiting:
+                    logger.info("No pending apps in the queue; waiting for the coordinator")
+                    waiting = True
+                time.sleep(poll_interval)
+                continue
+            waiting = False
+
+            logger.info(f"Leased {len(lease.urls)} apps")
+            self.metrics.increment("queue_leases")
+            scraped = set()
+            with LeaseHeartbeat(work_queue, lease) as heartbeat:
+                try:
+                    scraped = self.scrape_app_links(lease.urls, heartbeat=heartbeat, **scrape_options)
+                except Exception as e:
+                    logger.error(f"Error scraping leased batch: {e}")
+
+            if heartbeat.lost:
+                # Another worker holds these links now; records written before the loss are harmless repeats
+                self.metrics.increment("queue_leases_lost")
+                continue
+            work_queue.ack(lease, [url for url in lease.urls if url in scraped])
+            unscraped = [url for url in lease.urls if url not in scraped]
+            if unscraped:
+                logger.warning(f"Releasing {len(unscraped)} apps that could not be scraped")
+                work_queue.release(lease, unscraped)
+            scraped_count += len(scraped)
+
+        logger.info(f"Queue finished; this worker scraped {scraped_count} apps")
+        return scraped_count
+
+    def _discover_app_links(self, max_apps=100, state=None, sources=None, use_listing=True):
+        """
+        Find app page links, falling back to alternative pages and known apps.
+        
+        Links from every source go into one LinkFrontier keyed by app_id, so
+        URL variants of an app are visited once. New apps are returned first,
+        then apps the sources report as updated, then the rest, least
+        recently seen first.
+        
+        Args:
+            max_apps: Maximum number of app links to return
+            state: Optional CrawlStateStore telling new apps from known ones
+            sources: Optional iterables of (url, lastmod) read before the listing page
+            use_listing: Scroll the store listing if the sources found fewer than max_apps apps
+            
+        Returns:
+            List of canonical app page URLs in visiting order
+        """
+        frontier = LinkFrontier(state.known_apps() if state is not None else None)
+        for source in sources or []:
+            added = 0
+            try:
+                for url, lastmod in source:
+                    added += frontier.add(url, lastmod)
+            except Exception as e:
+                logger.error(f"Error reading discovery source {source.location}: {e}")
+            logger.info(f"{source.location}: {added} new app links")
+        
+        if use_listing and len(frontier) < max_apps:
+            added = frontier.add_all(self._extract_app_links(max_apps))
+            logger.info(f"Store listing: {added} new app links")
+        
+        if not len(frontier):
             # If no links found, let's try a fallback approach
             logger.warning("No app links found with primary method. Using fallback method...")
-            app_links = self._extract_app_links_fallback(max_apps)
+            frontier.add_all(self._extract_app_links_fallback(max_apps))
             
-            if not app_links:
+            if not len(frontier):
                 logger.error("Both primary and fallback methods failed to find app links.")
                 # Manually add some known app links for testing
-                app_links = [
+                frontier.add_all([
                     "https://www.meta.com/experiences/ghostbusters-rise-of-the-ghost-lord/4746232908818706/",
                     "https://www.meta.com/experiences/among-us-vr/4948428055244413/",
                     "https://www.meta.com/experiences/assassins-creed-nexus-vr/5812519008825194/",
                     "https://www.meta.com/experiences/asgards-wrath-2/2603836099654226/"
-                ]
+                ])
+        
+        app_links = frontier.take(max_apps)
+        counts = frontier.counts()
+        logger.info(f"Found {len(frontier)} app links ({counts['new']} new, {counts['updated']} updated, "
+                    f"{counts['stale']} previously seen); visiting {len(app_links)}")
+        for link in app_links[:5]:  # Show first 5 links for debugging
+            logger.info(f"Link found: {link}")
         
-        app_details = []
-        for link in app_links[:max_apps]:
+        return app_links
+
+    def _scrape_details_serial(self, app_links, on_result=None):
+        """Scrape app pages one after another with this scraper's WebDriver; returns the scraped links."""
+        scraped = set()
+        for link in app_links:
             try:
+                if self.driver_crashed:
+                    logger.warning("Browser crashed; starting a new session")
+                    self.restart_driver()
                 logger.info(f"Scraping app details from {link}")
                 app_info = self._scrape_app_details(link)
                 if app_info:
-                    app_details.append(app_info)
-                
-                # Random delay to avoid detection
-                time.sleep(random.uniform(1, 3))
+                    scraped.add(link)
+                    if on_result:
+                        on_result(app_info)
             except Exception as e:
                 logger.error(f"Error scraping app details from {link}: {e}")
+        return scraped
+
+    def _scrape_details_pool(self, app_links, workers, recycle_after=50, on_result=None):
+        """
+        Scrape app pages with a pool of independent WebDriver sessions.
         
-        logger.info(f"Successfully scraped {len(app_details)} apps")
+        Each worker owns its own headless Chrome built by _setup_driver and
+        pulls links from a shared queue. A worker's browser is restarted
+        after recycle_after pages to keep Chrome memory bounded, and as soon
+        as it crashes.
         
-        # If we couldn't scrape any apps, provide mock data for testing
-        if not app_details:
-            logger.warning("No app details scraped. Providing mock data for testing.")
-            app_details = self._generate_mock_data()
+        Args:
+            app_links: List of app page URLs
+            workers: Number of parallel WebDriver sessions
+            recycle_after: Pages per browser session before it is restarted
+            on_result: Optional callback invoked with each scraped app
             
-        return app_details
+        Returns:
+            Set of the links that produced a record
+        """
+        link_queue = queue.Queue()
+        for link in app_links:
+            link_queue.put(link)
+        scraped = set()
+
+        def run_worker(worker_id):
+            scraper = None
+            pages = 0
+            try:
+                while True:
+                    try:
+                        link = link_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    
+                    # Start a browser on first use, replace it after a crash and recycle it periodically
+                    if (scraper is None or scraper.driver_crashed or
+                            (recycle_after and pages >= recycle_after)):
+                        try:
+                            if scraper is None:
+                                scraper = MetaStoreSeleniumScraper(chromedriver_path=self.chromedriver_path,
+                                                                   rate_limiter=self.rate_limiter,
+                                                                   network_policy=self.network_policy,
+                                                                   page_stats=self.page_stats,
+                                                                   metrics=self.metrics)
+                            elif scraper.driver_crashed:
+                                logger.warning(f"Worker {worker_id}: browser crashed; starting a new session")
+                                scraper.restart_driver()
+                            else:
+                                logger.info(f"Worker {worker_id}: recycling browser after {pages} pages")
+                                scraper.restart_driver()
+                            pages = 0
+                        except Exception as e:
+                            self.metrics.failure("driver_start")
+                            logger.error(f"Worker {worker_id}: could not start WebDriver: {e}")
+                            # Hand the link back so another worker can take it
+                            link_queue.put(link)
+                            return
+                    
+                    try:
+                        logger.info(f"Worker {worker_id}: scraping app details from {link}")
+                        app_info = scraper._scrape_app_details(link)
+                        pages += 1
+                        if app_info:
+                            scraped.add(link)
+                            if on_result:
+                                on_result(app_info)
+                    except Exception as e:
+                        logger.error(f"Worker {worker_id}: error scraping app details from {link}: {e}")
+            finally:
+                if scraper is not None:
+                    scraper.close()
+
+        workers = max(1, min(workers, len(app_links)))
+        logger.info(f"Scraping {len(app_links)} app pages with {workers} workers")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(run_worker, i) for i in range(workers)]:
+                future.result()
+        
+        if not link_queue.empty():
+            logger.error(f"{link_queue.qsize()} app links were left unscraped because no worker could start a browser")
+        
+        return scraped
 
     def _extract_app_links(self, max_apps=100):
         """
@@ -179,23 +782,23 @@ class MetaStoreSeleniumScraper:
         try:
             # Load the main page
             logger.info(f"Loading Meta Quest Store page: {self.BASE_URL}")
-            self.driver.get(self.BASE_URL)
+            with self.metrics.span("rate_limit_wait"):
+                self.rate_limiter.acquire()
             
             # Wait for the page to load (adjust selector based on the actual page structure)
             try:
-                WebDriverWait(self.driver, 20).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='/experiences/']"))
-                )
+                with self.metrics.span("listing_load"):
+                    previous_document = self.driver.find_elements(By.TAG_NAME, "html")
+                    self.driver.get(self.BASE_URL)
+                    self._wait_for_new_page(previous_document, (By.CSS_SELECTOR, "a[href*='/experiences/']"), 20)
                 
                 # Take a screenshot for debugging
                 self.driver.save_screenshot("meta_store_page.png")
                 logger.info("Saved screenshot to meta_store_page.png")
                 
-                # Scroll down to load more content
+                # Scroll down until no more app links load
                 logger.info("Scrolling down to load more content...")
-                for _ in range(5):  # Scroll 5 times
-                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(2)  # Wait for content to load
+                self._scroll_until_settled("a[href*='/experiences/']", max_apps)
                 
                 # Extract app links
                 # Try different selectors that might contain app links
@@ -206,31 +809,89 @@ class MetaStoreSeleniumScraper:
                     "div.app-listing a"  # Example class name
                 ]
                 
-                for selector in selectors:
-                    logger.info(f"Trying selector: {selector}")
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        break
+                # Collect every href in one round trip instead of one call per anchor
+                found = self.driver.execute_script(self.CSS_LINKS_SCRIPT, selectors)
+                logger.info(f"Selector {found['selector']} matched {len(found['hrefs'])} links")
                 
-                # Extract links
-                for element in elements:
-                    href = element.get_attribute("href")
-                    if href and "/experiences/" in href and href not in app_links:
-                        # Make sure the link is an absolute URL
-                        abs_url = urljoin(self.BASE_URL, href)
-                        app_links.append(abs_url)
-                        if len(app_links) >= max_apps:
-                            break
+                # Extract links, one per app_id however the href is spelled
+                seen = set()
+                for href in found["hrefs"]:
+                    canonical = canonical_app_url(href, self.BASE_URL)
+                    if canonical is None or canonical[0] in seen:
+                        continue
+                    seen.add(canonical[0])
+                    app_links.append(canonical[1])
+                    if len(app_links) >= max_apps:
+                        break
                 
             except TimeoutException:
+                self.metrics.failure("timeout")
                 logger.error("Timeout waiting for app listing page to load")
                 self.driver.save_screenshot("timeout_error.png")
                 
         except Exception as e:
+            self.metrics.failure(failure_kind(e))
             logger.error(f"Error extracting app links: {e}")
             
         return app_links
     
+    def _wait_for_new_page(self, previous_document, locator, timeout):
+        """
+        Wait until an element matching locator is present on a newly loaded page.
+        
+        With the "eager" and "none" page load strategies driver.get can return
+        while the previous page is still displayed, and its elements would
+        satisfy the wait. The previous document's root element (from
+        find_elements before navigating) must go stale first.
+        
+        Raises:
+            TimeoutException: If the new page does not show the element in time
+        """
+        present = EC.presence_of_element_located(locator)
+        
+        def loaded(driver):
+            if previous_document and not EC.staleness_of(previous_document[0])(driver):
+                return False
+            return present(driver)
+        
+        WebDriverWait(self.driver, timeout).until(loaded)
+    
+    def _scroll_until_settled(self, link_selector, max_apps, settle_timeout=3, max_scrolls=50):
+        """
+        Scroll to the bottom of the page until no new links load.
+        
+        Each scroll returns as soon as new links appear, and scrolling stops
+        once a scroll produces nothing new within settle_timeout seconds or
+        max_apps distinct links are on the page.
+        
+        Args:
+            link_selector: CSS selector for the links being loaded
+            max_apps: Stop once this many distinct links are present
+            settle_timeout: Seconds to wait for new links after each scroll
+            max_scrolls: Hard limit on the number of scrolls
+            
+        Returns:
+            Number of distinct links on the page
+        """
+        started = time.monotonic()
+        count = self.driver.execute_script(self.COUNT_LINKS_SCRIPT, link_selector)
+        scrolls = 0
+        while count < max_apps and scrolls < max_scrolls:
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            scrolls += 1
+            previous = count
+            try:
+                WebDriverWait(self.driver, settle_timeout, poll_frequency=0.2).until(
+                    lambda driver: driver.execute_script(self.COUNT_LINKS_SCRIPT, link_selector) > previous
+                )
+            except TimeoutException:
+                break
+            count = self.driver.execute_script(self.COUNT_LINKS_SCRIPT, link_selector)
+        
+        self.metrics.observe("scroll", time.monotonic() - started)
+        logger.info(f"Content settled after {scrolls} scrolls with {count} links")
+        return count
+
     def _extract_app_links_fallback(self, max_apps=100):
         """Fallback method to extract app links using alternative approaches."""
         app_links = []
@@ -238,15 +899,18 @@ class MetaStoreSeleniumScraper:
             # Try with a different base URL
             fallback_url = "https://www.meta.com/quest/store/"
             logger.info(f"Using fallback URL: {fallback_url}")
+            with self.metrics.span("rate_limit_wait"):
+                self.rate_limiter.acquire()
+            previous_document = self.driver.find_elements(By.TAG_NAME, "html")
             self.driver.get(fallback_url)
             
-            # Wait and scroll
-            time.sleep(5)
-            for _ in range(3):
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-                time.sleep(2)
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
+            # Wait for any links to render, then scroll until they stop growing
+            try:
+                self._wait_for_new_page(previous_document, (By.CSS_SELECTOR, "a[href]"), 10)
+            except TimeoutException:
+                self.metrics.failure("timeout")
+                logger.warning("Timeout waiting for fallback page links")
+            self._scroll_until_settled("a[href]", max_apps)
             
             # Save screenshot for debugging
             self.driver.save_screenshot("fallback_page.png")
@@ -259,14 +923,17 @@ class MetaStoreSeleniumScraper:
                 "//div[contains(@class, 'game') or contains(@class, 'app')]//a"
             ]
             
-            for xpath in xpath_expressions:
-                elements = self.driver.find_elements(By.XPATH, xpath)
-                if elements:
-                    logger.info(f"Found {len(elements)} elements with XPath: {xpath}")
-                    for element in elements:
-                        href = element.get_attribute("href")
-                        if href and href not in app_links:
-                            app_links.append(href)
+            # Resolve all XPath expressions in a single round trip
+            hrefs_per_xpath = self.driver.execute_script(self.XPATH_LINKS_SCRIPT, xpath_expressions)
+            seen = set()
+            for xpath, hrefs in zip(xpath_expressions, hrefs_per_xpath):
+                if hrefs:
+                    logger.info(f"Found {len(hrefs)} elements with XPath: {xpath}")
+                    for href in hrefs:
+                        canonical = canonical_app_url(href, fallback_url)
+                        if canonical and canonical[0] not in seen:
+                            seen.add(canonical[0])
+                            app_links.append(canonical[1])
                             if len(app_links) >= max_apps:
                                 return app_links
             
@@ -274,13 +941,15 @@ class MetaStoreSeleniumScraper:
             page_source = self.driver.page_source
             exp_links = re.findall(r'href="(/quest/experiences/[^"]+)"', page_source)
             for link in exp_links:
-                full_url = urljoin("https://www.meta.com", link)
-                if full_url not in app_links:
-                    app_links.append(full_url)
+                canonical = canonical_app_url(link, "https://www.meta.com")
+                if canonical and canonical[0] not in seen:
+                    seen.add(canonical[0])
+                    app_links.append(canonical[1])
                     if len(app_links) >= max_apps:
                         break
                         
         except Exception as e:
+            self.metrics.failure(failure_kind(e))
             logger.error(f"Error in fallback app link extraction: {e}")
             
         return app_links
@@ -296,14 +965,21 @@ class MetaStoreSeleniumScraper:
             Dictionary with app details
         """
         try:
-            self.driver.get(app_url)
+            with self.metrics.span("rate_limit_wait"):
+                self.rate_limiter.acquire()
+            started = time.monotonic()
+            previous_document = self.driver.find_elements(By.TAG_NAME, "html")
+            with self.metrics.span("detail_navigate"):
+                self.driver.get(app_url)
             
             # Wait for the page to load
             try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "h1"))
-                )
+                with self.metrics.span("detail_wait"):
+                    self._wait_for_new_page(previous_document, (By.TAG_NAME, "h1"), 15)
             except TimeoutException:
+                self.metrics.failure("timeout")
+                status = self.driver.execute_script(self.NAVIGATION_STATUS_SCRIPT)
+                self.rate_limiter.observe(time.monotonic() - started, status)
                 logger.warning(f"Timeout waiting for app page to load: {app_url}")
                 self.driver.save_screenshot(f"app_timeout_{app_url.split('/')[-2]}.png")
                 return None
@@ -311,77 +987,34 @@ class MetaStoreSeleniumScraper:
             # Extract app ID from URL
             app_id = app_url.rstrip("/").split("/")[-1]
             
-            # Extract app name
-            try:
-                app_name_element = self.driver.find_element(By.TAG_NAME, "h1")
-                app_name = app_name_element.text.strip()
-            except NoSuchElementException:
+            # Pull every field in a single script call instead of one
+            # WebDriver round trip per selector
+            with self.metrics.span("detail_extract"):
+                fields = self.driver.execute_script(self.APP_DETAILS_SCRIPT, {
+                    "image": self.APP_IMAGE_SELECTOR,
+                    "rating": self.RATING_XPATH,
+                    "description": self.DESCRIPTION_XPATH,
+                    "category": self.CATEGORY_XPATH,
+                }) or {}
+            self.metrics.increment("browser_pages")
+            elapsed = time.monotonic() - started
+            self.rate_limiter.observe(elapsed, fields.get("status"))
+            self.page_stats.record(fields.get("transfer_bytes"), elapsed)
+            
+            app_name = fields.get("app_name")
+            if not app_name:
                 logger.warning(f"Could not find app name on {app_url}")
                 app_name = app_id.replace("-", " ").title()
             
-            # Extract image URL
-            try:
-                img_element = self.driver.find_element(
-                    By.CSS_SELECTOR, 
-                    "img[alt*='banner'], img[alt*='cover'], img[alt*='logo'], img[src*='banner'], img[src*='cover']"
-                )
-                app_image_url = img_element.get_attribute("src")
-            except NoSuchElementException:
-                app_image_url = ""
+            app_image_url = fields.get("app_image_url") or ""
             
-            # Extract ratings
-            ratings = 0.0
-            num_reviews = 0
-            try:
-                rating_text = self.driver.find_element(
-                    By.XPATH, 
-                    "//*[contains(text(), 'star') or contains(text(), 'rating') or contains(@class, 'rating') or contains(@class, 'stars')]"
-                ).text
-                
-                # Try to extract rating value and count
-                rating_match = re.search(r'(\d+\.?\d*)\s*(?:star|/\s*5)', rating_text, re.IGNORECASE)
-                if rating_match:
-                    ratings = float(rating_match.group(1))
-                
-                review_match = re.search(r'(\d{1,3}(?:,\d{3})*)\s*(?:review|rating)', rating_text, re.IGNORECASE)
-                if review_match:
-                    num_reviews = int(review_match.group(1).replace(",", ""))
-            except:
-                pass
+            # Try to extract rating value and count
+            ratings, num_reviews = parse_rating_text(fields.get("rating_text") or "")
             
-            # Extract description
-            try:
-                description_element = self.driver.find_element(
-                    By.XPATH,
-                    "//div[contains(@class, 'description') or contains(@class, 'detail') or contains(@class, 'about')]//p"
-                )
-                description = description_element.text.strip()
-            except NoSuchElementException:
-                try:
-                    # Try a more generic approach
-                    paragraphs = self.driver.find_elements(By.TAG_NAME, "p")
-                    for p in paragraphs:
-                        if len(p.text) > 50:  # Assume longer paragraphs are part of the description
-                            description = p.text.strip()
-                            break
-                    else:
-                        description = "No description available."
-                except:
-                    description = "No description available."
-            
-            # Extract category
-            try:
-                category_element = self.driver.find_element(
-                    By.XPATH,
-                    "//div[contains(text(), 'Category') or contains(text(), 'Genre')]/following-sibling::div | //span[contains(text(), 'Category') or contains(text(), 'Genre')]/following-sibling::span"
-                )
-                category = category_element.text.strip()
-            except NoSuchElementException:
-                # Default to a generic category based on the URL or app name
-                if "game" in app_url.lower() or "game" in app_name.lower():
-                    category = "Game"
-                else:
-                    category = "App"
+            description = fields.get("description") or "No description available."
+            
+            # Default to a generic category based on the URL or app name
+            category = fields.get("category") or default_category(app_url, app_name)
             
             # Create app details dictionary
             app_details = {
@@ -398,6 +1031,10 @@ class MetaStoreSeleniumScraper:
             return app_details
             
         except Exception as e:
+            kind = failure_kind(e)
+            self.metrics.failure(kind)
+            if kind == "webdriver_crash":
+                self.driver_crashed = True
             logger.error(f"Error scraping app details from {app_url}: {e}")
             return None
     
@@ -431,20 +1068,392 @@ class MetaStoreSeleniumScraper:
         
         return mock_apps
     
+    def restart_driver(self):
+        """Quit the current browser and start a fresh WebDriver session."""
+        self.close()
+        with self.metrics.span("driver_startup"):
+            self.driver = self._setup_driver(self.chromedriver_path)
+        self.driver_crashed = False
+
     def close(self):
         """Close the WebDriver."""
-        if self.driver:
-            self.driver.quit()
+        if getattr(self, "driver", None):
+            try:
+                self.driver.quit()
+            except WebDriverException as e:
+                logger.warning(f"Error closing WebDriver: {e}")
+            self.driver = None
             
     def __del__(self):
         """Ensure the WebDriver is closed when the object is garbage collected."""
         self.close()
 
+class _HtmlNode:
+    """Minimal element node produced by _HtmlTreeBuilder."""
+    
+    __slots__ = ("tag", "attrs", "parent", "children")
+    
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []  # Mix of _HtmlNode and text strings
+    
+    def own_text(self):
+        """Text nodes directly under this element."""
+        return " ".join(child for child in self.children if isinstance(child, str))
+    
+    def text(self):
+        """Visible text of this element and its descendants, whitespace-normalized."""
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif node.tag not in _HtmlTreeBuilder.INVISIBLE_TAGS:
+                stack.extend(reversed(node.children))
+        return " ".join(" ".join(parts).split())
+    
+    def iter(self, tag=None):
+        """Yield descendant elements in document order."""
+        stack = list(reversed([c for c in self.children if isinstance(c, _HtmlNode)]))
+        while stack:
+            node = stack.pop()
+            if tag is None or node.tag == tag:
+                yield node
+            stack.extend(reversed([c for c in node.children if isinstance(c, _HtmlNode)]))
+    
+    def next_siblings(self, tag):
+        """Yield following sibling elements with the given tag."""
+        if self.parent is None:
+            return
+        seen = False
+        for child in self.parent.children:
+            if child is self:
+                seen = True
+            elif seen and isinstance(child, _HtmlNode) and child.tag == tag:
+                yield child
+
+
+class _HtmlTreeBuilder(HTMLParser):
+    """Build a lightweight element tree from raw HTML with the standard library parser."""
+    
+    VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+                 "link", "meta", "source", "track", "wbr"}
+    INVISIBLE_TAGS = {"script", "style", "noscript", "template"}
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _HtmlNode("#document", {})
+        self._stack = [self.root]
+    
+    def handle_starttag(self, tag, attrs):
+        node = _HtmlNode(tag, {k: v or "" for k, v in attrs}, self._stack[-1])
+        self._stack[-1].children.append(node)
+        if tag not in self.VOID_TAGS:
+            self._stack.append(node)
+    
+    def handle_startendtag(self, tag, attrs):
+        node = _HtmlNode(tag, {k: v or "" for k, v in attrs}, self._stack[-1])
+        self._stack[-1].children.append(node)
+    
+    def handle_endtag(self, tag):
+        # Close the nearest open element with this tag, tolerating sloppy markup
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                break
+    
+    def handle_data(self, data):
+        self._stack[-1].children.append(data)
+
+    @classmethod
+    def parse(cls, html):
+        builder = cls()
+        builder.feed(html)
+        builder.close()
+        return builder.root
+
+
+class HttpAppExtractor:
+    """
+    Lightweight app page extractor that works on server-rendered HTML.
+    Fetches pages through a pooled HTTP session and parses the same fields
+    as MetaStoreSeleniumScraper._scrape_app_details without starting a browser.
+    """
+    
+    # Pages missing any of these fields are handed to the Selenium path
+    REQUIRED_FIELDS = ("app_name", "description")
+    
+    def __init__(self, pool_size=8, timeout=15, required_fields=None, state=None, rate_limiter=None,
+                 metrics=None):
+        """
+        Initialize a pooled HTTP session.
+        
+        Args:
+            pool_size: Maximum number of pooled connections per host
+            timeout: Request timeout in seconds
+            required_fields: Fields that must be found to skip Selenium
+            state: Optional CrawlStateStore used for conditional requests
+            rate_limiter: AdaptiveRateLimiter pacing requests to the store
+            metrics: CrawlMetrics for fetch/parse spans and failure counters
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        self.timeout = timeout
+        self.required_fields = tuple(required_fields or self.REQUIRED_FIELDS)
+        self.state = state
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.metrics = metrics or CrawlMetrics()
+        # URL -> (ETag, Last-Modified) of pages fetched in this session
+        self.validators = {}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": random.choice(MetaStoreSeleniumScraper.USER_AGENTS),
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+    
+    def fetch(self, app_url, validators=None):
+        """
+        Fetch an app page.
+        
+        Args:
+            app_url: URL of the app page
+            validators: Optional (etag, last_modified) for a conditional request
+            
+        Returns:
+            The 200 or 304 response, or None on failure
+        """
+        headers = {}
+        if validators:
+            etag, last_modified = validators
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        try:
+            with self.metrics.span("rate_limit_wait"):
+                self.rate_limiter.acquire()
+            started = time.monotonic()
+            response = self.session.get(app_url, headers=headers, timeout=self.timeout)
+            elapsed = time.monotonic() - started
+            self.metrics.observe("http_fetch", elapsed)
+            self.rate_limiter.observe(elapsed, response.status_code,
+                                      parse_retry_after(response.headers.get("Retry-After")))
+            if response.status_code not in (200, 304):
+                self.metrics.failure(f"http_{response.status_code}")
+                logger.warning(f"HTTP {response.status_code} fetching {app_url}")
+                return None
+            self.metrics.increment("http_pages")
+            return response
+        except Exception as e:
+            self.metrics.failure("http_error")
+            logger.warning(f"Error fetching {app_url}: {e}")
+            return None
+    
+    def extract(self, app_url):
+        """
+        Fetch and parse a single app page.
+        
+        Args:
+            app_url: URL of the app page
+            
+        Returns:
+            Tuple of (app details or None, list of missing required fields)
+        """
+        stored = self.state.get(app_url) if self.state is not None else None
+        validators = None
+        if stored and stored["record"]:
+            validators = (stored["etag"], stored["last_modified"])
+        
+        response = self.fetch(app_url, validators)
+        if response is None:
+            return None, list(self.required_fields)
+        
+        if response.status_code == 304:
+            # Unchanged since the last run: reuse the stored record
+            return stored["record"], []
+        
+        self.validators[app_url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        with self.metrics.span("http_parse"):
+            return self.parse(response.text, app_url)
+    
+    def parse(self, html, app_url):
+        """
+        Parse app details from raw HTML.
+        
+        Embedded JSON-LD is preferred; the DOM selectors used by the Selenium
+        path fill in whatever it does not provide.
+        
+        Returns:
+            Tuple of (app details, list of missing required fields)
+        """
+        root = _HtmlTreeBuilder.parse(html)
+        fields = self._parse_json_ld(root, app_url)
+        for key, value in self._parse_dom(root, app_url).items():
+            if not fields.get(key):
+                fields[key] = value
+        
+        missing = [field for field in self.required_fields if not fields.get(field)]
+        
+        app_id = app_url.rstrip("/").split("/")[-1]
+        app_name = fields.get("app_name") or app_id.replace("-", " ").title()
+        app_details = {
+            "app_id": app_id,
+            "app_name": app_name,
+            "app_image_url": fields.get("app_image_url") or "",
+            "ratings": fields.get("ratings") or 0.0,
+            "num_reviews": fields.get("num_reviews") or 0,
+            "description": fields.get("description") or "No description available.",
+            "category": fields.get("category") or default_category(app_url, app_name),
+            "source_url": app_url
+        }
+        return app_details, missing
+    
+    def extract_many(self, app_links, workers=8, on_result=None):
+        """
+        Extract many app pages in parallel.
+        
+        Args:
+            app_links: List of app page URLs
+            workers: Number of concurrent HTTP requests
+            on_result: Optional callback invoked with each complete app
+            
+        Returns:
+            Set of the URLs whose pages had all required fields
+        """
+        complete = set()
+        if not app_links:
+            return complete
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for link, (app_info, missing) in zip(app_links, executor.map(self.extract, app_links)):
+                if app_info and not missing:
+                    complete.add(link)
+                    if on_result:
+                        on_result(app_info)
+                else:
+                    logger.info(f"HTTP extraction incomplete for {link} (missing: {', '.join(missing)})")
+        
+        logger.info(f"HTTP extraction completed {len(complete)} of {len(app_links)} apps")
+        return complete
+    
+    def close(self):
+        """Close the HTTP session."""
+        self.session.close()
+    
+    def _parse_json_ld(self, root, app_url):
+        """Pull app fields out of embedded JSON-LD blocks."""
+        fields = {}
+        for script in root.iter("script"):
+            if script.attrs.get("type", "").lower() != "application/ld+json":
+                continue
+            try:
+                data = json.loads(script.own_text())
+            except ValueError:
+                continue
+            
+            if isinstance(data, dict):
+                candidates = data.get("@graph", [data])
+            elif isinstance(data, list):
+                candidates = data
+            else:
+                continue
+            for item in candidates:
+                if not isinstance(item, dict) or not item.get("name"):
+                    continue
+                fields.setdefault("app_name", str(item["name"]).strip())
+                
+                image = item.get("image")
+                if isinstance(image, list):
+                    image = image[0] if image else None
+                if isinstance(image, dict):
+                    image = image.get("url")
+                if image:
+                    # Absolute like the browser's img.src, so both engines produce the same record
+                    fields.setdefault("app_image_url", urljoin(app_url, str(image)))
+                
+                if item.get("description"):
+                    fields.setdefault("description", str(item["description"]).strip())
+                
+                category = item.get("applicationCategory") or item.get("genre")
+                if isinstance(category, list):
+                    category = category[0] if category else None
+                if category:
+                    fields.setdefault("category", str(category).strip())
+                
+                rating = item.get("aggregateRating")
+                if isinstance(rating, dict):
+                    try:
+                        fields.setdefault("ratings", float(rating.get("ratingValue") or 0))
+                        count = rating.get("ratingCount") or rating.get("reviewCount") or 0
+                        fields.setdefault("num_reviews", int(str(count).replace(",", "")))
+                    except ValueError:
+                        pass
+                break
+        return fields
+    
+    def _parse_dom(self, root, app_url):
+        """Apply the Selenium path's selectors to the parsed HTML tree."""
+        fields = {}
+        
+        h1 = next(root.iter("h1"), None)
+        if h1 is not None and h1.text():
+            fields["app_name"] = h1.text()
+        
+        for img in root.iter("img"):
+            alt = img.attrs.get("alt", "")
+            src = img.attrs.get("src", "")
+            if any(word in alt for word in ("banner", "cover", "logo")) or \
+                    any(word in src for word in ("banner", "cover")):
+                fields["app_image_url"] = urljoin(app_url, src)
+                break
+        
+        for node in root.iter():
+            if node.tag in _HtmlTreeBuilder.INVISIBLE_TAGS:
+                continue
+            own_text = node.own_text()
+            css_class = node.attrs.get("class", "")
+            if "star" in own_text or "rating" in own_text or "rating" in css_class or "stars" in css_class:
+                fields["ratings"], fields["num_reviews"] = parse_rating_text(node.text())
+                break
+        
+        for div in root.iter("div"):
+            css_class = div.attrs.get("class", "")
+            if "description" in css_class or "detail" in css_class or "about" in css_class:
+                paragraph = next(div.iter("p"), None)
+                if paragraph is not None:
+                    fields["description"] = paragraph.text()
+                    break
+        if "description" not in fields:
+            for paragraph in root.iter("p"):
+                if len(paragraph.text()) > 50:  # Assume longer paragraphs are part of the description
+                    fields["description"] = paragraph.text()
+                    break
+        
+        for node in root.iter():
+            if node.tag in ("div", "span") and ("Category" in node.own_text() or "Genre" in node.own_text()):
+                sibling = next(node.next_siblings(node.tag), None)
+                if sibling is not None and sibling.text():
+                    fields["category"] = sibling.text()
+                    break
+        
+        return fields
+
 def save_to_json(data, filename="meta_quest_apps.json"):
-    """Save data to a JSON file."""
+    """Save apps to a JSON array file, writing them one at a time from any iterable."""
     try:
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("[")
+            for index, app in enumerate(data):
+                f.write(",\n  " if index else "\n  ")
+                f.write(json.dumps(app, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+            f.write("\n]\n")
         logger.info(f"Data saved to {filename}")
         return True
     except Exception as e:
@@ -452,15 +1461,21 @@ def save_to_json(data, filename="meta_quest_apps.json"):
         return False
 
 def import_to_api(data, api_url="http://localhost:5000/api/import", clear=True):
-    """Import data to API."""
+    """Import data to API, streamed as NDJSON so large catalogs are never serialized at once."""
     try:
         import requests
         url = f"{api_url}?clear={'true' if clear else 'false'}"
         logger.info(f"Sending data to API: {url}")
-        response = requests.post(url, json=data, timeout=30)
+        body = (json.dumps(app, ensure_ascii=False).encode("utf-8") + b"\n" for app in data)
+        response = requests.post(url, data=body, headers={"Content-Type": "application/x-ndjson"},
+                                 timeout=30)
         
         if response.status_code == 200:
-            logger.info(f"Data successfully imported to API. Response: {response.text}")
+            result = response.json()
+            logger.info(f"Data successfully imported to API: {result.get('message')}")
+            if result.get("failed"):
+                logger.warning(f"{result['failed']} apps were rejected by the API: "
+                               f"{result.get('rejected')} {[b['errors'] for b in result.get('batches', []) if b['errors']]}")
             return True
         else:
             logger.error(f"API import failed with status code {response.status_code}: {response.text}")
@@ -469,6 +1484,11 @@ def import_to_api(data, api_url="http://localhost:5000/api/import", clear=True):
         logger.error(f"Error importing data to API: {e}")
         return False
 
+def worker_path(path, worker_id):
+    """Insert a worker id before a file's extension, e.g. apps.json -> apps.host-42.json."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker_id}{ext}"
+
 def main():
     parser = argparse.ArgumentParser(description="Meta Quest Store Scraper")
     parser.add_argument("--max-apps", type=int, default=20, help="Maximum number of apps to scrape")
@@ -477,24 +1497,160 @@ def main():
     parser.add_argument("--api-url", type=str, default="http://localhost:5000/api/import", 
                        help="API URL for importing data")
     parser.add_argument("--skip-api", action="store_true", help="Skip API import and just save JSON")
+    parser.add_argument("--import-mode", choices=("stream", "final"), default="stream",
+                       help="Send records to the API in batches while crawling (stream), or in one import "
+                            "at the end that replaces the catalog on a full standalone crawl (final)")
+    parser.add_argument("--ndjson", type=str, default="meta_quest_apps.ndjson",
+                       help="NDJSON file that records are streamed to as they are scraped")
+    parser.add_argument("--stream-batch-size", type=int, default=100,
+                       help="Maximum number of records per streamed API import")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Number of parallel browser sessions for app pages")
+    parser.add_argument("--recycle-after", type=int, default=50,
+                       help="Restart each worker's browser after this many pages (0 = never)")
+    parser.add_argument("--http-first", action="store_true",
+                       help="Parse app pages from raw HTML and only use Selenium when fields are missing")
+    parser.add_argument("--http-workers", type=int, default=8,
+                       help="Number of parallel HTTP requests in --http-first mode")
+    parser.add_argument("--state-db", type=str,
+                       help="SQLite crawl state file; enables incremental re-crawls")
+    parser.add_argument("--recheck-after", type=float, default=0,
+                       help="Hours before an app in the state file is visited again")
+    parser.add_argument("--rate", type=float, default=1.0,
+                       help="Initial requests per second to the store (adapts to latency and 429s)")
+    parser.add_argument("--max-rate", type=float, default=4.0,
+                       help="Upper bound for the adaptive request rate")
+    parser.add_argument("--page-load-strategy", choices=NetworkPolicy.PAGE_LOAD_STRATEGIES, default="eager",
+                       help="When navigation returns: full load, DOMContentLoaded (eager) or immediately (none)")
+    parser.add_argument("--block", type=str, default=",".join(NetworkPolicy.DEFAULT_BLOCKED_TYPES),
+                       help="Comma-separated resource types to block: "
+                            + ", ".join(NetworkPolicy.RESOURCE_TYPE_PATTERNS) + " (empty to allow all)")
+    parser.add_argument("--block-pattern", action="append", default=[],
+                       help="Extra URL pattern to block, e.g. '*cdn.example.com/*' (repeatable)")
+    parser.add_argument("--report", type=str, default="run_report.json",
+                       help="Machine-readable JSON report of crawl timings and failures")
+    parser.add_argument("--prometheus-textfile", type=str,
+                       help="Also write the run report in Prometheus text format to this path")
+    parser.add_argument("--journal", type=str, default="crawl_journal.jsonl",
+                       help="Append-only crawl journal used for crash recovery")
+    parser.add_argument("--resume", action="store_true",
+                       help="Resume an interrupted crawl from the journal")
+    parser.add_argument("--sitemap", action="append", default=[],
+                       help="Sitemap or sitemap index (URL or file) to discover app links from (repeatable)")
+    parser.add_argument("--feed", action="append", default=[],
+                       help="Listing feed (URL or file of JSON, RSS or HTML) to discover app links from (repeatable)")
+    parser.add_argument("--skip-listing", action="store_true",
+                       help="Do not scroll the store listing page; discover apps from --sitemap/--feed only")
+    parser.add_argument("--image-cache", type=str,
+                       help="Directory to cache app images in; records then point at the backend's /api/images route")
+    parser.add_argument("--image-base-url", type=str, default="http://localhost:5000/api/images/",
+                       help="URL prefix for cached images in rewritten records")
+    parser.add_argument("--thumbnail-size", type=int, default=400,
+                       help="Maximum width and height of cached images in pixels")
+    parser.add_argument("--role", choices=("standalone", "coordinator", "worker"), default="standalone",
+                       help="Crawl alone, or split the crawl across workers through a shared queue: "
+                            "the coordinator fills the queue, workers scrape leased batches")
+    parser.add_argument("--queue", type=str, default="crawl_queue.db",
+                       help="Shared work queue: a SQLite file, or a mongodb:// URI for workers on several hosts")
+    parser.add_argument("--lease-size", type=int, default=20,
+                       help="Number of apps a worker claims per lease")
+    parser.add_argument("--visibility-timeout", type=float, default=600,
+                       help="Seconds a lease lasts without a heartbeat before its apps are requeued")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                       help="Times an app is leased before it is marked failed")
     
     args = parser.parse_args()
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    if args.role == "worker":
+        # Workers on one host must not share output files; explicit paths are used as given
+        for option in ("output", "ndjson", "report"):
+            if getattr(args, option) == parser.get_default(option):
+                setattr(args, option, worker_path(getattr(args, option), worker_id))
     
     logger.info("Starting Meta Quest Store scraper")
-    scraper = MetaStoreSeleniumScraper(chromedriver_path=args.chromedriver)
+    rate_limiter = AdaptiveRateLimiter(rate=args.rate, max_rate=max(args.rate, args.max_rate))
+    metrics = CrawlMetrics()
+    network_policy = NetworkPolicy(
+        blocked_types=[t.strip() for t in args.block.split(",") if t.strip()],
+        blocked_patterns=args.block_pattern,
+        page_load_strategy=args.page_load_strategy
+    )
+    scraper = MetaStoreSeleniumScraper(chromedriver_path=args.chromedriver, rate_limiter=rate_limiter,
+                                       network_policy=network_policy, metrics=metrics)
+    state = CrawlStateStore(args.state_db) if args.state_db else None
+    # Queued crawls recover from crashes through their leases instead of the journal
+    journal = CrawlJournal(args.journal, resume=args.resume) if args.role == "standalone" else None
+    work_queue = (open_work_queue(args.queue, visibility_timeout=args.visibility_timeout,
+                                  max_attempts=args.max_attempts)
+                  if args.role != "standalone" else None)
+    image_cache = (ImageCache(args.image_cache, base_url=args.image_base_url, thumbnail_size=args.thumbnail_size)
+                   if args.image_cache else None)
+    discovery_sources = ([SitemapSource(location, rate_limiter=rate_limiter) for location in args.sitemap] +
+                         [FeedSource(location, rate_limiter=rate_limiter) for location in args.feed])
     
+    # Records are streamed to every sink while the crawl runs
+    sinks = [JsonlSink(args.ndjson, append=args.role == "worker" or bool(journal and journal.frontier))]
+    if not args.skip_api and args.import_mode == "stream":
+        api_sink = ApiImportSink(args.api_url, batch_size=args.stream_batch_size)
+        sinks.append(api_sink)
+        if journal is not None and journal.frontier:
+            # The interrupted run may have died with these still buffered; upserting them again is harmless
+            for app_details, changed in journal.completed_records():
+                api_sink.write(app_details, changed=changed)
+    sink = SinkPipeline(sinks)
+    
+    apps_scraped = 0
+    apps_changed = 0
     try:
-        apps = scraper.scrape_all_apps(max_apps=args.max_apps)
+        if args.role == "coordinator":
+            # Workers write the records; the coordinator only fills and watches the queue
+            scraper.coordinate(work_queue, max_apps=args.max_apps, state=state,
+                               discovery_sources=discovery_sources,
+                               use_listing=not args.skip_listing,
+                               resume=args.resume)
+            return
+        if args.role == "worker":
+            apps_scraped = scraper.work_from_queue(work_queue, worker_id,
+                                                   lease_size=args.lease_size,
+                                                   workers=args.workers,
+                                                   recycle_after=args.recycle_after,
+                                                   http_first=args.http_first,
+                                                   http_workers=args.http_workers,
+                                                   state=state,
+                                                   recheck_after=args.recheck_after * 3600,
+                                                   sink=sink,
+                                                   image_cache=image_cache)
+        else:
+            apps_scraped = scraper.scrape_all_apps(max_apps=args.max_apps, workers=args.workers,
+                                                   recycle_after=args.recycle_after,
+                                                   http_first=args.http_first,
+                                                   http_workers=args.http_workers,
+                                                   state=state,
+                                                   recheck_after=args.recheck_after * 3600,
+                                                   journal=journal,
+                                                   sink=sink,
+                                                   discovery_sources=discovery_sources,
+                                                   use_listing=not args.skip_listing,
+                                                   image_cache=image_cache)
         
-        # Always save to JSON file
-        save_to_json(apps, filename=args.output)
+        # Every record is in the NDJSON file by now; the JSON array is written from it
+        with metrics.span("sink_close"):
+            sink.close()
+        save_to_json(read_jsonl(args.ndjson), filename=args.output)
+        if journal is not None:
+            journal.finish()
         
-
-        save_to_mongodb(apps)
-        # Try to import to API if not skipped
-        if not args.skip_api:
+        # In incremental mode only new or changed apps go downstream
+        apps_changed = apps_scraped if state is None else len(state.changed_urls)
+        changed_apps = (app for app in read_jsonl(args.ndjson)
+                        if state is None or app["source_url"] in state.changed_urls)
+        
+        # Streamed records are already in the API; otherwise import them all at once
+        if not args.skip_api and args.import_mode == "final" and apps_changed:
             try:
-                import_success = import_to_api(apps, api_url=args.api_url)
+                # A worker holds only its share of the crawl, so it must not clear the others' records
+                import_success = import_to_api(changed_apps, api_url=args.api_url,
+                                               clear=state is None and args.role == "standalone")
                 if not import_success:
                     logger.warning("API import failed. Data is still saved to JSON file.")
             except Exception as e:
@@ -505,6 +1661,30 @@ def main():
         logger.error(f"Error during scrape: {e}")
     finally:
         scraper.close()
+        # Already closed unless the crawl failed
+        sink.close()
+        if journal is not None:
+            journal.close()
+        if work_queue is not None:
+            work_queue.close()
+        if state is not None:
+            state.close()
+        if image_cache is not None:
+            image_cache.close()
+        
+        page_stats = scraper.page_stats.summary()
+        report_extra = {
+            "apps_scraped": apps_scraped,
+            "apps_changed": apps_changed,
+            "final_rate_per_second": round(rate_limiter.rate, 3),
+            "browser_transfer_bytes": page_stats["transfer_bytes"],
+        }
+        try:
+            metrics.write_json(args.report, page_stats=page_stats, **report_extra)
+            if args.prometheus_textfile:
+                metrics.write_prometheus(args.prometheus_textfile, **report_extra)
+        except Exception as e:
+            logger.error(f"Error writing run report: {e}")
         
     logger.info("Scraping process completed")
 
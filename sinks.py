@@ -0,0 +1,215 @@
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlSink:
+    """Append each scraped app to an NDJSON file as soon as it is scraped."""
+
+    def __init__(self, path="meta_quest_apps.ndjson", append=False):
+        """
+        Open the output file.
+
+        Args:
+            path: NDJSON file path
+            append: Keep existing lines (used when resuming a crawl)
+        """
+        self.path = path
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, app_details, changed=True):
+        # Unchanged apps are written too, so the file holds the whole crawl
+        line = json.dumps(app_details, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info(f"Streamed records saved to {self.path}")
+
+
+def read_jsonl(path):
+    """
+    Yield the records of an NDJSON file written by JsonlSink, one at a time.
+
+    An app written more than once (a resumed crawl appends to the file) is
+    yielded on its first occurrence only. Torn lines are skipped.
+    """
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                app_details = json.loads(line)
+            except ValueError:
+                logger.warning(f"Ignoring incomplete record in {path}")
+                continue
+            key = app_details.get("app_id") or app_details.get("source_url")
+            if key in seen:
+                continue
+            seen.add(key)
+            yield app_details
+
+
+class ApiImportSink:
+    """
+    Buffer scraped apps and send them to the backend's import endpoint in
+    NDJSON batches, so each record is stamped with a revision like any
+    other write. A batch is sent once it reaches batch_size records, and a
+    background timer sends a partial batch once its oldest record has
+    waited flush_interval seconds, so a slow crawl still shows up promptly.
+
+    Requests are made by a sender thread. Full batches are handed to it
+    through a queue of at most max_pending batches, so writers never wait
+    on the network unless the backend falls that far behind.
+    """
+
+    def __init__(self, api_url="http://localhost:5000/api/import", batch_size=100, flush_interval=5.0,
+                 timeout=30, max_pending=2):
+        """
+        Open an HTTP session for the import endpoint and start the flush timer.
+
+        Args:
+            api_url: URL of the backend's /api/import endpoint
+            batch_size: Maximum number of records per request
+            flush_interval: Maximum seconds a record waits in the buffer
+            timeout: Seconds to wait for each import request
+            max_pending: Batches that may wait for the sender before write() blocks
+        """
+        import requests
+        self.session = requests.Session()
+        # Streamed batches add to the catalog; only a full import may clear it
+        self.url = f"{api_url}?clear=false&batch_size={batch_size}"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.imported = 0
+        self.failed = 0
+        self._buffer = []
+        self._oldest = None
+        # Guards the buffer only; requests are sent without it
+        self._lock = threading.Lock()
+        self._batches = queue.Queue(maxsize=max(1, max_pending))
+        self._stop = threading.Event()
+        self._sender = threading.Thread(target=self._send_batches, name="api-sink-send", daemon=True)
+        self._sender.start()
+        self._timer = threading.Thread(target=self._flush_periodically, name="api-sink-flush", daemon=True)
+        self._timer.start()
+
+    def write(self, app_details, changed=True):
+        # The backend already has the apps that did not change
+        if not changed:
+            return
+        batch = None
+        with self._lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append(app_details)
+            if len(self._buffer) >= self.batch_size:
+                batch = self._take()
+        if batch:
+            self._batches.put(batch)
+
+    def flush(self):
+        """Send all buffered records in one import request and wait until every batch is sent."""
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._batches.put(batch)
+        self._batches.join()
+
+    def _take(self):
+        batch, self._buffer = self._buffer, []
+        return batch
+
+    def _flush_periodically(self):
+        timeout = self.flush_interval
+        while not self._stop.wait(timeout):
+            batch = None
+            with self._lock:
+                if self._buffer and time.monotonic() - self._oldest >= self.flush_interval:
+                    batch = self._take()
+                # Wake up again when the oldest buffered record is due
+                timeout = (self.flush_interval - (time.monotonic() - self._oldest)
+                           if self._buffer else self.flush_interval)
+            if batch:
+                self._batches.put(batch)
+
+    def _send_batches(self):
+        while True:
+            batch = self._batches.get()
+            try:
+                if batch is None:
+                    return
+                self._send(batch)
+            finally:
+                self._batches.task_done()
+
+    def _send(self, batch):
+        body = b"".join(json.dumps(app, ensure_ascii=False).encode("utf-8") + b"\n" for app in batch)
+        try:
+            response = self.session.post(self.url, data=body, headers={"Content-Type": "application/x-ndjson"},
+                                         timeout=self.timeout)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Error sending {len(batch)} apps to the API: {e}")
+            return
+        if response.status_code != 200:
+            self.failed += len(batch)
+            logger.error(f"API import of {len(batch)} apps failed with status code "
+                         f"{response.status_code}: {response.text}")
+            return
+        result = response.json()
+        self.imported += result.get("imported", 0)
+        self.failed += result.get("failed", 0)
+        logger.info(f"Sent {len(batch)} apps to the API ({result.get('imported', 0)} imported, "
+                    f"{result.get('failed', 0)} rejected)")
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._timer.join()
+        self.flush()
+        self._batches.put(None)
+        self._sender.join()
+        self.session.close()
+
+
+class SinkPipeline:
+    """
+    Fan each scraped app out to several sinks; safe to call from worker
+    threads, since every sink guards its own state.
+    """
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+
+    def write(self, app_details, changed=True):
+        """
+        Write one app to every sink.
+
+        Args:
+            app_details: Scraped app record
+            changed: False for an app that is the same as in the last crawl;
+                file sinks still write it, the API sink skips it
+        """
+        for sink in self.sinks:
+            try:
+                sink.write(app_details, changed=changed)
+            except Exception as e:
+                logger.error(f"Error writing {app_details.get('app_id')} to {type(sink).__name__}: {e}")
+
+    def close(self):
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.error(f"Error closing {type(sink).__name__}: {e}")
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The scraper modules live in the project root and the API modules in backend/, both imported flat
+for path in (ROOT, os.path.join(ROOT, "backend")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope="session")
+def fake_mongo():
+    """Replace pymongo.MongoClient with mongomock's in-process client for the whole session."""
+    mongomock = pytest.importorskip("mongomock")
+    import pymongo
+
+    sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+    from backend_bench import _patch_mongomock_bulk
+
+    pymongo.MongoClient = mongomock.MongoClient
+    _patch_mongomock_bulk()
+    return mongomock
+
+
+@pytest.fixture(scope="session")
+def backend_module(fake_mongo):
+    """backend/main.py imported against an in-process mongomock database."""
+    os.environ["STORAGE_BACKEND"] = "mongo"
+    os.environ["MONGO_DB_NAME"] = "meta_store_test"
+    # No background revision polling; the tests drive every write themselves
+    os.environ["CACHE_SYNC_INTERVAL"] = "0"
+    import main
+    return main
+
+
+@pytest.fixture
+def backend(backend_module):
+    """The backend with empty collections and caches."""
+    main = backend_module
+    for collection in (main.collection, main.stats_collection, main.counters_collection,
+                       main.tombstones_collection):
+        collection.drop()
+    main.search_index.rebuild([])
+    main.response_cache.invalidate()
+    return main
+
+
+@pytest.fixture
+def seed_catalog(backend):
+    """Insert apps directly and rebuild the search index and stats, as the backend does at startup."""
+    def seed(apps):
+        backend.collection.insert_many([dict(app) for app in apps])
+        backend.ensure_indexes()
+        backend.load_search_index()
+        backend.refresh_stats()
+        backend.response_cache.invalidate()
+    return seed
@@ -0,0 +1,84 @@
+import json
+import random
+
+import pytest
+
+CATEGORIES = ["Action", "Puzzle", "Brand New", None]
+
+
+def make_app(index, rng):
+    app = {"app_id": f"{5000 + index}", "app_name": f"App {index}",
+           "ratings": rng.choice([None, 0.0, 2.5, 3.3, 4.1, 4.9]),
+           "num_reviews": rng.choice([None, 0, rng.randint(1, 10 ** 6)]),
+           "category": rng.choice(CATEGORIES)}
+    for field in ("ratings", "num_reviews", "category"):
+        if rng.random() < 0.1:
+            del app[field]
+    return app
+
+
+def comparable(stats):
+    """Stats without the fields that are only refreshed by a full rebuild."""
+    stats = {key: value for key, value in stats.items() if key not in ("updated_at", "sums")}
+    stats["num_reviews"] = {key: value for key, value in stats["num_reviews"].items()
+                            if key not in ("p50", "p90", "p99")}
+    return stats
+
+
+def post_ndjson(client, path, apps):
+    body = "".join(json.dumps(app) + "\n" for app in apps)
+    response = client.post(path, data=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("seed", (1, 2, 3))
+def test_incremental_stats_match_a_full_rebuild(backend, seed_catalog, seed):
+    rng = random.Random(seed)
+    apps = [make_app(i, rng) for i in range(40)]
+    seed_catalog(apps)
+    client = backend.app.test_client()
+    live = [app["app_id"] for app in apps]
+
+    for step in range(150):
+        roll = rng.random()
+        if roll < 0.1:
+            # Partial imports: new apps, field updates and a repeated app_id within one request
+            batch = []
+            for _ in range(rng.randint(1, 5)):
+                if rng.random() < 0.5:
+                    app = make_app(1000 + step * 10 + len(batch), rng)
+                    live.append(app["app_id"])
+                    batch.append(app)
+                else:
+                    batch.append({"app_id": rng.choice(live), "ratings": rng.choice([None, 1.5, 4.4])})
+            batch.append(dict(batch[0], num_reviews=7))
+            post_ndjson(client, "/api/import?clear=false&batch_size=2", batch)
+        elif roll < 0.18 and len(live) > 5:
+            app_id = live.pop(rng.randrange(len(live)))
+            assert client.delete(f"/api/apps/{app_id}").status_code == 200
+        else:
+            update = rng.choice([{"ratings": rng.choice([None, round(rng.uniform(1, 5), 1)])},
+                                 {"num_reviews": rng.choice([None, rng.randint(0, 10 ** 5)])},
+                                 {"category": rng.choice(CATEGORIES)}])
+            assert client.put(f"/api/apps/{rng.choice(live)}", json=update).status_code == 200
+
+    stored = backend.stats_collection.find_one({"_id": "catalog"}, {"_id": 0})
+    assert comparable(stored) == comparable(backend.compute_stats())
+    assert stored["total_apps"] == len(live)
+
+
+def test_clear_import_recomputes_everything(backend, seed_catalog):
+    seed_catalog([{"app_id": "1", "ratings": 4.0, "num_reviews": 10, "category": "Action"}])
+    client = backend.app.test_client()
+    post_ndjson(client, "/api/import?clear=true", [
+        {"app_id": "2", "ratings": 3.0, "num_reviews": 100, "category": "Puzzle"},
+        {"app_id": "3", "ratings": None, "num_reviews": 300, "category": "Puzzle"},
+    ])
+
+    stored = backend.stats_collection.find_one({"_id": "catalog"}, {"_id": 0})
+    full = backend.compute_stats()
+    stored.pop("updated_at"), full.pop("updated_at")
+    assert stored == full
+    public = client.get("/api/stats").get_json()
+    assert public["total_apps"] == 2
+    assert "sums" not in public
@@ -0,0 +1,108 @@
+import os
+import re
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper import HttpAppExtractor, MetaStoreSeleniumScraper
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "app_page.html")
+APP_ID = "5512345678901234"
+# Keys of the record MetaStoreSeleniumScraper._scrape_app_details builds
+SELENIUM_FIELDS = {"app_id", "app_name", "app_image_url", "ratings", "num_reviews", "description",
+                   "category", "source_url"}
+
+
+def read_fixture():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def store_server():
+    """Serve the saved app page at /experiences/<id>/ on a local port."""
+    page = read_fixture().encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if not self.path.startswith("/experiences/"):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def expected_record(base_url):
+    return {
+        "app_id": APP_ID,
+        "app_name": "Beat Arena",
+        "app_image_url": f"{base_url}/img/3-cover.jpg",
+        "ratings": 4.6,
+        "num_reviews": 12874,
+        "description": "Slash through neon beats in a rhythm arena built for room-scale VR, with weekly "
+                       "community tracks and a fully customizable difficulty curve.",
+        "category": "Music & Rhythm",
+        "source_url": f"{base_url}/experiences/{APP_ID}/",
+    }
+
+
+def test_parse_saved_page_from_json_ld():
+    base_url = "https://www.meta.com"
+    extractor = HttpAppExtractor()
+    try:
+        record, missing = extractor.parse(read_fixture(), f"{base_url}/experiences/{APP_ID}/")
+    finally:
+        extractor.close()
+    assert missing == []
+    assert set(record) == SELENIUM_FIELDS
+    assert record == expected_record(base_url)
+
+
+def test_parse_saved_page_from_dom_only():
+    base_url = "https://www.meta.com"
+    html = re.sub(r'<script type="application/ld\+json">.*?</script>', "", read_fixture(), flags=re.S)
+    extractor = HttpAppExtractor()
+    try:
+        record, missing = extractor.parse(html, f"{base_url}/experiences/{APP_ID}/")
+    finally:
+        extractor.close()
+    assert missing == []
+    assert record == expected_record(base_url)
+
+
+def test_extract_from_local_store_server(store_server):
+    extractor = HttpAppExtractor()
+    try:
+        record, missing = extractor.extract(f"{store_server}/experiences/{APP_ID}/")
+    finally:
+        extractor.close()
+    assert missing == []
+    assert record == expected_record(store_server)
+
+
+@pytest.mark.skipif(shutil.which("chromedriver") is None, reason="needs Chrome and chromedriver")
+def test_http_and_selenium_records_match(store_server):
+    app_url = f"{store_server}/experiences/{APP_ID}/"
+    extractor = HttpAppExtractor()
+    scraper = MetaStoreSeleniumScraper()
+    try:
+        http_record, _ = extractor.extract(app_url)
+        selenium_record = scraper._scrape_app_details(app_url)
+    finally:
+        extractor.close()
+        scraper.close()
+    assert http_record == selenium_record
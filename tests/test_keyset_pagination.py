@@ -0,0 +1,81 @@
+import pytest
+
+SORT_FIELDS = ("app_name", "ratings", "num_reviews", "category", "app_id")
+
+
+def make_apps(count=40):
+    """Apps whose sort fields are often null or missing, with plenty of ties."""
+    apps = []
+    for i in range(count):
+        app = {
+            "app_id": f"{1000 + i}",
+            "app_name": f"App {i % 13}",
+            "ratings": [None, 3.5, 4.0, 4.5][i % 4],
+            "num_reviews": [None, 0, 10, 250, 10][i % 5],
+            "category": ["Action", "Puzzle", None][i % 3],
+            "description": "A virtual reality app.",
+        }
+        if i % 7 == 0:
+            del app["ratings"]
+        if i % 9 == 0:
+            del app["num_reviews"]
+        apps.append(app)
+    return apps
+
+
+def page_walk(client, params, per_page):
+    app_ids = []
+    page = 1
+    while True:
+        body = client.get("/api/apps", query_string={**params, "page": page, "per_page": per_page}).get_json()
+        app_ids += [app["app_id"] for app in body["data"]]
+        if page >= body["total_pages"]:
+            return app_ids
+        page += 1
+
+
+def cursor_walk(client, params, per_page):
+    body = client.get("/api/apps", query_string={**params, "per_page": per_page}).get_json()
+    app_ids = [app["app_id"] for app in body["data"]]
+    while body["next_cursor"]:
+        body = client.get("/api/apps", query_string={**params, "per_page": per_page,
+                                                     "cursor": body["next_cursor"]}).get_json()
+        app_ids += [app["app_id"] for app in body["data"]]
+    return app_ids
+
+
+@pytest.mark.parametrize("sort_by", SORT_FIELDS)
+@pytest.mark.parametrize("sort_order", (1, -1))
+@pytest.mark.parametrize("filters", ({}, {"category": "Action"}, {"min_rating": 4}))
+def test_cursor_walk_matches_page_walk(backend, seed_catalog, sort_by, sort_order, filters):
+    apps = make_apps()
+    seed_catalog(apps)
+    client = backend.app.test_client()
+    params = {"sort_by": sort_by, "sort_order": sort_order, **filters}
+
+    by_page = page_walk(client, params, per_page=6)
+    by_cursor = cursor_walk(client, params, per_page=6)
+
+    assert by_cursor == by_page
+    assert len(set(by_cursor)) == len(by_cursor)
+    if not filters:
+        assert len(by_cursor) == len(apps)
+
+
+def test_cursor_after_null_values(backend, seed_catalog):
+    seed_catalog([{"app_id": "1", "ratings": None}, {"app_id": "2"}, {"app_id": "3", "ratings": 4.0}])
+    client = backend.app.test_client()
+
+    ascending = client.get("/api/apps?sort_by=ratings&per_page=1").get_json()
+    body = client.get(f"/api/apps?per_page=5&cursor={ascending['next_cursor']}").get_json()
+    assert [app["app_id"] for app in body["data"]] == ["2", "3"]
+
+    descending = client.get("/api/apps?sort_by=ratings&sort_order=-1&per_page=2").get_json()
+    assert [app["app_id"] for app in descending["data"]] == ["3", "2"]
+    body = client.get(f"/api/apps?per_page=5&cursor={descending['next_cursor']}").get_json()
+    assert [app["app_id"] for app in body["data"]] == ["1"]
+
+
+def test_invalid_cursor_is_rejected(backend):
+    response = backend.app.test_client().get("/api/apps?cursor=not-a-cursor")
+    assert response.status_code == 400
@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+
+from revision_log import COUNTER_ID, RevisionLog, committed_revision
+
+mongomock = pytest.importorskip("mongomock")
+
+
+@pytest.fixture
+def counters():
+    return mongomock.MongoClient().db.counters
+
+
+def test_committed_mark_moves_when_the_lock_is_released(counters):
+    log = RevisionLog(counters)
+    with log.writer() as writer:
+        assert writer.allocate(3) == 1
+        assert log.committed() == 0
+    assert log.committed() == 3
+    with log.writer() as writer:
+        assert writer.allocate(2) == 4
+    assert log.committed() == 5
+
+
+def test_other_writers_wait_for_the_lock(counters):
+    log, other = RevisionLog(counters), RevisionLog(counters, wait_timeout=0.1)
+    with log.writer():
+        with pytest.raises(TimeoutError):
+            with other.writer():
+                pass
+    with other.writer() as writer:
+        assert writer.allocate(1) == 1
+
+
+def test_concurrent_writers_get_unique_revisions_in_order(counters):
+    logs = [RevisionLog(counters) for _ in range(2)]
+    allocated = []
+
+    def write(log):
+        for _ in range(25):
+            with log.writer() as writer:
+                revision = writer.allocate(1)
+                # Under the lock, the mark never passes a revision being written
+                assert log.committed() == revision - 1
+                allocated.append(revision)
+
+    threads = [threading.Thread(target=write, args=(log,)) for log in logs * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(allocated) == list(range(1, 101))
+    assert logs[0].committed() == 100
+
+
+def test_writer_with_an_expired_lock_cannot_allocate(counters):
+    stale, other = RevisionLog(counters, lock_timeout=0.05), RevisionLog(counters)
+    with pytest.raises(RuntimeError):
+        with stale.writer() as writer:
+            time.sleep(0.1)
+            with other.writer() as other_writer:
+                assert other_writer.allocate(1) == 1
+            writer.allocate(1)
+    assert other.committed() == 1
+
+
+def test_hold_keeps_the_mark_below_its_first_revision(counters):
+    log = RevisionLog(counters)
+    with log.writer() as writer:
+        first = writer.allocate(2)
+        assert writer.hold("import", first) is False
+    with log.writer() as writer:
+        writer.allocate(3)
+        # Refreshing keeps the lowest revision seen
+        assert writer.hold("import", 4) is True
+        assert writer.active_holds() == ["import"]
+    assert log.committed() == first - 1
+
+    with log.writer() as writer:
+        assert writer.release_hold("import") is True
+    assert log.committed() == 5
+
+
+def test_oldest_hold_wins(counters):
+    log = RevisionLog(counters)
+    with log.writer() as writer:
+        writer.hold("a", writer.allocate(1))
+        writer.hold("b", writer.allocate(1))
+        writer.allocate(1)
+    assert log.committed() == 0
+    with log.writer() as writer:
+        writer.release_hold("a")
+    assert log.committed() == 1
+    with log.writer() as writer:
+        writer.release_hold("b")
+    assert log.committed() == 3
+
+
+def test_expired_holds_are_dropped(counters):
+    log = RevisionLog(counters, hold_timeout=0.05)
+    with log.writer() as writer:
+        writer.hold("crashed", writer.allocate(2))
+    assert log.committed() == 0
+    time.sleep(0.1)
+    with log.writer() as writer:
+        assert writer.active_holds() == []
+    assert log.committed() == 2
+    assert "crashed" not in counters.find_one({"_id": COUNTER_ID}).get("holds", {})
+    with log.writer() as writer:
+        # The writer can tell that its hold lapsed
+        assert writer.release_hold("crashed") is False
+
+
+def test_counter_without_a_mark_is_pinned_before_allocating(counters):
+    counters.insert_one({"_id": COUNTER_ID, "value": 7})
+    log = RevisionLog(counters)
+    with log.writer() as writer:
+        writer.allocate(1)
+        assert log.committed() == 7
+    assert log.committed() == 8
+    assert committed_revision(None) == 0
+
+
+def test_change_feed_lists_writes_up_to_the_committed_mark(backend):
+    client = backend.app.test_client()
+    client.post("/api/import?clear=false", json=[{"app_id": "1", "app_name": "One"},
+                                                 {"app_id": "2", "app_name": "Two"}])
+    client.put("/api/apps/1", json={"ratings": 4.5})
+    client.delete("/api/apps/2")
+
+    body = client.get("/api/apps/changes?since=0").get_json()
+    ops = [(change["op"], change.get("app_id") or change["app"]["app_id"]) for change in body["changes"]]
+    assert ops == [("upsert", "1"), ("delete", "2")]
+    assert body["latest_revision"] == backend.revision_log.committed() == body["next_since"]
+
+    # Revisions that are still held do not show up yet
+    with backend.revision_log.writer() as writer:
+        writer.hold("pending", writer.allocate(1))
+    client.put("/api/apps/1", json={"ratings": 5.0})
+    body = client.get(f"/api/apps/changes?since={body['next_since']}").get_json()
+    assert body["changes"] == []
+    with backend.revision_log.writer() as writer:
+        writer.release_hold("pending")
+    body = client.get(f"/api/apps/changes?since={body['next_since']}").get_json()
+    assert [change["app"]["ratings"] for change in body["changes"]] == [5.0]
@@ -0,0 +1,90 @@
+from search_index import SearchIndex, tokenize
+
+
+def app(app_id, name, description="", category="Action", ratings=4.0):
+    return {"app_id": app_id, "app_name": name, "description": description, "category": category,
+            "ratings": ratings}
+
+
+def ranked_ids(index, query, **filters):
+    return [app_id for app_id, _ in index.search(query, **filters)]
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize("Beat Saber: VR-Rhythm!") == ["beat", "saber", "vr", "rhythm"]
+    assert tokenize(None) == []
+
+
+def test_every_query_token_must_match():
+    index = SearchIndex()
+    index.rebuild([app("1", "Beat Saber", "rhythm game"), app("2", "Beat Box", "music maker")])
+
+    assert ranked_ids(index, "beat rhythm") == ["1"]
+    assert ranked_ids(index, "beat puzzle") == []
+
+
+def test_name_matches_outrank_description_matches():
+    index = SearchIndex()
+    index.rebuild([app("1", "Space Pirates", "sail the stars"),
+                   app("2", "Ocean Trainer", "learn to fight space pirates")])
+
+    assert ranked_ids(index, "pirates") == ["1", "2"]
+
+
+def test_bm25_prefers_rarer_terms_and_shorter_documents():
+    index = SearchIndex()
+    index.rebuild([app("1", "Zombie Arena", "zombie zombie shooter"),
+                   app("2", "Zombie Arena Deluxe Edition", "a zombie shooter with many extra modes and maps"),
+                   app("3", "Farm Life", "grow crops")])
+
+    results = index.search("zombie")
+    assert [app_id for app_id, _ in results] == ["1", "2"]
+    assert results[0][1] > results[1][1] > 0
+    # A term found in fewer apps carries more weight
+    assert index.search("farm")[0][1] > results[0][1]
+
+
+def test_prefix_matches_score_below_exact_matches():
+    index = SearchIndex()
+    index.rebuild([app("1", "Beatsaber Tournament"), app("2", "Beat Tournament")])
+
+    assert ranked_ids(index, "beat") == ["2", "1"]
+    scores = dict(index.search("beat"))
+    assert scores["1"] < scores["2"]
+
+
+def test_prefix_expansion_keeps_the_most_frequent_terms():
+    index = SearchIndex()
+    index.MAX_EXPANSIONS = 2
+    apps = [app(str(i), f"rare{i}") for i in range(5)]
+    apps += [app(f"c{i}", "racing common") for i in range(3)]
+    apps += [app(f"p{i}", "rally popular") for i in range(2)]
+    index.rebuild(apps)
+
+    matched = set(ranked_ids(index, "ra"))
+    assert matched == {"c0", "c1", "c2", "p0", "p1"}
+
+
+def test_removed_terms_are_pruned_from_prefix_lookups():
+    index = SearchIndex()
+    index.MAX_EXPANSIONS = 1
+    index.rebuild([app("1", "Gorilla Tag"), app("2", "Golf Plus")])
+    index.add(app("2", "Walkabout"))
+
+    assert "golf" not in index._terms
+    assert ranked_ids(index, "go") == ["1"]
+    index.remove("1")
+    assert ranked_ids(index, "go") == []
+    assert len(index) == 1
+
+
+def test_filters_by_category_and_rating():
+    index = SearchIndex()
+    index.rebuild([app("1", "Puzzle Cube", category="Puzzle", ratings=4.5),
+                   app("2", "Puzzle Room", category="Puzzle", ratings=None),
+                   app("3", "Puzzle Shooter", category="Action", ratings=4.8)])
+
+    # Equal scores are ordered by app_id
+    assert ranked_ids(index, "puzzle", category="Puzzle") == ["1", "2"]
+    assert ranked_ids(index, "puzzle", min_rating=4.6) == ["3"]
+    assert ranked_ids(index, "puzzle", category="Puzzle", min_rating=4) == ["1"]
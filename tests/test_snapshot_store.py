@@ -0,0 +1,113 @@
+import json
+import os
+
+import pytest
+
+from snapshot_store import SnapshotStore, sort_key
+
+SORT_FIELDS = ("app_name", "ratings", "num_reviews", "category", "app_id")
+
+
+def make_apps(count=45):
+    apps = []
+    for i in range(count):
+        app = {"app_id": f"{2000 + i}", "app_name": f"App {i % 11}",
+               "ratings": [None, 3.5, 4.0, 4.5, 5][i % 5], "num_reviews": [0, 12, None, 12][i % 4],
+               "category": ["Action", "Puzzle", None, "Brand New"][i % 4]}
+        if i % 6 == 0:
+            del app["ratings"]
+        if i % 10 == 0:
+            del app["category"]
+        apps.append(app)
+    return apps
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "apps.json"
+    path.write_text(json.dumps(make_apps()), encoding="utf-8")
+    return SnapshotStore(str(path), SORT_FIELDS, reload_interval=0)
+
+
+def query_for(filters):
+    query = {}
+    if "category" in filters:
+        query["category"] = filters["category"]
+    if "min_rating" in filters:
+        query["ratings"] = {"$gte": filters["min_rating"]}
+    return query
+
+
+def expected_ids(apps, sort, filters):
+    """The listing as MongoDB would sort it: null and missing first, then numbers, then strings."""
+    matching = [app for app in apps
+                if ("category" not in filters or app.get("category") == filters["category"])
+                and ("min_rating" not in filters or (isinstance(app.get("ratings"), (int, float))
+                                                     and app["ratings"] >= filters["min_rating"]))]
+    (field, direction), _ = sort
+    matching.sort(key=lambda app: (sort_key(app.get(field)), sort_key(app["app_id"])), reverse=direction == -1)
+    return [app["app_id"] for app in matching]
+
+
+@pytest.mark.parametrize("sort_by", SORT_FIELDS[:-1])
+@pytest.mark.parametrize("direction", (1, -1))
+@pytest.mark.parametrize("filters", ({}, {"category": "Puzzle"}, {"min_rating": 4.0}))
+def test_cursor_walk_matches_page_walk(store, sort_by, direction, filters):
+    sort = [(sort_by, direction), ("app_id", direction)]
+    query = query_for(filters)
+    per_page = 4
+
+    by_page, page = [], 1
+    while True:
+        apps, total = store.find_page(query, sort, page, per_page)
+        by_page += [app["app_id"] for app in apps]
+        if page * per_page >= total:
+            break
+        page += 1
+
+    apps, _ = store.find_page(query, sort, 1, per_page)
+    by_cursor = [app["app_id"] for app in apps]
+    while len(apps) == per_page:
+        apps = store.find_after(query, sort, [apps[-1].get(field) for field, _ in sort], per_page)
+        by_cursor += [app["app_id"] for app in apps]
+
+    assert by_cursor == by_page == expected_ids(make_apps(), sort, filters)
+    assert total == len(by_page)
+
+
+def test_unknown_category_is_empty(store):
+    sort = [("app_name", 1), ("app_id", 1)]
+    assert store.find_page({"category": "Nope"}, sort, 1, 10) == ([], 0)
+    assert store.find_after({"category": "Nope"}, sort, ["App 1", "2001"], 10) == []
+
+
+def test_missing_fields_stay_missing(store):
+    assert "ratings" not in store.get("2000")
+    assert store.get("2001")["ratings"] == 3.5
+    assert store.get("missing") is None
+    assert set(store.get_many(["2000", "2001", "missing"])) == {"2000", "2001"}
+
+
+def test_iter_apps_projects_fields_in_app_id_order(store):
+    apps = list(store.iter_apps({"category": "Action"}, {"_id": 0, "app_id": 1, "ratings": 1}))
+    assert [app["app_id"] for app in apps] == sorted(app["app_id"] for app in apps)
+    assert all(set(app) <= {"app_id", "ratings"} for app in apps)
+
+
+def test_reload_swaps_in_a_changed_file_and_keeps_the_old_one_on_errors(tmp_path):
+    path = tmp_path / "apps.ndjson"
+    path.write_text('{"app_id": "1", "app_name": "Old"}\n{"app_id": "1", "app_name": "New"}\n',
+                    encoding="utf-8")
+    store = SnapshotStore(str(path), SORT_FIELDS, reload_interval=0)
+    # Later duplicates win, like repeated upserts
+    assert store.get("1")["app_name"] == "New"
+
+    path.write_text('{"app_id": "1", "app_name": "New"}\n{"app_id": "2", "app_name": "Two"}\n',
+                    encoding="utf-8")
+    os.utime(path, ns=(0, 10 ** 18))
+    assert store.reload_if_changed() is True
+    assert store.snapshot.size == 2
+
+    path.write_text('{"app_id": "3", "app_na', encoding="utf-8")
+    assert store.reload_if_changed() is False
+    assert store.snapshot.size == 2
@@ -0,0 +1,187 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from crawl_metrics import CrawlMetrics
+from scraper import MetaStoreSeleniumScraper
+from work_queue import LeaseHeartbeat, MongoWorkQueue, SqliteWorkQueue
+
+URLS = [f"https://www.meta.com/experiences/{i}/" for i in range(5)]
+
+
+@pytest.fixture(params=("sqlite", "mongo"))
+def make_queue(request, tmp_path, monkeypatch):
+    """Factory for queues that share one store, like a coordinator and its workers."""
+    opened = []
+    name = uuid.uuid4().hex
+    if request.param == "mongo":
+        import pymongo
+
+        # Separate mongomock clients do not share data; every queue gets the same one
+        client = request.getfixturevalue("fake_mongo").MongoClient()
+        monkeypatch.setattr(pymongo, "MongoClient", lambda *args, **kwargs: client)
+
+    def make(visibility_timeout=600, max_attempts=3):
+        if request.param == "sqlite":
+            work_queue = SqliteWorkQueue(str(tmp_path / "queue.db"), visibility_timeout=visibility_timeout,
+                                         max_attempts=max_attempts)
+        else:
+            work_queue = MongoWorkQueue(collection_name=name, visibility_timeout=visibility_timeout,
+                                        max_attempts=max_attempts)
+        opened.append(work_queue)
+        return work_queue
+
+    yield make
+    for work_queue in opened:
+        work_queue.close()
+
+
+def start_run(work_queue, urls=URLS):
+    run_id = work_queue.reset()
+    work_queue.enqueue(urls)
+    work_queue.seal()
+    return run_id
+
+
+def test_claims_follow_frontier_order_without_overlap(make_queue):
+    work_queue = make_queue()
+    start_run(work_queue)
+
+    first = work_queue.claim("a", 2)
+    second = work_queue.claim("b", 2)
+    assert first.urls == URLS[:2]
+    assert second.urls == URLS[2:4]
+    assert work_queue.counts() == {"pending": 1, "leased": 4, "done": 0, "failed": 0}
+    assert work_queue.enqueue(URLS) == 0
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(make_queue):
+    work_queue = make_queue(visibility_timeout=0.05)
+    start_run(work_queue, URLS[:2])
+
+    dead = work_queue.claim("dead", 2)
+    assert work_queue.claim("b", 2) is None
+    time.sleep(0.1)
+    reclaimed = work_queue.claim("b", 2)
+    assert reclaimed.urls == dead.urls
+
+    # The dead worker's lease no longer holds the links
+    assert work_queue.heartbeat(dead) == 0
+    work_queue.ack(dead, dead.urls)
+    assert work_queue.counts()["leased"] == 2
+    work_queue.ack(reclaimed, reclaimed.urls)
+    assert work_queue.counts()["done"] == 2
+
+
+def test_heartbeat_keeps_a_lease_alive(make_queue):
+    work_queue = make_queue(visibility_timeout=0.2)
+    start_run(work_queue, URLS[:1])
+
+    lease = work_queue.claim("a", 1)
+    for _ in range(3):
+        time.sleep(0.1)
+        assert work_queue.heartbeat(lease) == 1
+    assert work_queue.requeue_expired() == 0
+    assert work_queue.claim("b", 1) is None
+
+
+def test_links_fail_after_max_attempts(make_queue):
+    work_queue = make_queue(visibility_timeout=0.05, max_attempts=2)
+    start_run(work_queue, URLS[:2])
+
+    lease = work_queue.claim("a", 2)
+    work_queue.release(lease, lease.urls[:1])
+    time.sleep(0.1)
+    # Second attempt for both: one was released, the other's lease expired
+    lease = work_queue.claim("b", 2)
+    assert sorted(lease.urls) == sorted(URLS[:2])
+    work_queue.release(lease, lease.urls)
+    assert work_queue.counts() == {"pending": 0, "leased": 0, "done": 0, "failed": 2}
+    assert work_queue.is_finished()
+
+
+def test_is_finished_is_gated_on_seal_and_run_id(make_queue):
+    coordinator, worker = make_queue(), make_queue()
+    run_id = coordinator.reset()
+    coordinator.enqueue(URLS[:1])
+    assert worker.run_id() == run_id
+    assert not worker.is_finished(run_id)
+
+    coordinator.seal()
+    lease = worker.claim("a", 1)
+    assert not worker.is_finished(run_id)
+    worker.ack(lease, lease.urls)
+    assert worker.is_finished(run_id)
+    assert not worker.is_finished("another-run")
+
+    next_run = coordinator.reset()
+    assert next_run != run_id
+    assert not worker.is_finished(run_id)
+    assert not worker.is_finished(next_run)
+
+
+def test_lease_heartbeat_reports_a_lost_lease(make_queue):
+    work_queue = make_queue(visibility_timeout=0.3)
+    start_run(work_queue, URLS[:1])
+
+    lease = work_queue.claim("a", 1)
+    with LeaseHeartbeat(work_queue, lease, interval=0.05) as heartbeat:
+        time.sleep(0.1)
+        assert not heartbeat.lost
+        # Another worker takes the links over after the lease lapsed
+        work_queue.ack(lease, [])
+        lease.lease_id = "stolen"
+        time.sleep(0.15)
+    assert heartbeat.lost
+
+
+def queue_worker(scrape):
+    """A scraper without a browser whose batches are scraped by `scrape(urls, heartbeat)`."""
+    worker = MetaStoreSeleniumScraper.__new__(MetaStoreSeleniumScraper)
+    worker.metrics = CrawlMetrics()
+    worker.scrape_app_links = lambda urls, heartbeat=None, **options: scrape(urls, heartbeat)
+    return worker
+
+
+def test_worker_waits_for_the_next_run_instead_of_exiting(make_queue):
+    coordinator, worker_queue = make_queue(), make_queue()
+    start_run(coordinator, URLS[:1])
+    lease = coordinator.claim("old", 1)
+    coordinator.ack(lease, lease.urls)
+
+    scraped = []
+    worker = queue_worker(lambda urls, heartbeat: scraped.extend(urls) or set(urls))
+    result = []
+    thread = threading.Thread(target=lambda: result.append(
+        worker.work_from_queue(worker_queue, "w", lease_size=2, poll_interval=0.02)), daemon=True)
+    thread.start()
+    time.sleep(0.1)
+    assert thread.is_alive()
+
+    start_run(coordinator, URLS[1:4])
+    thread.join(5)
+    assert not thread.is_alive()
+    assert result == [3]
+    assert scraped == URLS[1:4]
+    assert coordinator.counts()["done"] == 3
+
+
+def test_worker_does_not_ack_a_lost_lease(make_queue):
+    work_queue = make_queue(visibility_timeout=0.1)
+    start_run(work_queue, URLS[:2])
+    attempts = []
+
+    def scrape(urls, heartbeat):
+        attempts.append(list(urls))
+        if len(attempts) == 1:
+            heartbeat.lost = True
+        return set(urls)
+
+    worker = queue_worker(scrape)
+    assert worker.work_from_queue(work_queue, "w", lease_size=2, poll_interval=0.02) == 2
+    # The lost batch was left to expire and scraped again under a new lease
+    assert attempts == [URLS[:2], URLS[:2]]
+    assert worker.metrics.counters["queue_leases_lost"] == 1
+    assert work_queue.counts()["done"] == 2
@@ -0,0 +1,417 @@
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("pending", "leased", "done", "failed")
+
+
+class Lease:
+    """A batch of app links claimed by one worker until lease_expires."""
+
+    def __init__(self, lease_id, urls, lease_expires):
+        self.lease_id = lease_id
+        self.urls = urls
+        self.lease_expires = lease_expires
+
+
+class SqliteWorkQueue:
+    """
+    Lease-based crawl work queue stored in a SQLite file.
+
+    A coordinator resets the queue, which starts a new run id, enqueues the
+    link frontier and seals it. Workers claim batches of links under a lease that expires after
+    visibility_timeout seconds unless it is extended with heartbeat().
+    Acknowledged links are done; released links and links whose lease
+    expired (a dead worker) go back to pending until they have been tried
+    max_attempts times, after which they are marked failed.
+
+    Every queue backend has the same methods: reset, run_id, enqueue, seal,
+    claim, heartbeat, ack, release, requeue_expired, counts, is_finished and
+    close.
+    SQLite suits workers on one host or a shared local disk; see
+    MongoWorkQueue for workers on several hosts.
+    """
+
+    def __init__(self, path="crawl_queue.db", visibility_timeout=600, max_attempts=3):
+        """
+        Open (or create) the queue database.
+
+        Args:
+            path: SQLite file shared by the coordinator and workers
+            visibility_timeout: Seconds a lease lasts without a heartbeat
+            max_attempts: Times a link is leased before it is marked failed
+        """
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Transactions are explicit so a claim locks the database for its whole read-modify-write
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                url TEXT PRIMARY KEY,
+                position INTEGER,
+                status TEXT,
+                lease_id TEXT,
+                lease_expires REAL,
+                attempts INTEGER DEFAULT 0,
+                worker TEXT,
+                updated_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, position)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_lease ON tasks (lease_id)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS queue_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def reset(self):
+        """
+        Drop every task and unseal the queue for a new crawl.
+
+        Returns:
+            The new crawl's run id
+        """
+        run_id = uuid.uuid4().hex
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM tasks")
+            conn.execute("DELETE FROM queue_meta")
+            conn.execute("INSERT INTO queue_meta (key, value) VALUES ('run_id', ?)", (run_id,))
+        return run_id
+
+    def run_id(self):
+        """Run id of the crawl in the queue, or None if no coordinator has reset it."""
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM queue_meta WHERE key = 'run_id'").fetchone()
+        return row[0] if row else None
+
+    def enqueue(self, urls):
+        """
+        Add links as pending tasks; links already in the queue are left alone.
+
+        Returns:
+            Number of links added
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            start = conn.execute("SELECT COALESCE(MAX(position), 0) FROM tasks").fetchone()[0] + 1
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (url, position, status, updated_at) VALUES (?, ?, 'pending', ?)",
+                [(url, start + offset, now) for offset, url in enumerate(urls)]
+            )
+            return conn.total_changes - before
+
+    def seal(self):
+        """Mark the frontier complete; workers stop once everything is done."""
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO queue_meta (key, value) VALUES ('sealed', '1')")
+
+    def _requeue_expired(self, conn, now):
+        conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_id = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (self.max_attempts, now, now)
+        )
+        return conn.execute("SELECT changes()").fetchone()[0]
+
+    def requeue_expired(self):
+        """
+        Return links whose lease ran out to the queue.
+
+        Returns:
+            Number of links requeued (or failed after max_attempts)
+        """
+        with self._transaction() as conn:
+            return self._requeue_expired(conn, time.time())
+
+    def claim(self, worker_id, count):
+        """
+        Lease up to `count` pending links in frontier order.
+
+        Returns:
+            Lease, or None if no link is pending
+        """
+        now = time.time()
+        lease_id = uuid.uuid4().hex
+        lease_expires = now + self.visibility_timeout
+        with self._transaction() as conn:
+            requeued = self._requeue_expired(conn, now)
+            if requeued:
+                logger.warning(f"Requeued {requeued} links from expired leases")
+            urls = [row[0] for row in conn.execute(
+                "SELECT url FROM tasks WHERE status = 'pending' ORDER BY position LIMIT ?", (count,)
+            )]
+            conn.executemany(
+                "UPDATE tasks SET status = 'leased', lease_id = ?, lease_expires = ?, "
+                "attempts = attempts + 1, worker = ?, updated_at = ? WHERE url = ?",
+                [(lease_id, lease_expires, worker_id, now, url) for url in urls]
+            )
+        return Lease(lease_id, urls, lease_expires) if urls else None
+
+    def heartbeat(self, lease):
+        """
+        Extend a lease by visibility_timeout.
+
+        Returns:
+            Number of links still held; 0 means the lease expired and was taken over
+        """
+        lease_expires = time.time() + self.visibility_timeout
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE lease_id = ? AND status = 'leased'",
+                (lease_expires, lease.lease_id)
+            )
+            held = conn.execute("SELECT changes()").fetchone()[0]
+        lease.lease_expires = lease_expires
+        return held
+
+    def ack(self, lease, urls):
+        """Mark links of a lease as done. Links the lease no longer holds are ignored."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE tasks SET status = 'done', lease_id = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE url = ? AND lease_id = ?",
+                [(now, url, lease.lease_id) for url in urls]
+            )
+
+    def release(self, lease, urls):
+        """Return links of a lease to the queue for another attempt (or fail them after max_attempts)."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_id = NULL, lease_expires = NULL, updated_at = ? WHERE url = ? AND lease_id = ?",
+                [(self.max_attempts, now, url, lease.lease_id) for url in urls]
+            )
+
+    def counts(self):
+        """Number of links per status."""
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(rows)
+        return counts
+
+    def is_finished(self, run_id=None):
+        """
+        True once the queue is sealed and no link is pending or leased.
+
+        Args:
+            run_id: Only report the crawl with this run id as finished; a
+                queue reset for another crawl is not
+        """
+        with self._lock:
+            meta = dict(self.conn.execute("SELECT key, value FROM queue_meta").fetchall())
+            active = self.conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')"
+            ).fetchone()[0]
+        if run_id is not None and meta.get("run_id") != run_id:
+            return False
+        return "sealed" in meta and not active
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+
+class MongoWorkQueue:
+    """
+    The same lease-based queue stored in a MongoDB collection, for workers on
+    several hosts. Each link is one document keyed by its URL; every claim
+    is an atomic find_one_and_update, so two workers never lease the same link.
+    """
+
+    def __init__(self, connection_string="mongodb://localhost:27017/", database_name="meta_store",
+                 collection_name="crawl_queue", visibility_timeout=600, max_attempts=3):
+        """
+        Connect to the queue collection.
+
+        Args:
+            connection_string: MongoDB connection URI
+            database_name: Database name
+            collection_name: Collection holding the tasks; queue state is kept in <name>_meta
+            visibility_timeout: Seconds a lease lasts without a heartbeat
+            max_attempts: Times a link is leased before it is marked failed
+        """
+        from pymongo import MongoClient
+
+        self.client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
+        self.tasks = self.client[database_name][collection_name]
+        self.meta = self.client[database_name][f"{collection_name}_meta"]
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.tasks.create_index([("status", 1), ("position", 1)])
+        self.tasks.create_index("lease_id")
+
+    def reset(self):
+        # The new run id goes first, so is_finished() for the old run never sees the emptied collection
+        run_id = uuid.uuid4().hex
+        self.meta.delete_many({})
+        self.meta.insert_one({"_id": "run", "value": run_id})
+        self.tasks.delete_many({})
+        return run_id
+
+    def run_id(self):
+        run = self.meta.find_one({"_id": "run"})
+        return run["value"] if run else None
+
+    def enqueue(self, urls):
+        from pymongo import UpdateOne
+
+        urls = list(urls)
+        if not urls:
+            return 0
+        last = self.tasks.find_one({}, {"position": 1}, sort=[("position", -1)])
+        start = (last["position"] if last else 0) + 1
+        now = time.time()
+        result = self.tasks.bulk_write([
+            UpdateOne({"_id": url}, {"$setOnInsert": {"position": start + offset, "status": "pending",
+                                                      "attempts": 0, "updated_at": now}}, upsert=True)
+            for offset, url in enumerate(urls)
+        ], ordered=False)
+        return result.upserted_count
+
+    def seal(self):
+        self.meta.update_one({"_id": "sealed"}, {"$set": {"value": True}}, upsert=True)
+
+    def requeue_expired(self):
+        now = time.time()
+        expired = {"status": "leased", "lease_expires": {"$lt": now}}
+        reset = {"lease_id": None, "lease_expires": None, "updated_at": now}
+        failed = self.tasks.update_many({**expired, "attempts": {"$gte": self.max_attempts}},
+                                        {"$set": {**reset, "status": "failed"}})
+        requeued = self.tasks.update_many(expired, {"$set": {**reset, "status": "pending"}})
+        return failed.modified_count + requeued.modified_count
+
+    def claim(self, worker_id, count):
+        from pymongo import ReturnDocument
+
+        requeued = self.requeue_expired()
+        if requeued:
+            logger.warning(f"Requeued {requeued} links from expired leases")
+        now = time.time()
+        lease_id = uuid.uuid4().hex
+        lease_expires = now + self.visibility_timeout
+        urls = []
+        for _ in range(count):
+            task = self.tasks.find_one_and_update(
+                {"status": "pending"},
+                {"$set": {"status": "leased", "lease_id": lease_id, "lease_expires": lease_expires,
+                          "worker": worker_id, "updated_at": now},
+                 "$inc": {"attempts": 1}},
+                sort=[("position", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if task is None:
+                break
+            urls.append(task["_id"])
+        return Lease(lease_id, urls, lease_expires) if urls else None
+
+    def heartbeat(self, lease):
+        lease_expires = time.time() + self.visibility_timeout
+        result = self.tasks.update_many({"lease_id": lease.lease_id, "status": "leased"},
+                                        {"$set": {"lease_expires": lease_expires}})
+        lease.lease_expires = lease_expires
+        return result.matched_count
+
+    def ack(self, lease, urls):
+        self.tasks.update_many(
+            {"_id": {"$in": list(urls)}, "lease_id": lease.lease_id},
+            {"$set": {"status": "done", "lease_id": None, "lease_expires": None, "updated_at": time.time()}}
+        )
+
+    def release(self, lease, urls):
+        held = {"_id": {"$in": list(urls)}, "lease_id": lease.lease_id}
+        reset = {"lease_id": None, "lease_expires": None, "updated_at": time.time()}
+        self.tasks.update_many({**held, "attempts": {"$gte": self.max_attempts}},
+                               {"$set": {**reset, "status": "failed"}})
+        self.tasks.update_many(held, {"$set": {**reset, "status": "pending"}})
+
+    def counts(self):
+        counts = dict.fromkeys(STATUSES, 0)
+        for group in self.tasks.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[group["_id"]] = group["count"]
+        return counts
+
+    def is_finished(self, run_id=None):
+        if run_id is not None and self.run_id() != run_id:
+            return False
+        if self.meta.find_one({"_id": "sealed"}) is None:
+            return False
+        if self.tasks.count_documents({"status": {"$in": ["pending", "leased"]}}, limit=1):
+            return False
+        # A reset between the checks above could have emptied the collection
+        return run_id is None or self.run_id() == run_id
+
+    def close(self):
+        self.client.close()
+
+
+def open_work_queue(location, visibility_timeout=600, max_attempts=3):
+    """
+    Open the queue backend for a location: a mongodb:// (or mongodb+srv://)
+    URI selects MongoWorkQueue, anything else is a SQLite file path.
+    """
+    if location.startswith(("mongodb://", "mongodb+srv://")):
+        return MongoWorkQueue(location, visibility_timeout=visibility_timeout, max_attempts=max_attempts)
+    return SqliteWorkQueue(location, visibility_timeout=visibility_timeout, max_attempts=max_attempts)
+
+
+class LeaseHeartbeat:
+    """
+    Keep a lease alive from a background thread while its batch is scraped.
+
+    Use as a context manager around the work. `lost` is set if the queue
+    reports that the lease expired and its links were handed to another worker.
+    """
+
+    def __init__(self, work_queue, lease, interval=None):
+        """
+        Args:
+            work_queue: Queue the lease came from
+            lease: Lease to extend
+            interval: Seconds between heartbeats (default: a third of the visibility timeout)
+        """
+        self.work_queue = work_queue
+        self.lease = lease
+        self.interval = interval or work_queue.visibility_timeout / 3
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.work_queue.heartbeat(self.lease):
+                    self.lost = True
+                    logger.warning(f"Lease {self.lease.lease_id} expired; its links were handed to another worker")
+                    return
+            except Exception as e:
+                # A missed heartbeat is retried; the lease only lapses after visibility_timeout
+                logger.warning(f"Heartbeat for lease {self.lease.lease_id} failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()